@@ -0,0 +1,44 @@
+"""
+Reports QR version and SVG size reduction of alphanumeric mode over a corpus of invoices.
+
+Usage: uv run python benchmarks/bench_alphanumeric.py [--count 1000]
+"""
+
+import argparse
+import statistics
+import time
+
+from corpus import invoices
+
+from qrplatba import QRPlatbaGenerator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000)
+    args = parser.parse_args()
+
+    generators = [QRPlatbaGenerator(**payment) for payment in invoices(args.count)]
+
+    results = {}
+    for alphanumeric in (False, True):
+        versions, sizes = [], []
+        start = time.perf_counter()
+        for generator in generators:
+            versions.append((generator.make_image(alphanumeric=alphanumeric).width - 17) // 4)
+            sizes.append(len(generator.make_svg(alphanumeric=alphanumeric)))
+        elapsed = time.perf_counter() - start
+        results[alphanumeric] = versions, sizes
+        print(
+            f"alphanumeric={alphanumeric!s:5}  mean version {statistics.mean(versions):5.2f}  "
+            f"mean SVG size {statistics.mean(sizes):8.0f} B  ({elapsed / args.count * 1e3:.2f} ms/invoice)"
+        )
+
+    (default_versions, default_sizes), (versions, sizes) = results[False], results[True]
+    smaller = sum(v < d for v, d in zip(versions, default_versions))
+    saved = 1 - sum(sizes) / sum(default_sizes)
+    print(f"smaller version for {smaller / args.count:.1%} of invoices, SVG bytes reduced by {saved:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Compares per-row and bulk conversion of czech account numbers to IBAN, with NumPy columns if NumPy is installed.
+
+Usage: uv run python benchmarks/bench_iban.py [--count 1000000]
+"""
+
+import argparse
+import random
+import time
+
+from qrplatba.iban import accounts_to_iban
+from qrplatba.spayd import RE_ACCOUNT, SpaydGenerator
+
+BANKS = ["0100", "0300", "0600", "0800", "2010", "3030", "5500", "6210"]
+
+
+def make_accounts(count, seed=0):
+    rnd = random.Random(seed)
+    return [
+        f"{rnd.randrange(1, 999999)}-{rnd.randrange(10**5, 10**10)}/{rnd.choice(BANKS)}"
+        if rnd.random() < 0.3
+        else f"{rnd.randrange(10**5, 10**10)}/{rnd.choice(BANKS)}"
+        for _ in range(count)
+    ]
+
+
+def per_row(accounts):
+    return [SpaydGenerator._convert_to_iban(RE_ACCOUNT.match(account)) for account in accounts]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    accounts = make_accounts(args.count)
+    candidates = [
+        ("_convert_to_iban per row", per_row, accounts),
+        ("accounts_to_iban(list)", accounts_to_iban, accounts),
+    ]
+    try:
+        import numpy as np
+    except ImportError:
+        print("NumPy is not installed, skipping the vectorized conversion")
+    else:
+        candidates.append(("accounts_to_iban(array)", accounts_to_iban, np.array(accounts)))
+
+    for name, func, column in candidates:
+        start = time.perf_counter()
+        func(column)
+        elapsed = time.perf_counter() - start
+        print(f"{name:26} {elapsed:6.2f} s  {args.count / elapsed / 1e6:6.2f} M rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Measures the time of "import qrplatba" in fresh interpreters, as reported by -X importtime.
+
+Before the imports were made lazy it was about 37-52 ms, with only the SPAYD generator loaded about 12-15 ms.
+
+Usage: uv run python benchmarks/bench_import.py [--runs 10] [--budget-ms 25]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+
+def import_time(module):
+    """Returns cumulative import time of the module in microseconds"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    )
+    for line in result.stderr.splitlines():
+        _, cumulative, name = line.split("|")
+        if name.strip() == module and not name.startswith("  "):
+            return int(cumulative)
+    raise RuntimeError(f"{module} not found in -X importtime output")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, help="exit with status 1 when the best run is slower")
+    args = parser.parse_args()
+
+    timings = [import_time("qrplatba") / 1000 for _ in range(args.runs)]
+    best = min(timings)
+    print(f"import qrplatba: best {best:.1f} ms, median {statistics.median(timings):.1f} ms ({args.runs} runs)")
+    if args.budget_ms is not None and best > args.budget_ms:
+        print(f"over the budget of {args.budget_ms:g} ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
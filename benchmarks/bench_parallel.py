@@ -0,0 +1,48 @@
+"""
+Measures PNG throughput of ParallelRenderer with increasing number of worker processes.
+
+Usage: uv run python benchmarks/bench_parallel.py [--count 2000] [--chunk-size 64] [--workers 1 2 4 8]
+"""
+
+import argparse
+import os
+import time
+
+from qrplatba.batch import render_many
+from qrplatba.parallel import ParallelRenderer
+
+
+def make_payments(count):
+    return [
+        {"account": "19-2000145399/0800", "amount": i * 1.5, "x_vs": i, "message": f"Faktura {i}"} for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--chunk-size", type=int, default=64)
+    cpus = os.cpu_count() or 1
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1))))
+    args = parser.parse_args()
+
+    payments = make_payments(args.count)
+
+    start = time.perf_counter()
+    for _ in render_many(payments, format="png"):
+        pass
+    serial = time.perf_counter() - start
+    print(f"serial   {args.count / serial:10.1f} images/s")
+
+    for workers in args.workers:
+        with ParallelRenderer(workers, args.chunk_size) as renderer:
+            renderer.render(payments[: workers * args.chunk_size])  # warm up worker processes
+            start = time.perf_counter()
+            for _ in renderer.map(payments):
+                pass
+            elapsed = time.perf_counter() - start
+        print(f"{workers:2d} workers {args.count / elapsed:10.1f} images/s  ({serial / elapsed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
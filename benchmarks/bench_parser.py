@@ -0,0 +1,49 @@
+"""
+Measures SpaydParser throughput in records per second over a corpus of invoices, with a share of invalid strings.
+
+Usage: uv run python benchmarks/bench_parser.py [--count 100000] [--invalid 0.05]
+"""
+
+import argparse
+import random
+import time
+
+from corpus import invoices
+
+from qrplatba import Payment, SpaydParser, format_spayd
+
+
+def make_texts(count, invalid):
+    texts = [format_spayd(Payment(**payment)) for payment in invoices(count)]
+    rnd = random.Random(0)
+    for index in rnd.sample(range(count), int(count * invalid)):
+        # corrupt one IBAN digit, which the checksum must catch
+        text = texts[index]
+        position = text.index("ACC:") + 10
+        texts[index] = text[:position] + str((int(text[position]) + 1) % 10) + text[position + 1 :]
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--invalid", type=float, default=0.05)
+    args = parser.parse_args()
+
+    texts = make_texts(args.count, args.invalid)
+    spayd_parser = SpaydParser()
+
+    start = time.perf_counter()
+    results = list(spayd_parser.parse_many(texts))
+    elapsed = time.perf_counter() - start
+
+    invalid = [result for result in results if result.errors]
+    round_trips = sum(1 for result in results if result.payment and format_spayd(result.payment) == texts[result.index])
+    print(
+        f"parse_many  {args.count / elapsed:10.0f} records/s  {elapsed / args.count * 1e6:6.2f} us/record  "
+        f"{len(invalid)} invalid  {round_trips} of {args.count - len(invalid)} valid records round-trip"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Compares PNG rendering through resvg with the native and composite rasterizers over a corpus of invoices.
+
+Usage: uv run python benchmarks/bench_raster.py [--count 200] [--box-size 10] [--zoom 1]
+"""
+
+import argparse
+import io
+import time
+
+from corpus import invoices
+
+from qrplatba import QRPlatbaGenerator
+from qrplatba.raster import get_composite_layout, get_layout
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--box-size", type=int, default=10)
+    parser.add_argument("--zoom", type=float)
+    args = parser.parse_args()
+
+    images = [QRPlatbaGenerator(**payment).make_image(box_size=args.box_size) for payment in invoices(args.count)]
+
+    # payload independent layouts of the native and composite backends are rendered once per QR code version
+    widths = {img.width for img in images}
+    for name, make_layout in (("native", get_layout), ("composite", get_composite_layout)):
+        start = time.perf_counter()
+        for width in widths:
+            make_layout(width, box_size=args.box_size, zoom=args.zoom)
+        elapsed = time.perf_counter() - start
+        print(f"{name} layouts for {len(widths)} QR versions rendered in {elapsed * 1e3:.0f} ms")
+
+    timings = {}
+    for backend in ("resvg", "native", "composite"):
+        size = 0
+        start = time.perf_counter()
+        for img in images:
+            buffer = io.BytesIO()
+            img.save(buffer, output_format="png", zoom=args.zoom, backend=backend)
+            size += buffer.tell()
+        timings[backend] = elapsed = time.perf_counter() - start
+        print(
+            f"{backend:9}  {args.count / elapsed:8.1f} images/s  {elapsed / args.count * 1e3:6.2f} ms/image  "
+            f"mean size {size / args.count:8.0f} B"
+        )
+
+    for backend in ("native", "composite"):
+        print(f"{backend} backend is {timings['resvg'] / timings[backend]:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
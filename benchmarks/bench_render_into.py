@@ -0,0 +1,77 @@
+"""
+Compares time and peak memory per image of writing many images into one preallocated buffer with save() and with
+render_into().
+
+Usage: uv run python benchmarks/bench_render_into.py [--count 200] [--format svg|png]
+"""
+
+import argparse
+import io
+import time
+import tracemalloc
+
+from corpus import invoices
+
+from qrplatba import QRPlatbaGenerator
+
+
+def with_save(images, buffer, options):
+    offset = 0
+    for img in images:
+        stream = io.BytesIO()
+        img.save(stream, **options)
+        data = stream.getvalue()
+        buffer[offset : offset + len(data)] = data
+        offset += len(data)
+    return offset
+
+
+def with_render_into(images, buffer, options):
+    offset = 0
+    for img in images:
+        offset += img.render_into(buffer, offset, **options)
+    return offset
+
+
+def measure(images, write, buffer, options):
+    """Returns (seconds, mean peak memory per image in bytes) of writing the images into the buffer"""
+    peaks = []
+    tracemalloc.start()
+    start = time.perf_counter()
+    for img in images:
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        write([img], buffer, options)
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    return elapsed, sum(peaks) / len(peaks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--format", choices=("svg", "png"), default="svg")
+    args = parser.parse_args()
+
+    options = {"output_format": args.format}
+    if args.format == "png":
+        options["backend"] = "native"
+
+    images = [QRPlatbaGenerator(**payment).make_image() for payment in invoices(args.count)]
+    # output buffer preallocated up front, as a memory-mapped file would be
+    buffer = bytearray(sum(img.render_size(**options) for img in images))
+    for img in images:
+        img._encoded = None  # drop the encodings kept by render_size
+
+    for write in (with_save, with_render_into):
+        write(images[:1], buffer, options)
+        elapsed, peak = measure(images, write, buffer, options)
+        print(
+            f"{write.__name__:16}  {elapsed / args.count * 1e3:6.2f} ms/image  "
+            f"peak memory {peak / 1024:6.1f} KiB/image  (images {len(buffer) / args.count / 1024:.1f} KiB/image)"
+        )
+
+
+if __name__ == "__main__":
+    main()
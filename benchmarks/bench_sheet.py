@@ -0,0 +1,43 @@
+"""
+Compares total size and render time of separate images with A4 sheets of codes laid out by SheetRenderer.
+
+Usage: uv run python benchmarks/bench_sheet.py [--count 120] [--format svg|png] [--path-mode modules] [--box-size 8]
+"""
+
+import argparse
+import time
+
+from corpus import invoices
+
+from qrplatba import Renderer
+from qrplatba.sheet import SheetRenderer
+from qrplatba.svg import PATH_MODES
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=120)
+    parser.add_argument("--format", choices=("svg", "png"), default="svg")
+    parser.add_argument("--path-mode", choices=PATH_MODES, default="modules")
+    # the largest invoices of the corpus don't fit a 3x4 grid on A4 with 1 mm modules
+    parser.add_argument("--box-size", type=int, default=8)
+    args = parser.parse_args()
+
+    payments = invoices(args.count)
+    renderer = Renderer(args.format, path_mode=args.path_mode, box_size=args.box_size)
+    sheets = SheetRenderer(args.format, path_mode=args.path_mode, box_size=args.box_size)
+
+    start = time.perf_counter()
+    size = sum(map(len, renderer.render_many(payments)))
+    separate = time.perf_counter() - start
+    print(f"separate  {args.count:4} images  {size / 1024:9.1f} KiB  {separate * 1e3:8.0f} ms")
+
+    start = time.perf_counter()
+    pages = list(sheets.pages(payments))
+    sheet = time.perf_counter() - start
+    size = sum(map(len, pages))
+    print(f"sheets    {len(pages):4} pages   {size / 1024:9.1f} KiB  {sheet * 1e3:8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
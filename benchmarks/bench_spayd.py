@@ -0,0 +1,66 @@
+"""
+Compares per-record cost and memory of SpaydGenerator.get_text() and format_spayd() with Payment records.
+
+Usage: uv run python benchmarks/bench_spayd.py [--count 100000]
+"""
+
+import argparse
+import time
+import tracemalloc
+from datetime import date
+
+from qrplatba import Payment, SpaydGenerator, format_spayd
+
+
+def make_kwargs(count):
+    return [
+        {
+            "account": f"{i % 1000}-{1000000 + i}/0800",
+            "amount": i * 1.25,
+            "currency": "CZK",
+            "x_vs": i,
+            "message": f"Faktura {i}",
+            "due_date": date(2025, 1 + i % 12, 1 + i % 28),
+        }
+        for i in range(count)
+    ]
+
+
+def measure_memory(factory, kwargs):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = [factory(**kw) for kw in kwargs]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return records, used
+
+
+def measure_time(func, records):
+    start = time.perf_counter()
+    for record in records:
+        func(record)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    kwargs = make_kwargs(args.count)
+    scale = 1_000_000 / args.count
+
+    for name, factory, func in (
+        ("SpaydGenerator.get_text", SpaydGenerator, SpaydGenerator.get_text),
+        ("format_spayd(Payment)", Payment, format_spayd),
+    ):
+        records, used = measure_memory(factory, kwargs)
+        elapsed = measure_time(func, records)
+        print(
+            f"{name:24} {elapsed / args.count * 1e6:8.2f} us/record  "
+            f"{used * scale / 2**20:8.1f} MiB per million records"
+        )
+
+
+if __name__ == "__main__":
+    main()
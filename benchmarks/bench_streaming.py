@@ -0,0 +1,66 @@
+"""
+Compares time to the first byte and peak memory of rendering whole SVG sheet pages with streaming them in chunks.
+
+Usage: uv run python benchmarks/bench_streaming.py [--pages 10] [--box-size 8] [--path-mode modules]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from corpus import invoices
+
+from qrplatba.sheet import SheetRenderer
+
+
+def whole(renderer, payments):
+    yield renderer.render_page(payments)
+
+
+def streamed(renderer, payments):
+    return renderer.iter_page_chunks(payments)
+
+
+def measure(render, renderer, pages):
+    """Returns (mean seconds to the first byte, mean seconds per page, mean peak memory per page in bytes)"""
+    first_bytes = []
+    totals = []
+    peaks = []
+    tracemalloc.start()
+    for payments in pages:
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        chunks = iter(render(renderer, payments))
+        next(chunks)
+        first_bytes.append(time.perf_counter() - start)
+        for _ in chunks:  # chunks are sent and dropped, as by a streaming response
+            pass
+        totals.append(time.perf_counter() - start)
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+    return sum(first_bytes) / len(pages), sum(totals) / len(pages), sum(peaks) / len(pages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--box-size", type=int, default=8)
+    parser.add_argument("--path-mode", choices=("modules", "runs", "contours"), default="modules")
+    args = parser.parse_args()
+
+    renderer = SheetRenderer(box_size=args.box_size, path_mode=args.path_mode)
+    payments = invoices(args.pages * renderer.per_page)
+    pages = [payments[i : i + renderer.per_page] for i in range(0, len(payments), renderer.per_page)]
+
+    for render in (whole, streamed):
+        list(render(renderer, pages[0]))  # warm up the geometry caches
+        first_byte, total, peak = measure(render, renderer, pages)
+        print(
+            f"{render.__name__:9} first byte {first_byte * 1e3:6.2f} ms  page {total * 1e3:6.2f} ms  "
+            f"peak memory {peak / 1024:7.1f} KiB/page"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Compares SVG size, SVG writing time and resvg render time of the QR code path modes over a corpus of invoices.
+
+Usage: uv run python benchmarks/bench_svg_path.py [--count 200]
+"""
+
+import argparse
+import statistics
+import time
+
+import resvg_py
+from corpus import invoices
+
+from qrplatba import SpaydGenerator
+from qrplatba.qr import make_qr
+from qrplatba.svg import PATH_MODES, SvgWriter, _resvg_options
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=200)
+    args = parser.parse_args()
+
+    matrices = [make_qr(SpaydGenerator(**payment).get_text()).modules for payment in invoices(args.count)]
+    resvg_kwargs = _resvg_options()
+
+    for path_mode in PATH_MODES:
+        start = time.perf_counter()
+        documents = [
+            SvgWriter.for_geometry(len(modules), path_mode=path_mode).to_bytes(modules) for modules in matrices
+        ]
+        write_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for document in documents:
+            resvg_py.svg_to_bytes(svg_string=document.decode(), **resvg_kwargs)
+        render_time = time.perf_counter() - start
+
+        subpaths = statistics.mean(document.count(b"M") for document in documents)
+        print(
+            f"{path_mode:8}  mean SVG size {statistics.mean(map(len, documents)):7.0f} B  "
+            f"{subpaths:6.0f} subpaths  write {write_time / args.count * 1e3:5.2f} ms  "
+            f"resvg {render_time / args.count * 1e3:6.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Compares rendering payment reminders, which differ only in amount, variable symbol and due date, with
+QRPlatbaGenerator and with a template.
+
+Usage: uv run python benchmarks/bench_template.py [--count 300]
+"""
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+import qrcode
+
+from qrplatba import QRPlatbaGenerator, SpaydGenerator
+from qrplatba.qr import make_qr
+
+INVOICE = {
+    "account": "19-2000145399/0800",
+    "currency": "CZK",
+    "recipient_name": "Energie a plyn a.s.",
+    "message": "Upominka: vyuctovani energii za obdobi 01-12/2025",
+}
+
+
+def reminders(count, seed=0):
+    rnd = random.Random(seed)
+    return [
+        {
+            "amount": Decimal(rnd.randrange(100, 10**7)) / 100,
+            "x_vs": rnd.randrange(10**9, 10**10),
+            "due_date": date(2026, 1, 1) + timedelta(days=rnd.randrange(365)),
+        }
+        for _ in range(count)
+    ]
+
+
+def measure(name, func, values, baseline=None):
+    start = time.perf_counter()
+    for record in values:
+        func(record)
+    elapsed = time.perf_counter() - start
+    saving = f"  {1 - elapsed / baseline:5.0%} saved" if baseline else ""
+    print(f"{name:34} {elapsed / len(values) * 1e6:9.1f} us/record{saving}")
+    return elapsed
+
+
+def qrcode_make(text):
+    qr = qrcode.QRCode()
+    qr.add_data(text)
+    qr.make(fit=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=300)
+    args = parser.parse_args()
+
+    values = reminders(args.count)
+    template = QRPlatbaGenerator.from_template(**INVOICE)
+    texts = [template.get_text(**record) for record in values]
+
+    baseline = measure("SpaydGenerator.get_text", lambda v: SpaydGenerator(**INVOICE, **v).get_text(), values)
+    measure("template.get_text", lambda v: template.get_text(**v), values, baseline)
+
+    baseline = measure("QRCode.make(fit=True)", qrcode_make, texts)
+    measure("make_qr (cached version layout)", make_qr, texts, baseline)
+
+    baseline = measure("QRPlatbaGenerator.render", lambda v: QRPlatbaGenerator(**INVOICE, **v).render(), values)
+    measure("template.render", lambda v: template.render(**v), values, baseline)
+
+
+if __name__ == "__main__":
+    main()
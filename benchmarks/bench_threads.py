@@ -0,0 +1,49 @@
+"""
+Measures throughput of a single Renderer shared by a growing number of threads. Throughput scales with the number
+of threads only on free-threaded Python (3.13t, 3.14t), with the GIL it stays flat.
+
+Usage: uv run python benchmarks/bench_threads.py [--count 200] [--threads 1 2 4 8] [--format svg|png]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from corpus import invoices
+
+from qrplatba import Renderer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=200, help="payments rendered by each thread")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--format", choices=("svg", "png"), default="svg")
+    args = parser.parse_args()
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}, {os.cpu_count()} CPUs")
+
+    renderer = Renderer(args.format, backend="native" if args.format == "png" else None)
+    payments = invoices(args.count)
+    renderer.render(payments[0])
+
+    def work():
+        for payment in payments:
+            renderer.render(payment)
+
+    single = None
+    for threads in args.threads:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            for future in [executor.submit(work) for _ in range(threads)]:
+                future.result()
+        throughput = threads * args.count / (time.perf_counter() - start)
+        single = single or throughput
+        print(f"{threads:3} threads  {throughput:8.1f} images/s  {throughput / single:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
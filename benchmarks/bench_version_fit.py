@@ -0,0 +1,61 @@
+"""
+Compares qrcode's best_fit version search with qrplatba.qr.fit_version over a corpus of invoices.
+
+Usage: uv run python benchmarks/bench_version_fit.py [--count 2000]
+"""
+
+import argparse
+import time
+
+import qrcode
+from corpus import invoices
+
+from qrplatba import SpaydGenerator
+from qrplatba.qr import fit_version, make_qr
+
+
+def best_fit(text):
+    qr = qrcode.QRCode()
+    qr.add_data(text)
+    return qr.best_fit()
+
+
+def direct_fit(text):
+    qr = qrcode.QRCode()
+    qr.add_data(text)
+    return fit_version(qr.data_list)
+
+
+def make_with_search(text):
+    qr = qrcode.QRCode()
+    qr.add_data(text)
+    qr.make(fit=True)
+    return qr
+
+
+def measure(func, texts):
+    start = time.perf_counter()
+    for text in texts:
+        func(text)
+    return (time.perf_counter() - start) / len(texts) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=2000)
+    args = parser.parse_args()
+
+    texts = [SpaydGenerator(**payment).get_text() for payment in invoices(args.count)]
+    assert [best_fit(t) for t in texts] == [direct_fit(t) for t in texts]
+
+    for name, func in (
+        ("version: best_fit", best_fit),
+        ("version: fit_version", direct_fit),
+        ("matrix: make(fit=True)", make_with_search),
+        ("matrix: make_qr", make_qr),
+    ):
+        print(f"{name:24} {measure(func, texts):10.1f} us/invoice")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Fixed synthetic corpus of realistic invoice payments shared by the benchmarks."""
+
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+MESSAGES = [
+    "Faktura {n}",
+    "Platba za sluzby, faktura c. {n}",
+    "Predplatne na rok 2026, zakaznik {n}",
+    "Zálohová faktura {n} – děkujeme za nákup",
+    "VYUCTOVANI ENERGII ZA OBDOBI 01-12/2025, ODBERNE MISTO {n}",
+]
+RECIPIENTS = ["Jan Novak", "ACME s.r.o.", "Město Brno", "Energie a plyn a.s."]
+BANKS = ["0100", "0300", "0600", "0800", "2010", "3030", "5500", "6210"]
+
+
+def invoices(count, seed=0):
+    """Returns list of ``SpaydGenerator`` keyword arguments, the same for the same count and seed"""
+    rnd = random.Random(seed)
+    payments = []
+    for n in range(count):
+        prefix = f"{rnd.randrange(1, 999999)}-" if rnd.random() < 0.3 else ""
+        payment = {
+            "account": f"{prefix}{rnd.randrange(10**5, 10**10)}/{rnd.choice(BANKS)}",
+            "amount": Decimal(rnd.randrange(100, 10**8)) / 100,
+            "currency": "CZK",
+            "x_vs": rnd.randrange(10**9, 10**10),
+            "due_date": date(2026, 1, 1) + timedelta(days=rnd.randrange(365)),
+        }
+        if rnd.random() < 0.7:
+            payment["message"] = rnd.choice(MESSAGES).format(n=n)
+        if rnd.random() < 0.3:
+            payment["recipient_name"] = rnd.choice(RECIPIENTS)
+        if rnd.random() < 0.2:
+            payment["x_ks"] = rnd.choice([308, 558, 1178])
+        if rnd.random() < 0.1:
+            payment["alternate_accounts"] = [f"{rnd.randrange(10**5, 10**10)}/{rnd.choice(BANKS)}"]
+        payments.append(payment)
+    return payments
+
+
+FIELD_SETS = {
+    "minimal": ("account", "amount", "currency"),
+    "invoice": None,  # fields of invoices()
+    "extended": ("alternate_accounts", "reference", "x_id", "notification_type", "notification_address", "x_url"),
+}
+
+
+def varied_invoices(count, seed=0):
+    """
+    Returns list of ``(field set, SpaydGenerator keyword arguments)``, the same for the same count and seed
+
+    Mixes minimal payments, the payments of ``invoices()`` and payments with the optional fields filled in (two
+    alternate accounts, URL, notification), so that the corpus covers a wide range of SPAYD lengths and QR versions.
+    """
+    rnd = random.Random(seed)
+    payments = []
+    for n, payment in enumerate(invoices(count, seed)):
+        field_set = rnd.choices(list(FIELD_SETS), weights=(2, 6, 2))[0]
+        if field_set == "minimal":
+            payment = {name: payment[name] for name in FIELD_SETS["minimal"]}
+        elif field_set == "extended":
+            payment = {
+                **payment,
+                "message": rnd.choice(MESSAGES).format(n=n)[:60],
+                "alternate_accounts": [f"{rnd.randrange(10**5, 10**10)}/{rnd.choice(BANKS)}" for _ in range(2)],
+                "reference": rnd.randrange(10**5, 10**10),
+                "x_id": f"INV-{n:08d}",
+                "notification_type": "E",
+                "notification_address": f"platby{n}@example.com",
+                "x_url": f"https://example.com/faktury/{n}?zakaznik={rnd.randrange(10**6)}",
+            }
+        payments.append((field_set, payment))
+    return payments
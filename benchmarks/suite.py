@@ -0,0 +1,259 @@
+"""
+Benchmark suite of the SPAYD and rendering stages with JSON results and comparison of two runs.
+
+Measures throughput, latency percentiles and peak memory per operation of each stage over the fixed corpus of
+``corpus.varied_invoices``. Results of a run can be saved as JSON and compared with another run, the comparison lists
+the regressions over the threshold and exits with status 1 if there are any.
+
+Usage:
+    uv run python benchmarks/suite.py run [--count 200] [--repeat 5] [--stage NAME ...] [--output results.json]
+    uv run python benchmarks/suite.py compare baseline.json results.json [--threshold 0.1]
+"""
+
+import argparse
+import collections
+import importlib.metadata
+import importlib.util
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from corpus import varied_invoices
+
+from qrplatba import QRPlatbaGenerator, SpaydGenerator
+
+FORMAT_VERSION = 1
+
+# metric: (label, True if higher is better, True if checked for regressions)
+# tail latencies are reported only, on a shared machine they are dominated by scheduling noise
+METRICS = {
+    "ops_per_sec": ("ops/s", True, True),
+    "p50_us": ("p50", False, True),
+    "p90_us": ("p90", False, False),
+    "p99_us": ("p99", False, False),
+    "peak_memory_kib": ("peak memory", False, True),
+}
+
+
+def _save(output_format, **options):
+    def save(img):
+        img.save(io.BytesIO(), output_format=output_format, **options)
+
+    return save
+
+
+# stage: (inputs prepared from the payments outside of the measurement, measured operation on one input)
+STAGES = {
+    "get_text": (lambda payments: [SpaydGenerator(**payment) for payment in payments], SpaydGenerator.get_text),
+    "make_image": (
+        lambda payments: [QRPlatbaGenerator(**payment) for payment in payments],
+        QRPlatbaGenerator.make_image,
+    ),
+    "to_string": (
+        lambda payments: [QRPlatbaGenerator(**payment).make_image() for payment in payments],
+        lambda img: img.to_string(),
+    ),
+    "save_svg": (lambda payments: [QRPlatbaGenerator(**payment).make_image() for payment in payments], _save("svg")),
+    "save_png": (
+        lambda payments: [QRPlatbaGenerator(**payment).make_image() for payment in payments],
+        _save("png", backend="resvg"),
+    ),
+    "save_png_native": (
+        lambda payments: [QRPlatbaGenerator(**payment).make_image() for payment in payments],
+        _save("png", backend="native"),
+    ),
+    "save_png_composite": (
+        lambda payments: [QRPlatbaGenerator(**payment).make_image() for payment in payments],
+        _save("png", backend="composite"),
+    ),
+}
+
+
+def _version(package):
+    try:
+        return importlib.metadata.version(package)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def _environment():
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "qrplatba": _version("qrplatba"),
+        "qrcode": _version("qrcode"),
+        "resvg-py": _version("resvg-py"),
+    }
+
+
+def _percentile(sorted_values, percent):
+    """Returns the percentile of sorted values with linear interpolation"""
+    position = (len(sorted_values) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def measure(func, inputs, repeat):
+    """Returns dict of the metrics of calling the function on each of the inputs in ``repeat`` rounds"""
+    for item in inputs[:10]:  # warm up caches and lazy imports
+        func(item)
+
+    # throughput of the fastest round and median latency of the rounds are the least sensitive to other load
+    latencies = []
+    round_times = []
+    round_medians = []
+    for _ in range(repeat):
+        round_latencies = []
+        for item in inputs:
+            start = time.perf_counter_ns()
+            func(item)
+            round_latencies.append(time.perf_counter_ns() - start)
+        round_times.append(sum(round_latencies))
+        round_medians.append(statistics.median(round_latencies))
+        latencies.extend(round_latencies)
+    latencies.sort()
+
+    # memory is measured in a separate round, tracemalloc slows the calls down
+    peaks = []
+    tracemalloc.start()
+    for item in inputs:
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        func(item)
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+
+    return {
+        "ops": len(latencies),
+        "ops_per_sec": len(inputs) / (min(round_times) / 1e9),
+        "mean_us": statistics.fmean(latencies) / 1e3,
+        "p50_us": statistics.median(round_medians) / 1e3,
+        "p90_us": _percentile(latencies, 90) / 1e3,
+        "p99_us": _percentile(latencies, 99) / 1e3,
+        "peak_memory_kib": max(peaks) / 1024,
+        "mean_peak_memory_kib": statistics.fmean(peaks) / 1024,
+    }
+
+
+def run(args):
+    corpus = varied_invoices(args.count, args.seed)
+    payments = [payment for _, payment in corpus]
+    widths = collections.Counter(len(QRPlatbaGenerator(**payment).make_image().modules) for payment in payments)
+
+    stages = args.stage or list(STAGES)
+    for name in ("save_png", "save_png_composite"):
+        if name in stages and not importlib.util.find_spec("resvg_py"):
+            print(f"resvg_py not installed, skipping {name}", file=sys.stderr)
+            stages.remove(name)
+
+    results = {
+        "format_version": FORMAT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": _environment(),
+        "corpus": {
+            "count": args.count,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "field_sets": dict(collections.Counter(field_set for field_set, _ in corpus)),
+            "qr_widths": {str(width): widths[width] for width in sorted(widths)},
+        },
+        "stages": {},
+    }
+
+    print(f"{'stage':18} {'ops/s':>10} {'p50 us':>10} {'p90 us':>10} {'p99 us':>10} {'peak KiB':>10}")
+    for name in stages:
+        prepare, func = STAGES[name]
+        metrics = results["stages"][name] = measure(func, prepare(payments), args.repeat)
+        print(
+            f"{name:18} {metrics['ops_per_sec']:10.1f} {metrics['p50_us']:10.1f} {metrics['p90_us']:10.1f} "
+            f"{metrics['p99_us']:10.1f} {metrics['peak_memory_kib']:10.1f}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"results saved to {args.output}")
+
+
+def compare_results(baseline, results, threshold):
+    """
+    Returns list of ``(stage, metric, baseline value, value, relative change)`` of the metrics of stages measured in
+    both runs, and list of the regressions among them (checked metrics worse by more than the threshold)
+    """
+    rows = []
+    regressions = []
+    for stage, metrics in results["stages"].items():
+        if stage not in baseline["stages"]:
+            continue
+        for metric, (_, higher_is_better, checked) in METRICS.items():
+            before, after = baseline["stages"][stage][metric], metrics[metric]
+            change = (after - before) / before if before else 0.0
+            row = (stage, metric, before, after, change)
+            rows.append(row)
+            if checked and (-change if higher_is_better else change) > threshold:
+                regressions.append(row)
+    return rows, regressions
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.results) as f:
+        results = json.load(f)
+
+    for key in ("python", "implementation", "machine", "qrcode", "resvg-py"):
+        if baseline["environment"].get(key) != results["environment"].get(key):
+            print(
+                f"warning: {key} differs ({baseline['environment'].get(key)} vs {results['environment'].get(key)})",
+                file=sys.stderr,
+            )
+    if baseline["corpus"] != results["corpus"]:
+        print("warning: runs used different corpus settings", file=sys.stderr)
+
+    rows, regressions = compare_results(baseline, results, args.threshold)
+    print(f"{'stage':18} {'metric':12} {'baseline':>12} {'results':>12} {'change':>8}")
+    for stage, metric, before, after, change in rows:
+        flag = "  REGRESSION" if (stage, metric, before, after, change) in regressions else ""
+        print(f"{stage:18} {METRICS[metric][0]:12} {before:12.1f} {after:12.1f} {change:+8.1%}{flag}")
+
+    if regressions:
+        print(f"{len(regressions)} regressions over {args.threshold:.0%}")
+        return 1
+    print(f"no regressions over {args.threshold:.0%}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--count", type=int, default=200)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--stage", action="append", choices=list(STAGES), help="stage to run, all by default")
+    run_parser.add_argument("--output", help="JSON file for the results")
+
+    compare_parser = commands.add_parser("compare", help="compare results of two runs")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("results")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="relative change flagged as regression")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+        return 0
+    return compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,47 @@
-from .generator import QRPlatbaGenerator
-from .spayd import SpaydGenerator
+import importlib
 
-__all__ = ["QRPlatbaGenerator", "SpaydGenerator"]
+from .spayd import SpaydGenerator, normalize_spayd
+
+# same as typing.TYPE_CHECKING, without importing typing
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from .generator import QRPlatbaGenerator
+    from .parser import SpaydParser
+    from .payment import Payment, format_spayd
+    from .renderer import Renderer
+    from .template import SpaydTemplate
+
+__all__ = [
+    "Payment",
+    "QRPlatbaGenerator",
+    "Renderer",
+    "SpaydGenerator",
+    "SpaydParser",
+    "SpaydTemplate",
+    "format_spayd",
+    "normalize_spayd",
+]
+
+# the rendering stack (qrcode, ElementTree, asyncio) and the rest of the SPAYD API are imported on first access, so
+# that services which only generate SPAYD strings don't pay for them on every cold start
+_LAZY_ATTRIBUTES = {
+    "Payment": ".payment",
+    "QRPlatbaGenerator": ".generator",
+    "Renderer": ".renderer",
+    "SpaydParser": ".parser",
+    "SpaydTemplate": ".template",
+    "format_spayd": ".payment",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,5 @@
+import sys
+
+from qrplatba.cli import main
+
+sys.exit(main())
@@ -0,0 +1,53 @@
+"""Helpers for running blocking rendering in an executor from asyncio code."""
+
+import asyncio
+import functools
+import weakref
+
+_executor = None
+_max_concurrency = None
+# semaphores are bound to an event loop, so there is one per running loop
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def configure(executor=None, max_concurrency=None):
+    """
+    Configures executor and concurrency limit used by the async rendering methods.
+
+    :param executor: ``concurrent.futures.Executor`` for the blocking work, ``None`` for the loop's default executor
+    :param max_concurrency: maximum number of renderings running at once per event loop, ``None`` for no limit
+    """
+    global _executor, _max_concurrency
+
+    if max_concurrency is not None and max_concurrency < 1:
+        raise ValueError(f"Invalid concurrency limit (was {max_concurrency}, expected larger than 0)")
+    _executor = executor
+    _max_concurrency = max_concurrency
+    _semaphores.clear()
+
+
+def _get_semaphore(loop):
+    if _max_concurrency is None:
+        return None
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(_max_concurrency)
+    return semaphore
+
+
+async def run_in_executor(func, /, *args, executor=None, **kwargs):
+    """
+    Runs ``func(*args, **kwargs)`` in the configured executor, limited by the configured concurrency
+
+    :param executor: executor overriding the configured one for this call
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(func, *args, **kwargs)
+    if executor is None:
+        executor = _executor
+
+    semaphore = _get_semaphore(loop)
+    if semaphore is None:
+        return await loop.run_in_executor(executor, call)
+    async with semaphore:
+        return await loop.run_in_executor(executor, call)
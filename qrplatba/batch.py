@@ -0,0 +1,76 @@
+import io
+
+import qrcode
+
+from qrplatba.payment import Payment, format_spayd
+from qrplatba.qr import make_qr
+from qrplatba.spayd import SpaydGenerator, normalize_spayd
+from qrplatba.svg import PATH_MODES, QRPlatbaSVGImage, SvgWriter
+
+SUPPORTED_FORMATS = ("SVG", "PNG")
+
+
+def _spayd_text(payment):
+    """Returns SPAYD string for a payment given as SPAYD string, Payment, SpaydGenerator or dict of its arguments."""
+    if isinstance(payment, str):
+        return payment
+    if isinstance(payment, Payment):
+        return format_spayd(payment)
+    if isinstance(payment, SpaydGenerator):
+        return payment.get_text()
+    return SpaydGenerator(**payment).get_text()
+
+
+def render_many(
+    payments,
+    format="svg",
+    *,
+    border=2,
+    box_size=10,
+    error_correction=qrcode.constants.ERROR_CORRECT_M,
+    alphanumeric=False,
+    path_mode="modules",
+    **save_kwargs,
+):
+    """
+    Renders QR Platba images for many payments, yielding the encoded images in input order.
+
+    Images are produced lazily, so the payments iterable can be arbitrarily long. QR code versions are picked
+    directly by ``qrplatba.qr.make_qr`` and SVG images are written by ``SvgWriter``.
+
+    :param payments: iterable of SPAYD strings, ``Payment`` records, ``SpaydGenerator`` instances or dicts with
+        ``SpaydGenerator`` arguments
+    :param format: output format, ``"svg"`` or ``"png"``
+    :param border: outside border, same as in ``QRPlatbaGenerator.make_image``
+    :param box_size: box size, same as in ``QRPlatbaGenerator.make_image``
+    :param error_correction: error correction level, same as in ``QRPlatbaGenerator.make_image``
+    :param alphanumeric: normalize SPAYD strings and segment them optimally, same as in
+        ``QRPlatbaGenerator.make_image``
+    :param path_mode: shape of the QR code path, same as in ``QRPlatbaGenerator.make_image``
+    :param save_kwargs: extra arguments passed to ``QRPlatbaSVGImage.save`` (e.g. ``zoom`` for PNG)
+    :return: iterator of ``bytes``, identical to what ``save()`` writes for each image
+    """
+    if format.upper() not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported format: {format}")
+    if path_mode not in PATH_MODES:
+        raise ValueError(f"Unsupported path mode: {path_mode}")
+
+    return _render(payments, format, border, box_size, error_correction, alphanumeric, path_mode, save_kwargs)
+
+
+def _render(payments, format, border, box_size, error_correction, alphanumeric, path_mode, save_kwargs):
+    write_svg = format.upper() == "SVG"
+
+    for payment in payments:
+        text = _spayd_text(payment)
+        if alphanumeric:
+            text = normalize_spayd(text)
+        qr = make_qr(text, border, box_size, error_correction, image_factory=QRPlatbaSVGImage, segment=alphanumeric)
+
+        if write_svg:
+            yield SvgWriter.for_geometry(qr.modules_count, border, box_size, path_mode).to_bytes(qr.modules)
+            continue
+
+        buffer = io.BytesIO()
+        qr.make_image(path_mode=path_mode).save(buffer, output_format=format, **save_kwargs)
+        yield buffer.getvalue()
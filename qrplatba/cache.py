@@ -0,0 +1,166 @@
+import contextlib
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class LRUCache:
+    """Bounded thread-safe least-recently-used cache with hit/miss counters."""
+
+    def __init__(self, maxsize=128):
+        if maxsize < 1:
+            raise ValueError(f"Invalid cache size (was {maxsize}, expected larger than 0)")
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get_or_create(self, key, factory):
+        """Returns cached value for the key, calling ``factory()`` to create it on a miss"""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return value
+
+        # factory is called outside of the lock, concurrent misses may compute the same value twice
+        value = factory()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def cache_info(self):
+        """Returns cache statistics, same as ``functools.lru_cache``"""
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    def cache_clear(self):
+        """Removes all cached values and resets the statistics"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class MemoryBackend:
+    """In-memory render cache backend, evicts least recently used entries when ``max_bytes`` is exceeded."""
+
+    def __init__(self, max_bytes=64 * 2**20):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._data[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self.size -= len(evicted)
+
+
+class DirectoryBackend:
+    """On-disk render cache backend storing one file per entry. Files are written atomically."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def _file(self, key):
+        return self.path / key[:2] / key
+
+    def get(self, key):
+        try:
+            return self._file(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, value):
+        file = self._file(key)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        # unlike mkstemp (mode 0600), entries get the mode of files created by open(), the kernel applies the umask
+        tmp_name = file.parent / f".tmp-{os.urandom(8).hex()}"
+        fd = os.open(tmp_name, os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, "O_BINARY", 0), 0o666)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(value)
+            os.replace(tmp_name, file)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_name)
+            raise
+
+
+class RenderCache:
+    """
+    Content-addressed cache of rendered images, see ``QRPlatbaGenerator.render``.
+
+    Entries are keyed by a hash of the SPAYD string and all render options, values are stored in a pluggable
+    backend (``MemoryBackend`` by default, or ``DirectoryBackend``). Any object with ``get(key)`` returning
+    ``bytes`` or ``None`` and ``set(key, value)`` methods can be used as a backend.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    @staticmethod
+    def make_key(text, **options):
+        """Returns cache key for SPAYD string and render options"""
+        parts = [text] + [f"{name}={options[name]!r}" for name in sorted(options)]
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+    def get_or_render(self, key, render):
+        """Returns cached image for the key, calling ``render()`` to create it on a miss"""
+        value = self.backend.get(key)
+        with self._lock:
+            if value is not None:
+                self.hits += 1
+                self.bytes_saved += len(value)
+                return value
+            self.misses += 1
+
+        value = render()
+        self.backend.set(key, value)
+        return value
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
@@ -0,0 +1,239 @@
+"""Command line tool rendering QR Platba images from CSV or JSONL payments."""
+
+import argparse
+import collections
+import contextlib
+import csv
+import json
+import sys
+import time
+import zipfile
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from qrcode.exceptions import DataOverflowError
+
+from qrplatba.batch import render_many
+from qrplatba.payment import Payment, format_spayd
+from qrplatba.spayd import normalize_spayd
+from qrplatba.svg import PATH_MODES
+
+OUTPUT_FORMATS = ("svg", "png", "spayd")
+INPUT_FORMATS = ("csv", "jsonl")
+
+
+def _payment_from_row(row, line):
+    """Converts CSV/JSONL row to Payment. Columns not matching SpaydGenerator arguments are ignored."""
+    kwargs = {k: v for k, v in row.items() if k in Payment._fields and v is not None and v != ""}
+    if "account" not in kwargs:
+        raise ValueError(f"line {line}: account is required")
+
+    amount = kwargs.get("amount")
+    if isinstance(amount, str):
+        try:
+            kwargs["amount"] = Decimal(amount)
+        except InvalidOperation:
+            raise ValueError(f"line {line}: invalid amount {amount!r}") from None
+
+    alternate_accounts = kwargs.get("alternate_accounts")
+    if isinstance(alternate_accounts, str):
+        kwargs["alternate_accounts"] = alternate_accounts.split(",")
+
+    due_date = kwargs.get("due_date")
+    if isinstance(due_date, str) and "-" in due_date:
+        try:
+            kwargs["due_date"] = date.fromisoformat(due_date)
+        except ValueError:
+            raise ValueError(f"line {line}: invalid due date {due_date!r}") from None
+
+    return Payment(**kwargs)
+
+
+def _read_rows(stream, input_format, delimiter):
+    """Yields (line number, row dict) pairs, reading the input lazily"""
+    if input_format == "jsonl":
+        for line, text in enumerate(stream, 1):
+            if text.strip():
+                try:
+                    row = json.loads(text)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"line {line}: invalid JSON: {e}") from None
+                if not isinstance(row, dict):
+                    raise ValueError(f"line {line}: expected a JSON object")
+                yield line, row
+    else:
+        reader = csv.DictReader(stream, delimiter=delimiter)
+        for row in reader:
+            yield reader.line_num, row
+
+
+class _DirectoryOutput:
+    def __init__(self, path, extension):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.extension = extension
+
+    def write(self, name, data):
+        (self.path / f"{name}.{self.extension}").write_bytes(data)
+
+    def close(self):
+        pass
+
+
+class _ZipOutput:
+    def __init__(self, path, extension):
+        # PNG images are already compressed
+        compression = zipfile.ZIP_STORED if extension == "png" else zipfile.ZIP_DEFLATED
+        self.archive = zipfile.ZipFile(path, "w", compression=compression)
+        self.extension = extension
+
+    def write(self, name, data):
+        self.archive.writestr(f"{name}.{self.extension}", data)
+
+    def close(self):
+        self.archive.close()
+
+
+def _render_kwargs(args):
+    return {
+        "border": args.border,
+        "box_size": args.box_size,
+        "alphanumeric": args.alphanumeric,
+        "path_mode": args.path_mode,
+    }
+
+
+def _render_images(payments, args):
+    render_kwargs = _render_kwargs(args)
+    zoom = args.zoom
+    if zoom is not None and zoom.is_integer():
+        # resvg-py releases for Python 3.9 accept only integer zoom
+        zoom = int(zoom)
+    if args.jobs > 1:
+        from qrplatba.parallel import ParallelRenderer
+
+        with ParallelRenderer(args.jobs, args.chunk_size, format=args.format, zoom=zoom, **render_kwargs) as r:
+            yield from r.map(payments)
+    else:
+        yield from render_many(payments, args.format, zoom=zoom, **render_kwargs)
+
+
+def _overflowing_line(pending, args):
+    """Finds line of the first pending payment too long for a QR code, worker processes fail whole chunks"""
+    for line, _, payment in pending:
+        try:
+            next(render_many([payment], **_render_kwargs(args)))
+        except DataOverflowError:
+            return line
+    return pending[0][0]
+
+
+def run(args):
+    """Renders all payments from the input, returns number of processed rows"""
+    input_format = args.input_format
+    if input_format is None:
+        input_format = "jsonl" if args.input.endswith((".jsonl", ".ndjson")) else "csv"
+
+    with contextlib.ExitStack() as stack:
+        if args.input == "-":
+            source = sys.stdin
+        else:
+            source = stack.enter_context(open(args.input, newline="", encoding="utf-8"))
+
+        # (line, name, payment) submitted for rendering and not yet written, renderers consume payments ahead
+        pending = collections.deque()
+        # images with the same name would overwrite each other, names from line numbers are always unique
+        used_names = set() if args.name_field and args.format != "spayd" else None
+
+        def payments():
+            for line, row in _read_rows(source, input_format, args.delimiter):
+                name = str(row.get(args.name_field) or line) if args.name_field else str(line)
+                if used_names is not None:
+                    if name in used_names:
+                        raise ValueError(f"line {line}: duplicate name {name!r}")
+                    used_names.add(name)
+                payment = _payment_from_row(row, line)
+                pending.append((line, name, payment))
+                yield payment
+
+        count = 0
+        if args.format == "spayd":
+            if args.output in (None, "-"):
+                output = sys.stdout
+            else:
+                output = stack.enter_context(open(args.output, "w", encoding="utf-8"))
+            for payment in payments():
+                text = format_spayd(payment)
+                if args.alphanumeric:
+                    text = normalize_spayd(text)
+                output.write(json.dumps({"name": pending.popleft()[1], "spayd": text}) + "\n")
+                count += 1
+            return count
+
+        output_path = args.output or "."
+        output_class = _ZipOutput if output_path.endswith(".zip") else _DirectoryOutput
+        output = output_class(output_path, args.format)
+        stack.callback(output.close)
+
+        try:
+            for image in _render_images(payments(), args):
+                output.write(pending.popleft()[1], image)
+                count += 1
+        except DataOverflowError:
+            raise ValueError(f"line {_overflowing_line(pending, args)}: too much data for a QR code") from None
+        return count
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog="qrplatba",
+        description="Renders QR Platba images (or SPAYD strings) from payments in CSV or JSONL. "
+        "Columns are named after SpaydGenerator arguments (account, amount, x_vs, message, due_date, ...).",
+    )
+    parser.add_argument("input", nargs="?", default="-", help="input file, '-' for stdin (default)")
+    parser.add_argument("-i", "--input-format", choices=INPUT_FORMATS, help="default: by file extension, else csv")
+    parser.add_argument("-f", "--format", choices=OUTPUT_FORMATS, default="svg", help="output format (default: svg)")
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="output directory or .zip file for images (default: current directory), "
+        "JSONL file for spayd format (default: stdout)",
+    )
+    parser.add_argument("--name-field", help="column used for output file names (default: input line number)")
+    parser.add_argument("--delimiter", default=",", help="CSV delimiter (default: ',')")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="number of rendering processes (default: 1)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="payments sent to a process at once (default: 64)")
+    parser.add_argument("--border", type=int, default=2, help="outside border (default: 2)")
+    parser.add_argument("--box-size", type=int, default=10, help="box size, 10 equals 1 mm (default: 10)")
+    parser.add_argument("--zoom", type=float, help="PNG zoom")
+    parser.add_argument(
+        "--path-mode",
+        choices=PATH_MODES,
+        default="modules",
+        help="QR code path shape, 'contours' produces the smallest SVG (default: modules)",
+    )
+    parser.add_argument(
+        "--alphanumeric",
+        action="store_true",
+        help="convert SPAYD to uppercase without diacritics for smaller QR codes",
+    )
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not print throughput summary")
+    return parser
+
+
+def main(argv=None):
+    parser = get_parser()
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        count = run(args)
+    except (ValueError, ImportError, OSError) as e:
+        parser.exit(1, f"qrplatba: error: {e}\n")
+    elapsed = time.perf_counter() - start
+
+    if not args.quiet:
+        rate = count / elapsed if elapsed else 0
+        print(f"{count} payments processed in {elapsed:.2f} s ({rate:.1f} payments/s)", file=sys.stderr)
+    return 0
@@ -1,20 +1,222 @@
+import io
+
 import qrcode
 
-from qrplatba.spayd import SpaydGenerator
-from qrplatba.svg import QRPlatbaSVGImage
+from qrplatba.qr import make_qr
+from qrplatba.spayd import _FIELD_FORMATTERS, SpaydGenerator
+from qrplatba.svg import QRPlatbaSVGImage, SvgWriter
+from qrplatba.template import SpaydTemplate
+
+
+def _cache_key(cache, text, output_format, options, *, zoom, resvg_kwargs, alphanumeric, backend, path_mode):
+    """Returns ``RenderCache`` key of an image, ``options`` are the border, box size and error correction"""
+    key_options = dict(options)
+    if output_format.upper() == "PNG" and backend not in (None, "resvg"):
+        # keys of images rendered by the default backend stay the same
+        key_options["backend"] = backend
+    if path_mode != "modules":
+        key_options["path_mode"] = path_mode
+    return cache.make_key(
+        text,
+        output_format=output_format.upper(),
+        segment=alphanumeric,
+        zoom=zoom,
+        resvg_kwargs=sorted(resvg_kwargs.items()) if resvg_kwargs else None,
+        **key_options,
+    )
 
 
 class QRPlatbaGenerator(SpaydGenerator):
     """QR Platba generator -- creates SPAYD QR code images."""
 
-    def make_image(self, border=2, box_size=10, error_correction=qrcode.constants.ERROR_CORRECT_M):
-        qr = qrcode.QRCode(
-            version=None,
-            error_correction=error_correction,
+    @staticmethod
+    def from_template(account, *, variable_fields=("amount", "due_date", "x_vs"), **fields):
+        """
+        Returns ``QRPlatbaTemplate`` for payments which differ only in the variable fields, e.g. reminders of an
+        invoice: ``QRPlatbaGenerator.from_template(account, message=...).render(amount=..., x_vs=...)``
+
+        :param variable_fields: names of the fields set per payment, see ``qrplatba.template.SpaydTemplate``
+        """
+        return QRPlatbaTemplate(account, variable_fields=variable_fields, **fields)
+
+    def _make_qr(self, border, box_size, error_correction, alphanumeric=False):
+        return make_qr(
+            self.get_text(normalize=alphanumeric),
+            border,
+            box_size,
+            error_correction,
             image_factory=QRPlatbaSVGImage,
-            border=border,
-            box_size=box_size,
+            segment=alphanumeric,
         )
-        qr.add_data(self.get_text())
-        qr.make(fit=True)
-        return qr.make_image()
+
+    def make_image(
+        self,
+        border=2,
+        box_size=10,
+        error_correction=qrcode.constants.ERROR_CORRECT_M,
+        *,
+        alphanumeric=False,
+        path_mode="modules",
+    ):
+        """
+        Creates QR Platba image
+
+        :param alphanumeric: normalize the SPAYD string to uppercase without diacritics (see ``normalize_spayd``) and
+            split it into QR encoding modes optimally. This usually produces a smaller QR code, but the encoded
+            message and recipient name are uppercase.
+        :param path_mode: shape of the QR code path, ``"modules"`` (default), ``"runs"`` or ``"contours"`` for the
+            smallest SVG, see ``QRPlatbaSVGImage``
+        """
+        return self._make_qr(border, box_size, error_correction, alphanumeric).make_image(path_mode=path_mode)
+
+    async def make_image_async(
+        self,
+        border=2,
+        box_size=10,
+        error_correction=qrcode.constants.ERROR_CORRECT_M,
+        *,
+        alphanumeric=False,
+        path_mode="modules",
+        executor=None,
+    ):
+        """Async variant of ``make_image``, runs in the executor configured by ``qrplatba.aio.configure``"""
+        from qrplatba import aio  # asyncio is imported only by the async API
+
+        return await aio.run_in_executor(
+            self.make_image,
+            border,
+            box_size,
+            error_correction,
+            alphanumeric=alphanumeric,
+            path_mode=path_mode,
+            executor=executor,
+        )
+
+    def make_svg(
+        self,
+        border=2,
+        box_size=10,
+        error_correction=qrcode.constants.ERROR_CORRECT_M,
+        xml_declaration=True,
+        *,
+        alphanumeric=False,
+        path_mode="modules",
+    ):
+        """
+        Returns SVG document as ``bytes``, written directly from the QR code matrix.
+
+        Faster equivalent of ``make_image().save(stream)`` (or ``make_image().to_string()`` when ``xml_declaration``
+        is ``False``).
+        """
+        qr = self._make_qr(border, box_size, error_correction, alphanumeric)
+        writer = SvgWriter.for_geometry(qr.modules_count, border=border, box_size=box_size, path_mode=path_mode)
+        return writer.to_bytes(qr.modules, xml_declaration=xml_declaration)
+
+    def render(
+        self,
+        output_format="svg",
+        *,
+        border=2,
+        box_size=10,
+        error_correction=qrcode.constants.ERROR_CORRECT_M,
+        zoom=None,
+        resvg_kwargs=None,
+        alphanumeric=False,
+        cache=None,
+        backend=None,
+        path_mode="modules",
+    ):
+        """
+        Returns encoded image as ``bytes``, same as ``make_image().save(stream, output_format=...)``.
+
+        :param alphanumeric: see ``make_image``
+        :param backend: PNG rasterizer, see ``QRPlatbaSVGImage.save``
+        :param path_mode: shape of the QR code path, see ``make_image``
+        :param cache: optional ``qrplatba.cache.RenderCache``, images are then rendered only once per SPAYD string
+            and render options
+        """
+        if output_format.upper() not in ("SVG", "PNG"):
+            raise ValueError(f"Unsupported format: {output_format}")
+
+        options = {"border": border, "box_size": box_size, "error_correction": error_correction}
+
+        def render():
+            if output_format.upper() == "SVG":
+                return self.make_svg(alphanumeric=alphanumeric, path_mode=path_mode, **options)
+            buffer = io.BytesIO()
+            img = self.make_image(alphanumeric=alphanumeric, path_mode=path_mode, **options)
+            img.save(buffer, output_format=output_format, zoom=zoom, resvg_kwargs=resvg_kwargs, backend=backend)
+            return buffer.getvalue()
+
+        if cache is None:
+            return render()
+
+        key = _cache_key(
+            cache,
+            self.get_text(normalize=alphanumeric),
+            output_format,
+            options,
+            zoom=zoom,
+            resvg_kwargs=resvg_kwargs,
+            alphanumeric=alphanumeric,
+            backend=backend,
+            path_mode=path_mode,
+        )
+        return cache.get_or_render(key, render)
+
+
+class _TemplatePayment(QRPlatbaGenerator):
+    """
+    Payment of a ``QRPlatbaTemplate``, a generator with all fields of the payment set and the SPAYD string formatted
+    by the template. The fields are read-only, as the template formats the string from the values passed to ``fill``.
+    """
+
+    _frozen = False
+
+    def __init__(self, template, values):
+        for name in values:
+            if name not in template.defaults:
+                raise ValueError(f"Not a variable field of the template: {name}")
+        super().__init__(**{**template._fields, **values})
+        self._template = template
+        self._values = values
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if self._frozen:
+            raise AttributeError(f"Payment of a template is read-only, use fill() to set {name}")
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Payment of a template is read-only, use fill() to set {name}")
+
+    def get_text(self, normalize=False):
+        return self._template.get_text(normalize, **self._values)
+
+
+class QRPlatbaTemplate(SpaydTemplate):
+    """
+    QR Platba image template, see ``QRPlatbaGenerator.from_template``
+
+    The fixed part of the SPAYD string is serialized once, and the QR code matrices are built from the function
+    patterns cached per QR code version. Only the data modules are computed per payment.
+    """
+
+    @staticmethod
+    def _pop_values(kwargs):
+        return {name: kwargs.pop(name) for name in (*_FIELD_FORMATTERS, "account", "bic") if name in kwargs}
+
+    def fill(self, **values):
+        """Returns payment with the variable fields set, with the ``QRPlatbaGenerator`` rendering methods"""
+        return _TemplatePayment(self, values)
+
+    def make_image(self, *args, **kwargs):
+        """Creates QR Platba image, keyword arguments are variable field values and ``make_image`` options"""
+        return self.fill(**self._pop_values(kwargs)).make_image(*args, **kwargs)
+
+    def render(self, output_format="svg", **kwargs):
+        """
+        Returns encoded image as ``bytes``, keyword arguments are variable field values and
+        ``QRPlatbaGenerator.render`` options: ``render(amount=1200, x_vs=2034456, box_size=8)``
+        """
+        return self.fill(**self._pop_values(kwargs)).render(output_format, **kwargs)
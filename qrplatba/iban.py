@@ -0,0 +1,132 @@
+"""Bulk conversion of czech account numbers to IBAN with validation of the account number checksums."""
+
+import re
+import sys
+
+from qrplatba.spayd import _CZ_CHECKSUM_SUFFIX, _czech_to_iban
+
+_RE_CZ_ACCOUNT = re.compile(r"(?:(\d{1,6})-)?(\d{1,10})/(\d{4})")
+# weights of the mod 11 checksum of the zero padded 10 digit account number, the prefix uses the last six
+_ACCOUNT_WEIGHTS = (6, 3, 7, 9, 10, 5, 8, 4, 2, 1)
+
+
+def _checksum_table(weights):
+    hundreds, tens, ones = weights
+    return [hundreds * a + tens * b + ones * c for a in range(10) for b in range(10) for c in range(10)]
+
+
+# weighted digit sums of all three digit groups of the account number, from the lowest digits
+_CHECKSUM_LOW = _checksum_table(_ACCOUNT_WEIGHTS[7:])
+_CHECKSUM_MID = _checksum_table(_ACCOUNT_WEIGHTS[4:7])
+_CHECKSUM_HIGH = _checksum_table(_ACCOUNT_WEIGHTS[1:4])
+
+
+def _account_checksum_valid(digits):
+    rest, low = divmod(int(digits), 1000)
+    rest, mid = divmod(rest, 1000)
+    first, high = divmod(rest, 1000)
+    return (_CHECKSUM_LOW[low] + _CHECKSUM_MID[mid] + _CHECKSUM_HIGH[high] + _ACCOUNT_WEIGHTS[0] * first) % 11 == 0
+
+
+def _accounts_to_iban_list(accounts):
+    ibans = []
+    valid = []
+    for account in accounts:
+        m = _RE_CZ_ACCOUNT.fullmatch(account) if isinstance(account, str) else None
+        if m is None:
+            ibans.append(None)
+            valid.append(False)
+            continue
+        prefix, number, bank_code = m.groups()
+        if (prefix is None or _account_checksum_valid(prefix)) and _account_checksum_valid(number):
+            ibans.append(_czech_to_iban(prefix or 0, number, bank_code))
+            valid.append(True)
+        else:
+            ibans.append(None)
+            valid.append(False)
+    return ibans, valid
+
+
+def _accounts_to_iban_array(np, accounts):
+    accounts = np.asarray(accounts)
+    if accounts.dtype.kind != "U":
+        accounts = accounts.astype(str)
+    try:
+        encoded = np.ascontiguousarray(accounts.ravel().astype("S"))
+    except UnicodeEncodeError:
+        ibans, valid = _accounts_to_iban_list(accounts.ravel().tolist())
+        return np.array([iban or "" for iban in ibans], dtype="U24"), np.array(valid, dtype=bool)
+
+    # one row of ASCII codes per account, NUL padded on the right
+    count = len(encoded)
+    chars = encoded.view(np.uint8).reshape(count, encoded.itemsize)
+    rows = np.arange(count)[:, None]
+    is_digit = (chars >= ord("0")) & (chars <= ord("9"))
+    is_slash = chars == ord("/")
+    is_dash = chars == ord("-")
+    length = np.count_nonzero(chars, axis=1)
+    dashes = np.count_nonzero(is_dash, axis=1)
+
+    # valid accounts are [prefix-]number/bank: the slash is the fifth character from the end, and apart from the
+    # slash and an optional dash all characters are digits
+    slash_pos = length - 5
+    dash_pos = np.where(dashes == 1, is_dash.argmax(axis=1), -1)
+    number_length = slash_pos - dash_pos - 1
+    valid = (
+        (np.count_nonzero(is_slash, axis=1) == 1)
+        & is_slash[rows[:, 0], np.clip(slash_pos, 0, None)]
+        & (dashes <= 1)
+        & (np.count_nonzero(is_digit, axis=1) == length - 1 - dashes)
+        & (dash_pos != 0)
+        & (dash_pos <= 6)
+        & (number_length >= 1)
+        & (number_length <= 10)
+    )
+
+    # fixed width digit arrays: right aligned and zero padded prefix (6), number (10) and bank code (4)
+    offset = 16
+    padded = np.full((count, chars.shape[1] + offset), ord("0"), dtype=np.uint8)
+    padded[:, offset:] = chars
+    number_index = slash_pos[:, None] - 10 + np.arange(10)
+    number = np.where(number_index > dash_pos[:, None], padded[rows, number_index + offset], ord("0"))
+    prefix_index = dash_pos[:, None] - 6 + np.arange(6)
+    prefix = np.where(prefix_index >= 0, padded[rows, prefix_index + offset], ord("0"))
+    bank_code = padded[rows, slash_pos[:, None] + 1 + np.arange(4) + offset]
+    bban = np.concatenate((bank_code, prefix, number), axis=1).astype(np.uint8)
+    digits = bban.astype(np.int64) - ord("0")
+
+    weights = np.array(_ACCOUNT_WEIGHTS, dtype=np.int64)
+    valid &= (digits[:, 4:10] @ weights[4:]) % 11 == 0
+    valid &= (digits[:, 10:] @ weights) % 11 == 0
+
+    # mod 97 of the 26 digit number BBAN + "123500" as a dot product with the powers of 10 modulo 97
+    powers = np.array([pow(10, 25 - i, 97) for i in range(26)], dtype=np.int64)
+    suffix = sum(int(digit) * power for digit, power in zip(_CZ_CHECKSUM_SUFFIX, powers[20:].tolist()))
+    check = 98 - (digits @ powers[:20] + suffix) % 97
+
+    iban = np.empty((count, 24), dtype=np.uint8)
+    iban[:, 0] = ord("C")
+    iban[:, 1] = ord("Z")
+    iban[:, 2] = check // 10 + ord("0")
+    iban[:, 3] = check % 10 + ord("0")
+    iban[:, 4:] = bban
+    ibans = np.where(valid, iban.view("S24").ravel().astype("U24"), "")
+    return ibans.reshape(accounts.shape), valid.reshape(accounts.shape)
+
+
+def accounts_to_iban(accounts):
+    """
+    Converts czech account numbers (e.g. 12-123456789/0300) to IBANs in bulk, returns tuple (ibans, valid).
+
+    An account is valid if it is in the ``[prefix-]number/bank`` format and both the prefix and the number pass the
+    mod 11 checksum of czech account numbers. For NumPy arrays (or objects convertible to them, like Arrow or pandas
+    columns) the checksums are computed over fixed width digit arrays and the result are NumPy arrays, with empty
+    strings for invalid accounts. Other sequences are converted row by row to lists, with ``None`` for invalid
+    accounts.
+
+    :param accounts: sequence or array of account number strings
+    """
+    np = sys.modules.get("numpy")  # an array can only be passed in if NumPy is already imported
+    if np is not None and hasattr(accounts, "__array__"):
+        return _accounts_to_iban_array(np, accounts)
+    return _accounts_to_iban_list(accounts)
@@ -0,0 +1,162 @@
+"""
+Instrumentation of the generation stages, reporting their durations and output sizes to observers.
+
+Observers are called synchronously by the thread that ran the stage, with the stage name, its duration in seconds and
+size of its output in bytes (``None`` when the stage has no byte output or the size isn't known):
+
+- ``"spayd"``: ``SpaydGenerator.get_text`` and ``SpaydTemplate.get_text``, size of the UTF-8 encoded SPAYD string
+- ``"qr"``: QR code version selection and matrix construction (``make_qr``, ``make_modules``)
+- ``"svg_tree"``: ``QRPlatbaSVGImage`` element tree construction, from ``_svg`` to the QR code path
+- ``"svg_serialize"``: serialization of the ``QRPlatbaSVGImage`` tree (``save``, ``to_string``, ``render_into``)
+- ``"svg_write"``: SVG document written directly from the matrix by ``SvgWriter`` (``make_svg``, ``render``)
+- ``"png"``: rasterization by resvg
+- ``"png_native"``: rasterization by ``qrplatba.raster``
+- ``"png_composite"``: modules painted over the frame rasterized by resvg (``qrplatba.raster.render_composite_png``)
+
+Without observers the instrumented code only checks that the observer list is empty.
+"""
+
+import bisect
+import contextlib
+import copy
+import itertools
+import math
+import threading
+import time
+from typing import NamedTuple, Optional
+
+# registered observers, replaced as a whole under the lock so that reporting threads never see a partial update
+_observers = []
+_lock = threading.Lock()
+
+
+def add_observer(observer):
+    """
+    Registers observer of the stage timings for the whole process
+
+    :param observer: callable ``observer(stage, seconds, size)``
+    """
+    with _lock:
+        _observers[:] = [*_observers, observer]
+
+
+def remove_observer(observer):
+    """Unregisters observer registered by ``add_observer``"""
+    with _lock:
+        observers = list(_observers)
+        observers.remove(observer)
+        _observers[:] = observers
+
+
+@contextlib.contextmanager
+def observe(observer):
+    """Context manager registering the observer for the duration of the block, returns the observer"""
+    add_observer(observer)
+    try:
+        yield observer
+    finally:
+        remove_observer(observer)
+
+
+def _report(stage, start, size=None):
+    """
+    Reports stage started at ``start`` to the observers, instrumented code checks for observers before the stage:
+    ``start = time.perf_counter() if _observers else None``
+    """
+    seconds = time.perf_counter() - start
+    for observer in tuple(_observers):
+        observer(stage, seconds, size)
+
+
+class StageStats(NamedTuple):
+    """Aggregated timings of a stage, durations in seconds"""
+
+    count: int
+    total: float
+    mean: float
+    min: float
+    max: float
+    p50: float
+    p90: float
+    p99: float
+    # total output size in bytes, None if the stage reported no sizes
+    size: Optional[int]
+
+
+class _Histogram:
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.size = None
+
+
+class HistogramObserver:
+    """
+    Observer aggregating stage durations into log-scale histograms in-process
+
+    Durations are counted in buckets growing by ``2 ** (1 / buckets_per_octave)``, so percentiles are estimated with
+    a relative error under half of the bucket width (about 4.5 % with the default 8 buckets per octave) in constant
+    memory per stage. The observer is thread-safe.
+
+    ``with instrument.observe(HistogramObserver()) as histograms: ...`` then ``histograms.stats()``
+    """
+
+    def __init__(self, buckets_per_octave=8):
+        if buckets_per_octave < 1:
+            raise ValueError(f"Invalid number of buckets per octave (was {buckets_per_octave}, expected at least 1)")
+        self.buckets_per_octave = buckets_per_octave
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, stage, seconds, size):
+        # bucket of durations in (2 ** ((index - 1) / buckets_per_octave), 2 ** (index / buckets_per_octave)] ns
+        index = math.ceil(math.log2(max(seconds * 1e9, 1)) * self.buckets_per_octave)
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = _Histogram()
+            histogram.buckets[index] = histogram.buckets.get(index, 0) + 1
+            histogram.count += 1
+            histogram.total += seconds
+            histogram.min = min(histogram.min, seconds)
+            histogram.max = max(histogram.max, seconds)
+            if size is not None:
+                histogram.size = (histogram.size or 0) + size
+
+    def _percentile(self, histogram, indexes, cumulative, percent):
+        # geometric middle of the bucket with the percentile, clamped by the observed extremes
+        index = indexes[bisect.bisect_left(cumulative, histogram.count * percent / 100)]
+        middle = 2 ** ((index - 0.5) / self.buckets_per_octave) / 1e9
+        return min(max(middle, histogram.min), histogram.max)
+
+    def stats(self):
+        """Returns dict of ``StageStats`` by stage name"""
+        with self._lock:
+            snapshots = [
+                (stage, copy.copy(histogram), sorted(histogram.buckets.items()))
+                for stage, histogram in self._histograms.items()
+            ]
+
+        stats = {}
+        for stage, histogram, buckets in snapshots:
+            indexes = [index for index, _ in buckets]
+            cumulative = list(itertools.accumulate(bucket_count for _, bucket_count in buckets))
+            percentiles = [self._percentile(histogram, indexes, cumulative, p) for p in (50, 90, 99)]
+            stats[stage] = StageStats(
+                histogram.count,
+                histogram.total,
+                histogram.total / histogram.count,
+                histogram.min,
+                histogram.max,
+                *percentiles,
+                histogram.size,
+            )
+        return stats
+
+    def reset(self):
+        """Drops all aggregated timings"""
+        with self._lock:
+            self._histograms = {}
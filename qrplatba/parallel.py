@@ -0,0 +1,138 @@
+import collections
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import qrcode
+
+from qrplatba.batch import SUPPORTED_FORMATS, render_many
+from qrplatba.svg import PATH_MODES, _import_resvg, _resvg_options
+
+# render settings of the current worker process, prepared once by _init_worker
+_worker_settings = None
+
+
+def _init_worker(settings):
+    global _worker_settings
+
+    settings = dict(settings)
+    zoom, resvg_kwargs = settings.pop("zoom"), settings.pop("resvg_kwargs")
+    if settings["format"].upper() == "PNG":
+        _import_resvg()
+        settings["resvg_kwargs"] = _resvg_options(zoom=zoom, resvg_kwargs=resvg_kwargs)
+    _worker_settings = settings
+
+
+def _render_chunk(chunk):
+    return list(render_many(chunk, **_worker_settings))
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+class ParallelRenderer:
+    """
+    Renders PNG (or SVG) images of many payments in a pool of worker processes.
+
+    Payments are sent to the workers in chunks of ``chunk_size`` and the images are returned in input order.
+    At most ``max_pending`` chunks are in flight at a time, so the payments iterable is consumed lazily.
+    Use as a context manager (or call ``close()``) to shut the worker processes down.
+    """
+
+    def __init__(
+        self,
+        workers=None,
+        chunk_size=64,
+        *,
+        max_pending=None,
+        format="png",
+        border=2,
+        box_size=10,
+        error_correction=qrcode.constants.ERROR_CORRECT_M,
+        alphanumeric=False,
+        path_mode="modules",
+        zoom=None,
+        resvg_kwargs=None,
+    ):
+        """
+        :param workers: number of worker processes, defaults to the number of CPUs
+        :param chunk_size: number of payments sent to a worker at once
+        :param max_pending: maximum number of chunks submitted at once, defaults to twice the number of workers
+        :param format: output format, ``"png"`` or ``"svg"``
+        :param border: outside border, same as in ``QRPlatbaGenerator.make_image``
+        :param box_size: box size, same as in ``QRPlatbaGenerator.make_image``
+        :param error_correction: error correction level, same as in ``QRPlatbaGenerator.make_image``
+        :param alphanumeric: normalize and segment SPAYD strings, same as in ``QRPlatbaGenerator.make_image``
+        :param path_mode: shape of the QR code path, same as in ``QRPlatbaGenerator.make_image``
+        :param zoom: PNG zoom, same as in ``QRPlatbaSVGImage.save``
+        :param resvg_kwargs: extra arguments for resvg, same as in ``QRPlatbaSVGImage.save``
+        """
+        if format.upper() not in SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported format: {format}")
+        if format.upper() == "PNG":
+            _import_resvg()
+        if path_mode not in PATH_MODES:
+            raise ValueError(f"Unsupported path mode: {path_mode}")
+        if chunk_size < 1:
+            raise ValueError(f"Invalid chunk size (was {chunk_size}, expected larger than 0)")
+
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending or 2 * self.workers
+        self._settings = {
+            "format": format,
+            "border": border,
+            "box_size": box_size,
+            "error_correction": error_correction,
+            "alphanumeric": alphanumeric,
+            "path_mode": path_mode,
+            "zoom": zoom,
+            "resvg_kwargs": resvg_kwargs,
+        }
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self._settings,),
+            )
+        return self._executor
+
+    def map(self, payments):
+        """
+        Renders payments, yielding encoded images in input order.
+
+        :param payments: iterable of SPAYD strings, ``Payment`` records, ``SpaydGenerator`` instances or dicts with
+            ``SpaydGenerator`` arguments
+        """
+        executor = self._get_executor()
+        pending = collections.deque()
+
+        for chunk in _chunks(payments, self.chunk_size):
+            pending.append(executor.submit(_render_chunk, chunk))
+            if len(pending) >= self.max_pending:
+                yield from pending.popleft().result()
+
+        while pending:
+            yield from pending.popleft().result()
+
+    def render(self, payments):
+        """Renders payments, returning list of encoded images in input order."""
+        return list(self.map(payments))
+
+    def close(self):
+        """Shuts down the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
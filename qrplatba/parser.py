@@ -0,0 +1,231 @@
+"""SPAYD string parser and validator."""
+
+import functools
+import re
+import zlib
+from datetime import date
+from decimal import Decimal
+from typing import NamedTuple, Optional
+
+from qrplatba.payment import Payment
+
+
+class SpaydError(NamedTuple):
+    """Validation error of a SPAYD string, ``key`` is ``None`` for errors of the string as a whole"""
+
+    key: Optional[str]
+    message: str
+
+
+class InvalidSpaydError(ValueError):
+    """Raised by ``SpaydParser.parse`` for invalid SPAYD strings, all errors are in ``errors``"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(
+            "Invalid SPAYD string: " + "; ".join(f"{e.key}: {e.message}" if e.key else e.message for e in errors)
+        )
+
+
+class ParseResult(NamedTuple):
+    """Result of a single string of ``SpaydParser.parse_many``, ``payment`` is ``None`` if there are any errors"""
+
+    index: int
+    payment: Optional[Payment]
+    errors: tuple
+
+
+_RE_IBAN = re.compile(r"[A-Z]{2}\d{2}[A-Z0-9]{11,30}")
+_RE_BIC = re.compile(r"[A-Z]{6}[A-Z0-9]{2}(?:[A-Z0-9]{3})?")
+_RE_AMOUNT = re.compile(r"\d+(?:\.\d{1,2})?")
+_RE_CURRENCY = re.compile(r"[A-Z]{3}")
+_RE_DIGITS = re.compile(r"\d+")
+_RE_DATE = re.compile(r"\d{8}")
+_RE_NOTIFICATION_TYPE = re.compile(r"[PE]")
+_RE_CRC32 = re.compile(r"[0-9A-Fa-f]{8}")
+# IBAN letters are converted to numbers (A=10 ... Z=35) for the checksum
+_IBAN_DIGITS = str.maketrans({chr(c): str(c - 55) for c in range(ord("A"), ord("Z") + 1)})
+
+
+@functools.lru_cache(maxsize=8192)
+def _account_error(account):
+    """Returns error message of an IBAN with optional BIC (IBAN+BIC), ``None`` if it is valid"""
+    iban, _, bic = account.partition("+")
+    if not _RE_IBAN.fullmatch(iban):
+        return f"Invalid IBAN: {iban}"
+    if int((iban[4:] + iban[:4]).translate(_IBAN_DIGITS)) % 97 != 1:
+        return f"Invalid IBAN checksum: {iban}"
+    if bic and not _RE_BIC.fullmatch(bic):
+        return f"Invalid BIC: {bic}"
+    return None
+
+
+def _to_date(value):
+    try:
+        return date(int(value[:4]), int(value[4:6]), int(value[6:]))
+    except ValueError:
+        raise ValueError(f"Invalid date: {value}") from None
+
+
+def _to_alternate_accounts(value):
+    accounts = tuple(value.split(","))
+    for account in accounts:
+        error = _account_error(account)
+        if error is not None:
+            raise ValueError(error)
+    return accounts
+
+
+# SPAYD key: (Payment field, maximum length, value pattern, conversion), as in the SPAYD specification
+_SPAYD_FIELDS = {
+    "ALT-ACC": ("alternate_accounts", 93, None, _to_alternate_accounts),
+    "AM": ("amount", 10, _RE_AMOUNT, Decimal),
+    "CC": ("currency", 3, _RE_CURRENCY, None),
+    "RF": ("reference", 16, _RE_DIGITS, None),
+    "RN": ("recipient_name", 35, None, None),
+    "DT": ("due_date", 8, _RE_DATE, _to_date),
+    "PT": ("payment_type", 3, None, None),
+    "MSG": ("message", 60, None, None),
+    "NT": ("notification_type", 1, _RE_NOTIFICATION_TYPE, None),
+    "NTA": ("notification_address", 320, None, None),
+    "X-PER": ("x_per", 2, _RE_DIGITS, None),
+    "X-VS": ("x_vs", 10, _RE_DIGITS, None),
+    "X-SS": ("x_ss", 10, _RE_DIGITS, None),
+    "X-KS": ("x_ks", 10, _RE_DIGITS, None),
+    "X-ID": ("x_id", 20, None, None),
+    "X-URL": ("x_url", 140, None, None),
+}
+_PAYMENT_INDEX = {name: index for index, name in enumerate(Payment._fields)}
+
+
+def _crc32(fields):
+    """
+    Returns CRC32 checksum of the SPAYD fields as 8 uppercase hex digits, computed from the canonical form of the
+    string: the header followed by the fields other than CRC32 sorted by key
+    """
+    canonical = sorted(
+        (part for part in fields if part.partition(":")[0] != "CRC32"), key=lambda p: p.partition(":")[0]
+    )
+    return f"{zlib.crc32('*'.join(['SPD*1.0', *canonical]).encode()):08X}"
+
+
+class SpaydParser:
+    """
+    SPAYD (Short Payment Descriptor) string parser and validator.
+
+    Strings are decoded to ``Payment`` records with the fields of ``SpaydGenerator``. Amounts are parsed as
+    ``Decimal``, due dates as ``date`` and alternate accounts as a tuple, all other values are kept as strings (with
+    leading zeros of symbols and references). The ``CRC32`` checksum is verified if present.
+
+    ``format_spayd`` (or ``SpaydGenerator.get_text()``) of the parsed record returns the original string for strings
+    in the form ``SpaydGenerator`` produces. Other valid strings are re-serialized in that form: with the fields in
+    the ``SpaydGenerator`` order, amounts with two decimal places (``AM:450.5`` as ``AM:450.50``), without the
+    ``CRC32`` field and without a trailing ``*``.
+    """
+
+    def __init__(self, allow_unknown_keys=False):
+        """
+        :param allow_unknown_keys: ignore keys which ``SpaydGenerator`` doesn't produce (e.g. custom X- keys) instead
+            of reporting them as errors
+        """
+        self.allow_unknown_keys = allow_unknown_keys
+
+    def _parse(self, text):
+        """Returns tuple (payment, errors), payment is ``None`` if there are any errors"""
+        parts = text.split("*")
+        if len(parts) < 2 or parts[0] != "SPD":
+            return None, [SpaydError(None, "Missing SPD header")]
+        if parts[1] != "1.0":
+            return None, [SpaydError(None, f"Unsupported SPAYD version: {parts[1]}")]
+        fields = parts[2:]
+        if fields and not fields[-1]:
+            fields.pop()  # the string may end with "*"
+
+        values = [None] * len(_PAYMENT_INDEX)
+        errors = []
+        seen = set()
+        crc = None
+        for part in fields:
+            key, separator, value = part.partition(":")
+            if not separator:
+                errors.append(SpaydError(None, f"Invalid field: {part}"))
+                continue
+            if key in seen:
+                errors.append(SpaydError(key, "Duplicate key"))
+                continue
+            seen.add(key)
+
+            if key == "ACC":
+                if len(value) > 46:
+                    errors.append(SpaydError(key, f"Value too long (was {len(value)}, expected at most 46)"))
+                    continue
+                error = _account_error(value)
+                if error is not None:
+                    errors.append(SpaydError(key, error))
+                    continue
+                account, _, bic = value.partition("+")
+                values[0] = account
+                values[1] = bic or None
+                continue
+            if key == "CRC32":
+                if not _RE_CRC32.fullmatch(value):
+                    errors.append(SpaydError(key, f"Invalid value: {value}"))
+                else:
+                    crc = value
+                continue
+
+            field = _SPAYD_FIELDS.get(key)
+            if field is None:
+                if not self.allow_unknown_keys:
+                    errors.append(SpaydError(key, "Unknown key"))
+                continue
+            name, max_length, pattern, convert = field
+            if not value:
+                errors.append(SpaydError(key, "Empty value"))
+            elif len(value) > max_length:
+                errors.append(SpaydError(key, f"Value too long (was {len(value)}, expected at most {max_length})"))
+            elif pattern is not None and not pattern.fullmatch(value):
+                errors.append(SpaydError(key, f"Invalid value: {value}"))
+            elif convert is None:
+                values[_PAYMENT_INDEX[name]] = value
+            else:
+                try:
+                    values[_PAYMENT_INDEX[name]] = convert(value)
+                except ValueError as e:
+                    errors.append(SpaydError(key, str(e)))
+
+        if "ACC" not in seen:
+            errors.append(SpaydError("ACC", "Missing account"))
+        if crc is not None:
+            expected = _crc32(fields)
+            if crc.upper() != expected:
+                errors.append(SpaydError("CRC32", f"Invalid checksum (was {crc}, expected {expected})"))
+        if errors:
+            return None, errors
+        return Payment._make(values), errors
+
+    def validate(self, text):
+        """Returns list of ``SpaydError`` of the SPAYD string, empty if the string is valid"""
+        return self._parse(text)[1]
+
+    def parse(self, text):
+        """
+        Returns ``Payment`` record of the SPAYD string
+
+        :raises InvalidSpaydError: if the string is not valid, with all errors in its ``errors`` attribute
+        """
+        payment, errors = self._parse(text)
+        if errors:
+            raise InvalidSpaydError(errors)
+        return payment
+
+    def parse_many(self, texts):
+        """
+        Parses an iterable of SPAYD strings, invalid strings don't stop the batch.
+
+        Yields ``ParseResult(index, payment, errors)`` for every string in the input order.
+        """
+        parse = self._parse
+        for index, text in enumerate(texts):
+            payment, errors = parse(text)
+            yield ParseResult(index, payment, tuple(errors))
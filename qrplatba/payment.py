@@ -0,0 +1,94 @@
+"""Compact payment records and their one-pass SPAYD serialization."""
+
+from datetime import date, datetime
+from typing import Any, NamedTuple, Optional
+
+from qrplatba.spayd import account_to_iban
+
+
+class Payment(NamedTuple):
+    """Compact payment record with the same fields as ``SpaydGenerator`` arguments, see ``format_spayd``"""
+
+    account: str
+    bic: Optional[str] = None
+    amount: Any = None
+    currency: Optional[str] = None
+    x_vs: Any = None
+    x_ss: Any = None
+    x_ks: Any = None
+    alternate_accounts: Any = None
+    recipient_name: Optional[str] = None
+    due_date: Any = None
+    payment_type: Any = None
+    message: Optional[str] = None
+    notification_type: Optional[str] = None
+    notification_address: Optional[str] = None
+    x_per: Any = None
+    x_id: Any = None
+    x_url: Optional[str] = None
+    reference: Any = None
+
+
+def format_spayd(payment):
+    """
+    Returns SPAYD string of a ``Payment`` record in a single pass, same as ``SpaydGenerator.get_text()``
+
+    Empty fields (``None`` or empty string) are skipped.
+    """
+    (
+        account,
+        bic,
+        amount,
+        currency,
+        x_vs,
+        x_ss,
+        x_ks,
+        alternate_accounts,
+        recipient_name,
+        due_date,
+        payment_type,
+        message,
+        notification_type,
+        notification_address,
+        x_per,
+        x_id,
+        x_url,
+        reference,
+    ) = payment
+    if account is None:
+        raise ValueError("account is required")
+
+    iban = account_to_iban(account)
+    parts = ["SPD*1.0", f"ACC:{iban}+{bic}" if bic else f"ACC:{iban}"]
+    if alternate_accounts:
+        parts.append("ALT-ACC:" + ",".join(map(account_to_iban, alternate_accounts)))
+    if amount is not None:
+        parts.append(f"AM:{amount:.2f}")
+
+    for name, value in (("CC", currency), ("RF", reference), ("RN", recipient_name)):
+        if value is not None and value != "":
+            parts.append(f"{name}:{value}")
+
+    if due_date is not None:
+        if isinstance(due_date, datetime):
+            due_date = due_date.date()
+        if isinstance(due_date, date):
+            due_date = due_date.isoformat().replace("-", "")
+        parts.append(f"DT:{due_date}")
+
+    for name, value in (
+        ("PT", payment_type),
+        ("MSG", message),
+        ("NT", notification_type),
+        ("NTA", notification_address),
+        ("X-PER", x_per),
+        ("X-VS", x_vs),
+        ("X-SS", x_ss),
+        ("X-KS", x_ks),
+        ("X-ID", x_id),
+        ("X-URL", x_url),
+    ):
+        if value is not None and value != "":
+            parts.append(f"{name}:{value}")
+
+    return "*".join(parts).rstrip("*")
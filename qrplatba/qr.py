@@ -0,0 +1,274 @@
+"""QR code matrix construction with direct version selection."""
+
+import functools
+import itertools
+import time
+from bisect import bisect_left
+from typing import NamedTuple
+
+import qrcode
+from qrcode import util
+from qrcode.exceptions import DataOverflowError
+
+from qrplatba.instrument import _observers, _report
+
+# versions sharing the same character count indicator sizes (QR code specification, table 3)
+_VERSION_GROUPS = ((1, 9), (10, 26), (27, 40))
+
+_MODES = (util.MODE_NUMBER, util.MODE_ALPHA_NUM, util.MODE_8BIT_BYTE)
+# cost of a single character in each mode, in sixths of a bit to keep the numbers integer
+_CHAR_COSTS = {util.MODE_NUMBER: 20, util.MODE_ALPHA_NUM: 33, util.MODE_8BIT_BYTE: 48}
+_DIGITS = frozenset(b"0123456789")
+_ALPHA_NUM = frozenset(util.ALPHA_NUM)
+
+
+def _data_bits(data):
+    """Number of bits of QRData payload, without mode and length indicators"""
+    length = len(data)
+    if data.mode == util.MODE_NUMBER:
+        return 10 * (length // 3) + (0, 4, 7)[length % 3]
+    if data.mode == util.MODE_ALPHA_NUM:
+        return 11 * (length // 2) + 6 * (length % 2)
+    return 8 * length
+
+
+def fit_version(data_list, error_correction=qrcode.constants.ERROR_CORRECT_M):
+    """
+    Returns the smallest QR code version fitting the data, same as ``QRCode.best_fit()``
+
+    The encoded length is computed arithmetically for each group of versions with the same length indicator sizes and
+    looked up in the capacity table, without writing the data into a bit buffer.
+
+    :param data_list: list of ``qrcode.util.QRData`` chunks
+    """
+    limits = util.BIT_LIMIT_TABLE[error_correction]
+    payload_bits = sum(4 + _data_bits(data) for data in data_list)
+
+    for first, last in _VERSION_GROUPS:
+        mode_sizes = util.mode_sizes_for_version(first)
+        needed_bits = payload_bits + sum(mode_sizes[data.mode] for data in data_list)
+        version = bisect_left(limits, needed_bits, first, last + 1)
+        if version <= last:
+            return version
+    raise DataOverflowError()
+
+
+def _segment(data, mode_sizes):
+    """
+    Splits data into QRData chunks with the smallest total encoded size for the given length indicator sizes.
+
+    Dynamic programming over characters: ``costs[mode]`` is the smallest cost of the data so far, ending with a
+    segment in ``mode``. Switching to another mode costs the mode and length indicators of the new segment.
+    """
+    head_costs = {mode: (4 + mode_sizes[mode]) * 6 for mode in _MODES}
+    costs = dict(head_costs)
+    char_modes = []
+
+    for byte in data:
+        allowed = [util.MODE_8BIT_BYTE]
+        if byte in _ALPHA_NUM:
+            allowed.append(util.MODE_ALPHA_NUM)
+            if byte in _DIGITS:
+                allowed.append(util.MODE_NUMBER)
+
+        new_costs = {mode: costs[mode] + _CHAR_COSTS[mode] for mode in allowed}
+        modes = {mode: mode for mode in allowed}
+        for to_mode in _MODES:
+            for from_mode in allowed:
+                # segment ending in from_mode is padded to whole bits
+                cost = -(-new_costs[from_mode] // 6) * 6 + head_costs[to_mode]
+                if cost < new_costs.get(to_mode, cost + 1):
+                    new_costs[to_mode] = cost
+                    modes[to_mode] = modes[from_mode]
+        char_modes.append(modes)
+        costs = new_costs
+
+    # walk back from the cheapest final mode, collecting the mode of every character
+    mode = min(costs, key=costs.get)
+    modes = []
+    for i in range(len(data) - 1, -1, -1):
+        mode = char_modes[i][mode]
+        modes.append(mode)
+    modes.reverse()
+
+    data_list = []
+    start = 0
+    for mode, group in itertools.groupby(modes):
+        end = start + len(list(group))
+        data_list.append(util.QRData(data[start:end], mode=mode, check_data=False))
+        start = end
+    return data_list
+
+
+def optimal_segments(text, error_correction=qrcode.constants.ERROR_CORRECT_M):
+    """
+    Returns ``(data_list, version)`` with the text split into numeric, alphanumeric and byte mode segments of the
+    smallest total size, and the QR code version fitting them.
+
+    Unlike ``QRCode.add_data``, which only switches mode for runs of at least 20 characters, every run is considered.
+    """
+    data = util.to_bytestring(text)
+    mode_sizes = util.mode_sizes_for_version(1)
+    while True:
+        data_list = _segment(data, mode_sizes)
+        version = fit_version(data_list, error_correction)
+        if util.mode_sizes_for_version(version) is mode_sizes:
+            return data_list, version
+        mode_sizes = util.mode_sizes_for_version(version)
+
+
+class _VersionLayout(NamedTuple):
+    """Data independent part of the QR code matrix of a version"""
+
+    size: int
+    # number of data modules (data and error correction codewords and remainder bits)
+    data_modules: int
+    # for every module (row by row), index of its value in the data modules followed by all modules of the version
+    sources: list
+    # data modules flipped by each mask pattern as an int, with the first module in the highest bit
+    masks: tuple
+
+
+def _function_patterns(version, error_correction, test, mask_pattern):
+    """Returns matrix with the function patterns and format information, data modules are ``None``"""
+    qr = qrcode.QRCode(version=version, error_correction=error_correction)
+    size = qr.modules_count = version * 4 + 17
+    qr.modules = [[None] * size for _ in range(size)]
+    qr.setup_position_probe_pattern(0, 0)
+    qr.setup_position_probe_pattern(size - 7, 0)
+    qr.setup_position_probe_pattern(0, size - 7)
+    qr.setup_position_adjust_pattern()
+    qr.setup_timing_pattern()
+    qr.setup_type_info(test, mask_pattern)
+    if version >= 7:
+        qr.setup_type_number(test)
+    return qr.modules
+
+
+@functools.cache
+def _version_layout(version):
+    modules = _function_patterns(version, qrcode.constants.ERROR_CORRECT_M, True, 0)
+    size = len(modules)
+
+    # data modules in the order of QRCode.map_data: two column wide zig-zag from the bottom right corner
+    order = []
+    row, step = size - 1, -1
+    for col in range(size - 1, 0, -2):
+        if col <= 6:
+            col -= 1
+        while 0 <= row < size:
+            order.extend((row, c) for c in (col, col - 1) if modules[row][c] is None)
+            row += step
+        row -= step
+        step = -step
+
+    sources = list(range(len(order), len(order) + size * size))
+    for index, (row, col) in enumerate(order):
+        sources[row * size + col] = index
+    masks = []
+    for pattern in range(8):
+        mask = util.mask_func(pattern)
+        masks.append(int("".join("1" if mask(row, col) else "0" for row, col in order), 2))
+    return _VersionLayout(size, len(order), sources, tuple(masks))
+
+
+@functools.cache
+def _fixed_modules(version, error_correction, test, mask_pattern):
+    """Returns all modules of the version as a string of 0 and 1, data modules are 0"""
+    modules = _function_patterns(version, error_correction, test, mask_pattern)
+    return "".join("1" if module else "0" for line in modules for module in line)
+
+
+_MODULE_VALUES = {"0": False, "1": True}
+
+
+def _make_modules(layout, data_bits, fixed):
+    """Returns the matrix of the data modules (as an int, see ``_VersionLayout.masks``) and fixed modules"""
+    values = f"{data_bits:0{layout.data_modules}b}{fixed}"
+    flat = list(map(_MODULE_VALUES.__getitem__, map(values.__getitem__, layout.sources)))
+    size = layout.size
+    return [flat[start : start + size] for start in range(0, size * size, size)]
+
+
+def _build_modules(version, error_correction, data_list, mask_pattern=None):
+    """
+    Returns tuple (modules, data codewords) of the QR code, same as ``QRCode.make(fit=False)``
+
+    The function patterns and the order of the data modules are computed once per version, and the data modules are
+    written into the matrix at once instead of module by module.
+    """
+    layout = _version_layout(version)
+    data = util.create_data(version, error_correction, data_list)
+    data_bits = int.from_bytes(data, "big") << (layout.data_modules - 8 * len(data))
+
+    if mask_pattern is None:
+        # same selection as QRCode.best_mask_pattern, format information is left empty for the evaluation
+        fixed = _fixed_modules(version, error_correction, True, 0)
+        lost_points = [util.lost_point(_make_modules(layout, data_bits ^ mask, fixed)) for mask in layout.masks]
+        mask_pattern = lost_points.index(min(lost_points))
+
+    fixed = _fixed_modules(version, error_correction, False, mask_pattern)
+    return _make_modules(layout, data_bits ^ layout.masks[mask_pattern], fixed), data
+
+
+def _make(qr):
+    """Builds ``qr.modules``, same as ``qr.make(fit=False)``"""
+    qr.modules, qr.data_cache = _build_modules(qr.version, qr.error_correction, qr.data_list, qr.mask_pattern)
+    qr.modules_count = len(qr.modules)
+
+
+def _data_list(text, error_correction, segment):
+    """Returns tuple (data_list, version) of the text, see ``make_qr``"""
+    if segment:
+        return optimal_segments(text, error_correction)
+    data_list = list(util.optimal_data_chunks(text, minimum=20))
+    return data_list, fit_version(data_list, error_correction)
+
+
+def make_qr(
+    text,
+    border=2,
+    box_size=10,
+    error_correction=qrcode.constants.ERROR_CORRECT_M,
+    image_factory=None,
+    segment=False,
+):
+    """
+    Returns compiled ``qrcode.QRCode`` for the text, same as ``add_data(text)`` and ``make(fit=True)``
+
+    The version is picked by ``fit_version`` and the matrix is built without ``best_fit``, from the function patterns
+    and data module order cached per version.
+
+    :param segment: split the text by ``optimal_segments`` instead of the qrcode default
+    """
+    start = time.perf_counter() if _observers else None
+    data_list, version = _data_list(text, error_correction, segment)
+    qr = qrcode.QRCode(
+        version=version,
+        error_correction=error_correction,
+        image_factory=image_factory,
+        border=border,
+        box_size=box_size,
+    )
+    for data in data_list:
+        qr.add_data(data)
+    _make(qr)
+    if start is not None:
+        _report("qr", start)
+    return qr
+
+
+def make_modules(text, error_correction=qrcode.constants.ERROR_CORRECT_M, segment=False):
+    """
+    Returns QR code matrix of the text, same as ``make_qr(text).modules``
+
+    No ``qrcode.QRCode`` is created, the matrix is the only state of the call.
+
+    :param segment: see ``make_qr``
+    """
+    start = time.perf_counter() if _observers else None
+    data_list, version = _data_list(text, error_correction, segment)
+    modules = _build_modules(version, error_correction, data_list)[0]
+    if start is not None:
+        _report("qr", start)
+    return modules
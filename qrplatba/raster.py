@@ -0,0 +1,402 @@
+"""
+Native PNG rasterizer painting the QR code matrix directly, without SVG and resvg.
+
+The payload independent part of the image (border and "QR platba" text) is rasterized once per geometry into a
+``Layout``, either natively from a pre-rendered text mask (``render_png``) or by resvg (``render_composite_png``),
+and only the modules are painted over it per image.
+"""
+
+import itertools
+import math
+import re
+import struct
+import time
+import xml.etree.ElementTree as ET
+import zlib
+from fractions import Fraction
+from pathlib import Path
+from typing import NamedTuple
+
+from qrplatba.cache import LRUCache
+from qrplatba.instrument import _observers, _report
+
+DEFAULT_DPI = 300
+
+# "QR platba" alpha mask rendered from Inter Bold by scripts/render_text_mask.py
+_TEXT_MASK = Path(__file__).parent / "fonts" / "qrplatba-text.png"
+# font size and text origin (start of the baseline) of the mask, in mask pixels
+_TEXT_MASK_EM = 128
+_TEXT_MASK_ORIGIN = (-5, 96)
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_GRAY = 0
+_PNG_INDEXED = 3
+_PNG_RGBA = 6
+# bytes per pixel of the supported PNG color types
+_PNG_CHANNELS = {_PNG_GRAY: 1, _PNG_INDEXED: 1, _PNG_RGBA: 4}
+
+_RE_RECT = re.compile(r"M([\d.]+),([\d.]+)([hv])([\d.]+)[hv]([\d.]+)[hv]-[\d.]+z")
+
+
+class Layout(NamedTuple):
+    """Payload independent raster of the image for one geometry, DPI and zoom"""
+
+    width: int
+    height: int
+    rows: tuple  # PNG scanlines of the image without modules, including the filter type byte
+    edges: tuple  # first pixel of each QR code row and column, plus the end of the last one
+
+
+# layouts per (QR code width, border, box size, DPI, zoom)
+layout_cache = LRUCache(maxsize=64)
+# layouts with the frame rasterized by resvg per (QR code width, border, box size, resvg options)
+composite_layout_cache = LRUCache(maxsize=64)
+_text_mask = None
+
+
+def _png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+_PNG_END = _png_chunk(b"IEND", b"")
+# palette index is the opacity of black, so the indexed image decodes to the same RGBA pixels as resvg output
+_ALPHA_PALETTE = _png_chunk(b"PLTE", bytes(3 * 256)) + _png_chunk(b"tRNS", bytes(range(256)))
+
+
+def _png_parts(width, height, color_type, scanlines, compress_level=6, chunks=b""):
+    """
+    Returns 8-bit PNG image as list of ``bytes`` parts: signature and encoded chunks
+
+    :param scanlines: iterable of rows, each prefixed with the PNG filter type byte
+    :param chunks: encoded chunks written before the image data
+    """
+    header = struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)
+    # rows are compressed one by one, without joining the raw image data
+    compressor = zlib.compressobj(compress_level)
+    data = b"".join([compressor.compress(row) for row in scanlines] + [compressor.flush()])
+    return [_PNG_SIGNATURE, _png_chunk(b"IHDR", header), chunks, _png_chunk(b"IDAT", data), _PNG_END]
+
+
+def _encode_png(width, height, color_type, scanlines, compress_level=6, chunks=b""):
+    """Returns 8-bit PNG image as ``bytes``, see ``_png_parts``"""
+    return b"".join(_png_parts(width, height, color_type, scanlines, compress_level, chunks))
+
+
+def _unfilter(raw, height, stride, bpp):
+    """Reverses PNG row filters, returns list of rows"""
+    rows = []
+    previous = bytearray(stride)
+    for y in range(height):
+        kind = raw[y * (stride + 1)]
+        line = bytearray(raw[y * (stride + 1) + 1 : (y + 1) * (stride + 1)])
+        if kind == 1:
+            for i in range(bpp, stride):
+                line[i] = (line[i] + line[i - bpp]) & 0xFF
+        elif kind == 2:
+            line = bytearray((a + b) & 0xFF for a, b in zip(line, previous))
+        elif kind == 3:
+            for i in range(stride):
+                left = line[i - bpp] if i >= bpp else 0
+                line[i] = (line[i] + (left + previous[i]) // 2) & 0xFF
+        elif kind == 4:
+            for i in range(stride):
+                left = line[i - bpp] if i >= bpp else 0
+                up_left = previous[i - bpp] if i >= bpp else 0
+                up = previous[i]
+                p = left + up - up_left
+                pa, pb, pc = abs(p - left), abs(p - up), abs(p - up_left)
+                predictor = left if pa <= pb and pa <= pc else up if pb <= pc else up_left
+                line[i] = (line[i] + predictor) & 0xFF
+        elif kind != 0:
+            raise ValueError(f"Invalid PNG filter type: {kind}")
+        rows.append(line)
+        previous = line
+    return rows
+
+
+def _decode_png(data):
+    """
+    Returns ``(width, height, rows)`` of non-interlaced 8-bit PNG image
+
+    Grayscale and RGBA images are returned as stored, indexed images are expanded to RGBA. Decoding is not fast,
+    it is meant for the text mask and for tests.
+    """
+    if not data.startswith(_PNG_SIGNATURE):
+        raise ValueError("Invalid PNG signature")
+
+    pos = len(_PNG_SIGNATURE)
+    chunks = {}
+    idat = []
+    while pos < len(data):
+        (length,) = struct.unpack_from(">I", data, pos)
+        kind = data[pos + 4 : pos + 8]
+        chunk = data[pos + 8 : pos + 8 + length]
+        pos += 12 + length
+        if kind == b"IDAT":
+            idat.append(chunk)
+        else:
+            chunks[kind] = chunk
+
+    width, height, depth, color_type, _, _, interlace = struct.unpack(">IIBBBBB", chunks[b"IHDR"])
+    if depth != 8 or interlace or color_type not in _PNG_CHANNELS:
+        raise ValueError("Unsupported PNG, expected 8-bit grayscale, indexed or RGBA image without interlacing")
+
+    channels = _PNG_CHANNELS[color_type]
+    rows = _unfilter(zlib.decompress(b"".join(idat)), height, width * channels, channels)
+    if color_type == _PNG_INDEXED:
+        palette = chunks[b"PLTE"]
+        alpha = chunks.get(b"tRNS", b"").ljust(len(palette) // 3, b"\xff")
+        colors = [palette[3 * i : 3 * i + 3] + alpha[i : i + 1] for i in range(len(palette) // 3)]
+        rows = [bytearray(b"".join(colors[i] for i in row)) for row in rows]
+    return width, height, rows
+
+
+def _get_text_mask():
+    global _text_mask
+
+    if _text_mask is None:
+        _text_mask = _decode_png(_TEXT_MASK.read_bytes())
+    return _text_mask
+
+
+def _to_pixels(value, scale):
+    """Index of the first pixel with its centre at or after ``value`` (in mm), same as resvg with crisp edges"""
+    return math.ceil(Fraction(str(value)) * scale - Fraction(1, 2))
+
+
+def _path_rects(d):
+    """Yields ``(x0, y0, x1, y1)`` rectangles of the border path made of ``M..h..v..h-..z`` subpaths"""
+    for x, y, direction, length, size in _RE_RECT.findall(d):
+        x, y, length, size = (Fraction(v) for v in (x, y, length, size))
+        if direction == "h":
+            yield x, y, x + length, y + size
+        else:
+            yield x, y, x + size, y + length
+
+
+def _box_weights(src_size, offset, scale, dst_size):
+    """
+    Returns list of ``(source index, overlap)`` pairs for each destination pixel, source pixel ``i`` covering
+    ``[offset + i * scale, offset + (i + 1) * scale)`` in destination pixels
+    """
+    weights = [[] for _ in range(dst_size)]
+    for i in range(src_size):
+        start = offset + i * scale
+        end = start + scale
+        for pixel in range(max(math.floor(start), 0), min(math.ceil(end), dst_size)):
+            overlap = min(end, pixel + 1) - max(start, pixel)
+            if overlap > 0:
+                weights[pixel].append((i, overlap))
+    return weights
+
+
+def _paint_text(alpha, x, y, font_size):
+    """Composites "QR platba" text with baseline origin at pixel position ``(x, y)`` over ``alpha`` rows"""
+    mask_width, mask_height, mask = _get_text_mask()
+    scale = font_size / _TEXT_MASK_EM
+    origin_x, origin_y = _TEXT_MASK_ORIGIN
+    height, width = len(alpha), len(alpha[0])
+
+    x_weights = _box_weights(mask_width, x - origin_x * scale, scale, width)
+    y_weights = _box_weights(mask_height, y - origin_y * scale, scale, height)
+    columns = [(col, weights) for col, weights in enumerate(x_weights) if weights]
+
+    # resample horizontally, then vertically; the coverage of each pixel is the area average of the mask
+    resampled = [[sum(row[i] * w for i, w in weights) for _, weights in columns] for row in mask]
+    for row_index, weights in enumerate(y_weights):
+        if not weights:
+            continue
+        row = alpha[row_index]
+        for n, (col, _) in enumerate(columns):
+            value = sum(resampled[i][n] * w for i, w in weights)
+            if value:
+                # source-over compositing of black text over the black border
+                row[col] = round(value + row[col] * (1 - value / 255))
+
+
+def _geometry(width, border, box_size, dpi, zoom):
+    """Returns ``(skeleton image, scale, image width, image height, edges)`` of the layout in pixels"""
+    from qrplatba.svg import QRPlatbaSVGImage
+
+    skeleton = QRPlatbaSVGImage(border, width, box_size, qrcode_modules=None)
+    _, _, view_width, view_height = (Fraction(v) for v in skeleton._frame().view_box.split())
+
+    # same image size and scale as resvg: the size at the DPI is rounded before zooming
+    size_scale = Fraction(dpi) / Fraction("25.4")
+    scale = size_scale * Fraction(str(zoom))
+    image_width = _round(_round(view_width * size_scale) * Fraction(str(zoom)))
+    image_height = _round(_round(view_height * size_scale) * Fraction(str(zoom)))
+
+    edges = []
+    for i in range(width):
+        coords = skeleton.module_drawer.coords(skeleton.pixel_box(i, i))
+        edges.append(_to_pixels(skeleton.units(coords.x0, text=False), scale))
+    coords = skeleton.module_drawer.coords(skeleton.pixel_box(width - 1, width - 1))
+    edges.append(_to_pixels(skeleton.units(coords.x1, text=False), scale))
+
+    return skeleton, scale, image_width, image_height, tuple(edges)
+
+
+def _make_layout(width, border, box_size, dpi, zoom):
+    skeleton, scale, image_width, image_height, edges = _geometry(width, border, box_size, dpi, zoom)
+    frame = skeleton._frame()
+
+    alpha = [bytearray(image_width) for _ in range(image_height)]
+    for x0, y0, x1, y1 in _path_rects(frame.border_path):
+        px0, px1 = _to_pixels(x0, scale), _to_pixels(x1, scale)
+        for row in alpha[_to_pixels(y0, scale) : _to_pixels(y1, scale)]:
+            row[px0:px1] = b"\xff" * (px1 - px0)
+
+    font_size = skeleton.FONT_SIZE * skeleton.units(box_size, text=False)
+    _paint_text(
+        alpha,
+        float(Fraction(frame.text_x) * scale),
+        float(Fraction(frame.text_y) * scale),
+        float(Fraction(str(font_size)) * scale),
+    )
+
+    rows = tuple(b"\x00" + row for row in alpha)
+    return Layout(image_width, image_height, rows, edges)
+
+
+def _make_composite_layout(width, border, box_size, resvg_options):
+    from qrplatba.svg import _import_resvg
+
+    resvg_py = _import_resvg()
+    dpi, zoom = resvg_options["dpi"], resvg_options.get("zoom", 1)
+    if dpi <= 0 or zoom <= 0:
+        raise ValueError(f"Invalid DPI or zoom (was {dpi} and {zoom}, expected larger than 0)")
+    skeleton, _, image_width, image_height, edges = _geometry(width, border, box_size, dpi, zoom)
+
+    # the image without modules (border and text) is rendered by resvg, with the fonts of the options
+    svg_string = ET.tostring(skeleton._img, encoding="unicode")
+    png_width, png_height, rgba = _decode_png(bytes(resvg_py.svg_to_bytes(svg_string=svg_string, **resvg_options)))
+    if (png_width, png_height) != (image_width, image_height):
+        raise ValueError(
+            f"Unsupported resvg_kwargs for the composite PNG backend, image size changed "
+            f"(was {png_width}x{png_height}, expected {image_width}x{image_height})"
+        )
+    if any(row[channel::4].strip(b"\x00") for row in rgba for channel in range(3)):
+        raise ValueError("Unsupported resvg_kwargs for the composite PNG backend, expected black on transparent")
+
+    rows = tuple(b"\x00" + bytes(row[3::4]) for row in rgba)
+    return Layout(image_width, image_height, rows, edges)
+
+
+def _round(value):
+    return math.floor(value + Fraction(1, 2))
+
+
+def get_layout(width, border=2, box_size=10, dpi=DEFAULT_DPI, zoom=None):
+    """Returns ``Layout`` for the geometry, cached in ``layout_cache``"""
+    from qrplatba.svg import _int_geometry
+
+    zoom = 1 if zoom is None else zoom
+    if dpi <= 0 or zoom <= 0:
+        raise ValueError(f"Invalid DPI or zoom (was {dpi} and {zoom}, expected larger than 0)")
+    border, box_size = _int_geometry(border, box_size)
+    key = (width, border, box_size, dpi, zoom)
+    return layout_cache.get_or_create(key, lambda: _make_layout(width, border, box_size, dpi, zoom))
+
+
+def get_composite_layout(width, border=2, box_size=10, *, zoom=None, resvg_kwargs=None):
+    """
+    Returns ``Layout`` with the border and text rasterized by resvg, cached in ``composite_layout_cache``
+
+    :param zoom: zoom, same as in ``QRPlatbaSVGImage.save``
+    :param resvg_kwargs: extra arguments of ``resvg_py.svg_to_bytes``, same as in ``QRPlatbaSVGImage.save``
+    """
+    from qrplatba.svg import _int_geometry, _resvg_options
+
+    border, box_size = _int_geometry(border, box_size)
+    options = _resvg_options(zoom=zoom, resvg_kwargs=resvg_kwargs)
+    key = (width, border, box_size, repr(sorted(options.items())))
+    return composite_layout_cache.get_or_create(key, lambda: _make_composite_layout(width, border, box_size, options))
+
+
+def render_png(modules, border=2, box_size=10, *, dpi=DEFAULT_DPI, zoom=None, compress_level=6):
+    """
+    Returns PNG image of the QR code matrix as ``bytes``, painted directly without SVG and resvg.
+
+    The image is written as 8-bit indexed PNG with a palette of black in all opacities and decodes to the same RGBA
+    pixels as ``QRPlatbaSVGImage.save(output_format="png")`` with the default resvg settings. Modules and border
+    are pixel-identical for integer zoom, the "QR platba" text is resampled from a pre-rendered mask, so its
+    anti-aliased edges differ slightly.
+
+    :param modules: QR code matrix (``QRCode.modules``)
+    :param border: outside border, same as in ``QRPlatbaGenerator.make_image``
+    :param box_size: box size, same as in ``QRPlatbaGenerator.make_image``
+    :param dpi: resolution, same as the resvg ``dpi`` option
+    :param zoom: zoom, same as in ``QRPlatbaSVGImage.save``
+    :param compress_level: zlib compression level
+    """
+    return b"".join(render_png_parts(modules, border, box_size, dpi=dpi, zoom=zoom, compress_level=compress_level))
+
+
+def render_png_parts(modules, border=2, box_size=10, *, dpi=DEFAULT_DPI, zoom=None, compress_level=6):
+    """
+    Returns PNG image of the QR code matrix as list of ``bytes`` parts, same as ``render_png`` without joining them
+
+    Payload independent parts (signature, header and palette) are shared between images.
+    """
+    started = time.perf_counter() if _observers else None
+    layout = get_layout(len(modules), border, box_size, dpi, zoom)
+    parts = _composite_parts(layout, modules, compress_level)
+    if started is not None:
+        _report("png_native", started, sum(len(part) for part in parts))
+    return parts
+
+
+def render_composite_png(modules, border=2, box_size=10, *, zoom=None, resvg_kwargs=None, compress_level=6):
+    """
+    Returns PNG image of the QR code matrix as ``bytes``, with the border and text rasterized by resvg once per
+    geometry and resvg options and the modules painted directly
+
+    The image decodes to the same RGBA pixels as ``QRPlatbaSVGImage.save(output_format="png")`` with the same
+    arguments, pixel-identical including the text for integer zoom. Only options rendering the frame black on
+    transparent background in the default size are supported.
+
+    :param modules: QR code matrix (``QRCode.modules``)
+    :param border: outside border, same as in ``QRPlatbaGenerator.make_image``
+    :param box_size: box size, same as in ``QRPlatbaGenerator.make_image``
+    :param zoom: zoom, same as in ``QRPlatbaSVGImage.save``
+    :param resvg_kwargs: extra arguments of ``resvg_py.svg_to_bytes``, same as in ``QRPlatbaSVGImage.save``
+    :param compress_level: zlib compression level
+    """
+    parts = render_composite_png_parts(
+        modules, border, box_size, zoom=zoom, resvg_kwargs=resvg_kwargs, compress_level=compress_level
+    )
+    return b"".join(parts)
+
+
+def render_composite_png_parts(modules, border=2, box_size=10, *, zoom=None, resvg_kwargs=None, compress_level=6):
+    """Returns PNG image of the QR code matrix as list of ``bytes`` parts, see ``render_composite_png``"""
+    started = time.perf_counter() if _observers else None
+    layout = get_composite_layout(len(modules), border, box_size, zoom=zoom, resvg_kwargs=resvg_kwargs)
+    parts = _composite_parts(layout, modules, compress_level)
+    if started is not None:
+        _report("png_composite", started, sum(len(part) for part in parts))
+    return parts
+
+
+def _composite_parts(layout, modules, compress_level):
+    """Returns PNG parts of the layout with the modules painted over it"""
+    rows = list(layout.rows)
+    edges = layout.edges
+    start, end = 1 + edges[0], 1 + edges[-1]
+
+    for row_index, line in enumerate(modules):
+        y0, y1 = edges[row_index], edges[row_index + 1]
+        spans = []
+        col = 0
+        for dark, run in itertools.groupby(line):
+            next_col = col + len(list(run))
+            spans.append((b"\xff" if dark else b"\x00") * (edges[next_col] - edges[col]))
+            col = next_col
+        frame = rows[y0]
+        rows[y0:y1] = [frame[:start] + b"".join(spans) + frame[end:]] * (y1 - y0)
+
+    # rows repeating the previous one are written with the "Up" filter as zeros, which compress much faster
+    repeated = b"\x02" + bytes(layout.width)
+    scanlines = [rows[0]] + [repeated if row == previous else row for previous, row in zip(rows, rows[1:])]
+    return _png_parts(layout.width, layout.height, _PNG_INDEXED, scanlines, compress_level, _ALPHA_PALETTE)
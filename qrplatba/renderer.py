@@ -0,0 +1,139 @@
+"""Thread-safe renderer of QR Platba images, configured once and shared between threads."""
+
+import qrcode
+
+from qrplatba import raster
+from qrplatba.batch import SUPPORTED_FORMATS, _spayd_text
+from qrplatba.generator import _cache_key
+from qrplatba.qr import make_modules
+from qrplatba.spayd import normalize_spayd
+from qrplatba.svg import CHUNK_SIZE, PATH_MODES, SvgWriter, _import_resvg, _resvg_options
+
+_PNG_BACKENDS = (None, "resvg", "native", "composite")
+
+
+class Renderer:
+    """
+    Stateless QR Platba renderer, which can be shared between threads (e.g. by the request handlers of a threaded
+    WSGI server).
+
+    The render options are set once when the renderer is created, payments are passed per call. Rendering stores
+    nothing on the renderer: every call builds its own QR code matrix (without ``qrcode.QRCode`` objects) and encodes
+    it directly by ``SvgWriter``, the native rasterizer or resvg. The shared geometry caches are locked, and the
+    render cache is shared with ``QRPlatbaGenerator.render`` (same keys for the same options).
+    """
+
+    def __init__(
+        self,
+        output_format="svg",
+        *,
+        border=2,
+        box_size=10,
+        error_correction=qrcode.constants.ERROR_CORRECT_M,
+        alphanumeric=False,
+        path_mode="modules",
+        zoom=None,
+        resvg_kwargs=None,
+        backend=None,
+        cache=None,
+    ):
+        """
+        :param output_format: ``"svg"`` or ``"png"``
+        :param border: outside border, same as in ``QRPlatbaGenerator.make_image``
+        :param box_size: box size, same as in ``QRPlatbaGenerator.make_image``
+        :param error_correction: error correction level, same as in ``QRPlatbaGenerator.make_image``
+        :param alphanumeric: see ``QRPlatbaGenerator.make_image``
+        :param path_mode: shape of the QR code path, see ``QRPlatbaGenerator.make_image``
+        :param zoom: PNG zoom, see ``QRPlatbaSVGImage.save``
+        :param resvg_kwargs: extra arguments of ``resvg_py.svg_to_bytes``, see ``QRPlatbaSVGImage.save``
+        :param backend: PNG rasterizer, see ``QRPlatbaSVGImage.save``
+        :param cache: optional ``qrplatba.cache.RenderCache``
+        """
+        if output_format.upper() not in SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported format: {output_format}")
+        if path_mode not in PATH_MODES:
+            raise ValueError(f"Unsupported path mode: {path_mode}")
+        if backend not in _PNG_BACKENDS:
+            raise ValueError(f"Unsupported PNG backend: {backend}")
+        if backend == "native" and resvg_kwargs:
+            raise ValueError("resvg_kwargs are not supported by the native PNG backend")
+
+        self.output_format = output_format
+        self.border = border
+        self.box_size = box_size
+        self.error_correction = error_correction
+        self.alphanumeric = alphanumeric
+        self.path_mode = path_mode
+        self.zoom = zoom
+        self.resvg_kwargs = resvg_kwargs
+        self.backend = backend
+        self.cache = cache
+
+        # resolved once, rendering only reads them
+        self._png = output_format.upper() == "PNG"
+        self._resvg = _import_resvg() if self._png and backend != "native" else None
+        self._resvg_options = _resvg_options(zoom=zoom, resvg_kwargs=resvg_kwargs) if self._resvg else None
+
+    def _encode(self, text):
+        modules = make_modules(text, self.error_correction, segment=self.alphanumeric)
+        if self._png and self._resvg is None:
+            return raster.render_png(modules, self.border, self.box_size, zoom=self.zoom)
+        if self._png and self.backend == "composite":
+            return raster.render_composite_png(
+                modules, self.border, self.box_size, zoom=self.zoom, resvg_kwargs=self.resvg_kwargs
+            )
+
+        writer = SvgWriter.for_geometry(len(modules), self.border, self.box_size, self.path_mode)
+        if not self._png:
+            return writer.to_bytes(modules)
+        svg_string = writer.to_bytes(modules, xml_declaration=False).decode()
+        return bytes(self._resvg.svg_to_bytes(svg_string=svg_string, **self._resvg_options))
+
+    def render(self, payment):
+        """
+        Returns encoded image of the payment as ``bytes``, same as ``QRPlatbaGenerator.render`` with the renderer
+        options
+
+        :param payment: SPAYD string, ``Payment`` record, ``SpaydGenerator`` instance or dict with ``SpaydGenerator``
+            arguments
+        """
+        text = _spayd_text(payment)
+        if self.alphanumeric:
+            text = normalize_spayd(text)
+        if self.cache is None:
+            return self._encode(text)
+
+        key = _cache_key(
+            self.cache,
+            text,
+            self.output_format,
+            {"border": self.border, "box_size": self.box_size, "error_correction": self.error_correction},
+            zoom=self.zoom,
+            resvg_kwargs=self.resvg_kwargs,
+            alphanumeric=self.alphanumeric,
+            backend=self.backend,
+            path_mode=self.path_mode,
+        )
+        return self.cache.get_or_render(key, lambda: self._encode(text))
+
+    def render_many(self, payments):
+        """Renders an iterable of payments lazily, yielding the encoded images in input order"""
+        for payment in payments:
+            yield self.render(payment)
+
+    def iter_svg_chunks(self, payment, chunk_size=CHUNK_SIZE):
+        """
+        Returns iterator of the SVG image of the payment as encoded ``bytes`` chunks, e.g. for a streaming WSGI
+        response; joined chunks are the same as ``render``. The render cache is not used.
+
+        :param payment: see ``render``
+        :param chunk_size: size of the QR code path chunks in bytes, see ``SvgWriter.iter_chunks``
+        """
+        if self._png:
+            raise ValueError(f"Unsupported format for streaming: {self.output_format}")
+        text = _spayd_text(payment)
+        if self.alphanumeric:
+            text = normalize_spayd(text)
+        modules = make_modules(text, self.error_correction, segment=self.alphanumeric)
+        writer = SvgWriter.for_geometry(len(modules), self.border, self.box_size, self.path_mode)
+        return writer.iter_chunks(modules, chunk_size=chunk_size)
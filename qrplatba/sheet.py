@@ -0,0 +1,200 @@
+"""Sheets of many QR Platba codes laid out in a grid, for printing payment slips."""
+
+import itertools
+from decimal import Decimal
+
+import qrcode
+
+from qrplatba.batch import SUPPORTED_FORMATS, _spayd_text
+from qrplatba.cache import LRUCache
+from qrplatba.qr import make_modules
+from qrplatba.spayd import normalize_spayd
+from qrplatba.svg import PATH_MODES, QRPlatbaSVGImage, SvgWriter, _import_resvg, _int_geometry, _resvg_options
+
+# symbols of the border and text per (QR code width, border, box size)
+symbol_cache = LRUCache(maxsize=128)
+
+_DECLARATION = b"<?xml version='1.0' encoding='UTF-8'?>\n"
+_STYLE = " ".join(f'{name}="{value}"' for name, value in QRPlatbaSVGImage.QR_PATH_STYLE.items())
+
+
+def _number(value):
+    """Formats SVG coordinate in millimeters, with at most three decimal places"""
+    return f"{value:.3f}".rstrip("0").rstrip(".")
+
+
+def _make_symbol(width, border, box_size):
+    """Returns tuple (symbol id, ``<symbol>`` element, code width and height in millimeters)"""
+    image = QRPlatbaSVGImage(border, width, box_size, qrcode_modules=None)
+    frame = image._frame()
+    _, _, code_width, code_height = frame.view_box.split()
+    symbol_id = f"qrplatba-frame-{width}"
+    symbol = (
+        f'<symbol id="{symbol_id}" overflow="visible"><path d="{frame.border_path}" {_STYLE} />'
+        f'<text style="{frame.text_style}" x="{frame.text_x}" y="{frame.text_y}">QR platba</text></symbol>'
+    )
+    return symbol_id, symbol, Decimal(code_width), Decimal(code_height)
+
+
+class SheetRenderer:
+    """
+    Renders pages with many QR Platba codes in a grid, e.g. A4 sheets of payment slips.
+
+    Each page is a single SVG document (or PNG image rasterized from it in a single pass). The border and the
+    "QR platba" text are defined once per page and QR code size as a ``<symbol>``, every code on the page then adds
+    only a ``<use>`` of the symbol and its module path. Codes are centered in the grid cells, and pages are rendered
+    one by one as the payments are consumed.
+    """
+
+    def __init__(
+        self,
+        output_format="svg",
+        *,
+        columns=3,
+        rows=4,
+        page_size=(210, 297),
+        margin=10,
+        border=2,
+        box_size=10,
+        error_correction=qrcode.constants.ERROR_CORRECT_M,
+        alphanumeric=False,
+        path_mode="modules",
+        zoom=None,
+        resvg_kwargs=None,
+    ):
+        """
+        :param output_format: ``"svg"`` or ``"png"``
+        :param columns: number of codes in a row of the grid
+        :param rows: number of rows of the grid
+        :param page_size: page width and height in millimeters, A4 by default
+        :param margin: page margin in millimeters
+        :param border: outside border of each code, same as in ``QRPlatbaGenerator.make_image``
+        :param box_size: box size, same as in ``QRPlatbaGenerator.make_image`` (10 is 1 mm per module)
+        :param error_correction: error correction level, same as in ``QRPlatbaGenerator.make_image``
+        :param alphanumeric: see ``QRPlatbaGenerator.make_image``
+        :param path_mode: shape of the QR code paths, see ``QRPlatbaGenerator.make_image``
+        :param zoom: PNG zoom, see ``QRPlatbaSVGImage.save``
+        :param resvg_kwargs: extra arguments of ``resvg_py.svg_to_bytes``, see ``QRPlatbaSVGImage.save``
+        """
+        if output_format.upper() not in SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported format: {output_format}")
+        if path_mode not in PATH_MODES:
+            raise ValueError(f"Unsupported path mode: {path_mode}")
+        if columns < 1 or rows < 1:
+            raise ValueError(f"Invalid grid (was {columns}x{rows}, expected at least 1x1)")
+
+        self.output_format = output_format
+        self.columns = columns
+        self.rows = rows
+        self.page_size = page_size
+        self.margin = margin
+        self.border, self.box_size = _int_geometry(border, box_size)
+        self.error_correction = error_correction
+        self.alphanumeric = alphanumeric
+        self.path_mode = path_mode
+
+        page_width, page_height = (Decimal(str(size)) for size in page_size)
+        margin = Decimal(str(margin))
+        self._cell_width = (page_width - 2 * margin) / columns
+        self._cell_height = (page_height - 2 * margin) / rows
+        self._margin = margin
+        self._head = (
+            f'<svg width="{_number(page_width)}mm" height="{_number(page_height)}mm" version="1.1" '
+            f'viewBox="0 0 {_number(page_width)} {_number(page_height)}" xmlns="http://www.w3.org/2000/svg" '
+            'xmlns:xlink="http://www.w3.org/1999/xlink">'
+        )
+
+        self._resvg = _import_resvg() if output_format.upper() == "PNG" else None
+        self._resvg_options = _resvg_options(zoom=zoom, resvg_kwargs=resvg_kwargs) if self._resvg else None
+
+    @property
+    def per_page(self):
+        """Number of codes on a full page"""
+        return self.columns * self.rows
+
+    def _symbol(self, width):
+        key = (width, self.border, self.box_size)
+        return symbol_cache.get_or_create(key, lambda: _make_symbol(width, self.border, self.box_size))
+
+    def _page_chunks(self, payments):
+        """Yields the page SVG document in string pieces, the code paths computed lazily one by one"""
+        symbols = {}
+        codes = []
+        for index, payment in enumerate(payments):
+            text = _spayd_text(payment)
+            if self.alphanumeric:
+                text = normalize_spayd(text)
+            modules = make_modules(text, self.error_correction, segment=self.alphanumeric)
+            width = len(modules)
+            symbol_id, symbol, code_width, code_height = self._symbol(width)
+            if code_width > self._cell_width or code_height > self._cell_height:
+                raise ValueError(
+                    f"QR code does not fit the grid cell (was {_number(code_width)}x{_number(code_height)} mm, "
+                    f"expected at most {_number(self._cell_width)}x{_number(self._cell_height)} mm)"
+                )
+            symbols[symbol_id] = symbol
+
+            row, column = divmod(index, self.columns)
+            x = self._margin + column * self._cell_width + (self._cell_width - code_width) / 2
+            y = self._margin + row * self._cell_height + (self._cell_height - code_height) / 2
+            codes.append((symbol_id, width, x, y, modules))
+
+        yield "".join((self._head, "<defs>", *symbols.values(), "</defs>", f"<g {_STYLE}>"))
+        for symbol_id, width, x, y, modules in codes:
+            path = SvgWriter.for_geometry(width, self.border, self.box_size, self.path_mode).path(modules)
+            yield (
+                f'<g transform="translate({_number(x)},{_number(y)})"><use href="#{symbol_id}" '
+                f'xlink:href="#{symbol_id}" />'
+                f'<path d="{path}" /></g>'
+            )
+        yield "</g></svg>"
+
+    def _page_svg(self, payments):
+        return "".join(self._page_chunks(payments))
+
+    def render_page(self, payments):
+        """
+        Returns one page with the payments as ``bytes``
+
+        :param payments: at most ``per_page`` SPAYD strings, ``Payment`` records, ``SpaydGenerator`` instances or
+            dicts with ``SpaydGenerator`` arguments
+        """
+        payments = self._page_payments(payments)
+        svg_string = self._page_svg(payments)
+        if self._resvg is None:
+            return _DECLARATION + svg_string.encode()
+        return bytes(self._resvg.svg_to_bytes(svg_string=svg_string, **self._resvg_options))
+
+    def iter_page_chunks(self, payments):
+        """
+        Returns iterator of one SVG page with the payments as encoded ``bytes`` chunks, e.g. for a streaming HTTP
+        response; joined chunks are the same as ``render_page``
+
+        QR code matrices of all codes on the page are built first (validating that they fit), then the document is
+        yielded with one chunk per code, each path encoded only when it is reached.
+
+        :param payments: see ``render_page``
+        """
+        if self._resvg is not None:
+            raise ValueError(f"Unsupported format for streaming: {self.output_format}")
+        payments = self._page_payments(payments)
+        pieces = self._page_chunks(payments)
+        # the head is computed here, so that all matrices are built and checked before the first chunk is sent
+        head = next(pieces)
+        return itertools.chain((_DECLARATION + head.encode(),), (piece.encode() for piece in pieces))
+
+    def _page_payments(self, payments):
+        payments = list(payments)
+        if len(payments) > self.per_page:
+            raise ValueError(f"Too many payments for a page (was {len(payments)}, expected at most {self.per_page})")
+        return payments
+
+    def pages(self, payments):
+        """
+        Renders pages of the payments lazily, yielding each page as ``bytes`` as soon as it is complete
+
+        :param payments: iterable of payments, see ``render_page``
+        """
+        iterator = iter(payments)
+        while chunk := list(itertools.islice(iterator, self.per_page)):
+            yield self.render_page(chunk)
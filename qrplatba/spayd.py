@@ -1,11 +1,107 @@
+import functools
 import re
+import sys
+import time
+import unicodedata
 from datetime import date, datetime
 
+RE_ACCOUNT = re.compile(r"((?P<ba>\d+(?=-))-)?(?P<a>\d+)/(?P<b>\d{4})")
+
+# "CZ00" with letters converted to numbers (C=12, Z=35), appended to BBAN for the IBAN checksum
+_CZ_CHECKSUM_SUFFIX = "123500"
+
+
+def _czech_to_iban(prefix, number, bank_code):
+    bban = f"{bank_code}{prefix:0>6}{number:0>10}"
+    return f"CZ{98 - int(bban + _CZ_CHECKSUM_SUFFIX) % 97:0>2}{bban}"
+
+
+@functools.lru_cache(maxsize=8192)
+def account_to_iban(account):
+    """
+    Converts czech account number (e.g. 12-123456789/0300) to IBAN, other account numbers are returned unchanged.
+
+    Results are cached, use ``account_to_iban.cache_info()`` for cache statistics.
+    """
+    m = RE_ACCOUNT.match(account)
+    if m is None:
+        return account
+    return _czech_to_iban(m.group("ba") or 0, m.group("a"), m.group("b"))
+
+
+# values of these keys are case sensitive and are never normalized
+_CASE_SENSITIVE_KEYS = frozenset(("NTA", "X-URL"))
+
+
+def normalize_spayd(text):
+    """
+    Converts SPAYD string to uppercase and removes diacritics, as recommended by the SPAYD specification.
+
+    Uppercase SPAYD string consists (mostly) of characters of the QR alphanumeric mode, which needs 5.5 bits per
+    character instead of 8, so the QR code can be smaller. NTA and X-URL values are left unchanged.
+    """
+    parts = []
+    for part in text.split("*"):
+        if part.partition(":")[0] not in _CASE_SENSITIVE_KEYS:
+            decomposed = unicodedata.normalize("NFKD", part)
+            part = "".join(c for c in decomposed if not unicodedata.combining(c)).upper()
+        parts.append(part)
+    return "*".join(parts)
+
+
+def _format_item(value, key):
+    if value is not None and value != "":
+        return f"{key}:{value}*"
+    return ""
+
+
+def _format_alternate_accounts(alternate_accounts):
+    if alternate_accounts:
+        return "ALT-ACC:{}*".format(",".join(map(account_to_iban, alternate_accounts)))
+    return ""
+
+
+def _format_amount(amount):
+    if amount is not None:
+        return f"AM:{amount:.2f}*"
+    return ""
+
+
+def _format_due_date(due_date):
+    if due_date is not None:
+        if isinstance(due_date, datetime):
+            due_date = due_date.date()
+        if isinstance(due_date, date):
+            due_date = due_date.isoformat().replace("-", "")
+        return f"DT:{due_date}*"
+    return ""
+
+
+# formatting of all fields except the account, in the order of the SPAYD string
+_FIELD_FORMATTERS = {
+    "alternate_accounts": _format_alternate_accounts,
+    "amount": _format_amount,
+    "currency": functools.partial(_format_item, key="CC"),
+    "reference": functools.partial(_format_item, key="RF"),
+    "recipient_name": functools.partial(_format_item, key="RN"),
+    "due_date": _format_due_date,
+    "payment_type": functools.partial(_format_item, key="PT"),
+    "message": functools.partial(_format_item, key="MSG"),
+    "notification_type": functools.partial(_format_item, key="NT"),
+    "notification_address": functools.partial(_format_item, key="NTA"),
+    "x_per": functools.partial(_format_item, key="X-PER"),
+    "x_vs": functools.partial(_format_item, key="X-VS"),
+    "x_ss": functools.partial(_format_item, key="X-SS"),
+    "x_ks": functools.partial(_format_item, key="X-KS"),
+    "x_id": functools.partial(_format_item, key="X-ID"),
+    "x_url": functools.partial(_format_item, key="X-URL"),
+}
+
 
 class SpaydGenerator:
     """SPAYD (Short Payment Descriptor) string generator."""
 
-    RE_ACCOUNT = re.compile(r"((?P<ba>\d+(?=-))-)?(?P<a>\d+)/(?P<b>\d{4})")
+    RE_ACCOUNT = RE_ACCOUNT
 
     def __init__(
         self,
@@ -71,30 +167,15 @@ class SpaydGenerator:
         self.x_url = x_url
         self.reference = reference
 
-    def _convert_to_iban(self, match):
+    @staticmethod
+    def _convert_to_iban(match):
         """Convert czech account number to IBAN from a RE_ACCOUNT match object."""
-        iban = "CZ00{b}{ba:0>6}{a:0>10}".format(
-            ba=match.group("ba") or 0,
-            a=match.group("a"),
-            b=match.group("b"),
-        )
-
-        # convert IBAN letters into numbers
-        crc = re.sub(r"[A-Z]", lambda m: str(ord(m.group(0)) - 55), iban[4:] + iban[:4])
-
-        # compute control digits
-        digits = f"{98 - int(crc) % 97:0>2}"
-
-        return iban[:2] + digits + iban[4:]
+        return _czech_to_iban(match.group("ba") or 0, match.group("a"), match.group("b"))
 
     @property
     def _account(self):
         if self.account is not None:
-            m = self.RE_ACCOUNT.match(self.account)
-            if m:
-                iban = self._convert_to_iban(m)
-            else:
-                iban = self.account
+            iban = account_to_iban(self.account)
             if self.bic:
                 return f"ACC:{iban}+{self.bic}*"
             return f"ACC:{iban}*"
@@ -102,41 +183,30 @@ class SpaydGenerator:
 
     @property
     def _alternate_accounts(self):
-        if self.alternate_accounts:
-            formatted = []
-            for account in self.alternate_accounts:
-                m = self.RE_ACCOUNT.match(account)
-                if m:
-                    formatted.append(self._convert_to_iban(m))
-                else:
-                    formatted.append(account)
-            return "ALT-ACC:{}*".format(",".join(formatted))
-        return ""
+        return _format_alternate_accounts(self.alternate_accounts)
 
     @property
     def _amount(self):
-        if self.amount is not None:
-            return f"AM:{self.amount:.2f}*"
-        return ""
+        return _format_amount(self.amount)
 
     @property
     def _due_date(self):
-        if self.due_date is not None:
-            str_part = "DT:{}*"
-            if isinstance(self.due_date, datetime):
-                return str_part.format(self.due_date.date().isoformat()).replace("-", "")
-            if isinstance(self.due_date, date):
-                return str_part.format(self.due_date.isoformat()).replace("-", "")
-            return str_part.format(self.due_date)
-        return ""
+        return _format_due_date(self.due_date)
 
     def _format_item_string(self, item, name):
-        if item is not None and item != "":
-            return f"{name}:{item}*"
-        return ""
+        return _format_item(item, name)
+
+    def get_text(self, normalize=False):
+        """
+        Returns SPAYD string
 
-    def get_text(self):
-        return "SPD*1.0*{ACC}{ALTACC}{AM}{CC}{RF}{RN}{DT}{PT}{MSG}{NT}{NTA}{XPER}{XVS}{XSS}{XKS}{XID}{XURL}".format(
+        :param normalize: convert the string to uppercase without diacritics by ``normalize_spayd``, so that it can be
+            encoded in the more compact QR alphanumeric mode
+        """
+        # observers can only be registered after qrplatba.instrument is imported, which is not done here
+        instrument = sys.modules.get("qrplatba.instrument")
+        start = time.perf_counter() if instrument is not None and instrument._observers else None
+        text = "SPD*1.0*{ACC}{ALTACC}{AM}{CC}{RF}{RN}{DT}{PT}{MSG}{NT}{NTA}{XPER}{XVS}{XSS}{XKS}{XID}{XURL}".format(
             ACC=self._account,
             ALTACC=self._alternate_accounts,
             AM=self._amount,
@@ -155,6 +225,11 @@ class SpaydGenerator:
             XID=self._format_item_string(self.x_id, "X-ID"),
             XURL=self._format_item_string(self.x_url, "X-URL"),
         ).rstrip("*")
+        if normalize:
+            text = normalize_spayd(text)
+        if start is not None:
+            instrument._report("spayd", start, len(text.encode()))
+        return text
 
 
 def __getattr__(name):
@@ -1,10 +1,18 @@
+import io
+import itertools
 import os
+import time
 from decimal import Decimal
 from pathlib import Path
-from typing import NamedTuple
+from typing import NamedTuple, Optional
 
 from qrcode.compat.etree import ET
 from qrcode.image import svg
+from qrcode.image.styles.moduledrawers import svg as svg_drawers
+
+from qrplatba import raster
+from qrplatba.cache import LRUCache
+from qrplatba.instrument import _observers, _report
 
 _FONT_DIR = Path(__file__).parent / "fonts"
 _INTER_BOLD = str(_FONT_DIR / "Inter-Bold.ttf")
@@ -18,6 +26,34 @@ class ScaledSizes(NamedTuple):
     ratio: Decimal
 
 
+class Frame(NamedTuple):
+    """Parts of the image that depend only on the QR code geometry, not on the payload"""
+
+    view_box: str
+    height: str
+    border_path: str
+    text_style: str
+    text_x: str
+    text_y: str
+    # coordinate strings of the module edges of the default module drawer, None if computed per image
+    grid: Optional[tuple] = None
+
+
+# QR code path shapes: one subpath per module (same as qrcode), per horizontal run of modules, or per connected region
+PATH_MODES = ("modules", "runs", "contours")
+
+# coordinate arithmetic: exact integer micrometres, or the Decimal arithmetic of qrcode (the reference)
+GEOMETRIES = ("fixed", "decimal")
+
+# payload independent image parts per (image class, QR code width, box size, border)
+frame_cache = LRUCache(maxsize=256)
+# SvgWriter instances per (QR code width, border, box size)
+writer_cache = LRUCache(maxsize=128)
+
+# default size of the QR code path slices of streamed SVG documents, in bytes
+CHUNK_SIZE = 16 * 1024
+
+
 class QRPlatbaSVGImage(svg.SvgPathImage):
     """
     QR Platba SVG image generator.
@@ -35,12 +71,36 @@ class QRPlatbaSVGImage(svg.SvgPathImage):
 
     BOTTOM_LINE_SEGMENTS = (2, 22)
 
-    def __init__(self, border, width, box_size, *args, **kwargs):
+    # "fixed" computes the coordinates in integer micrometres and draws the QR code path from the module edges
+    # computed once per geometry, "decimal" uses the Decimal arithmetic and per module drawing of qrcode. Attribute
+    # strings of both are identical. "decimal" is used for non-integer border or box size and changed constants.
+    geometry = "fixed"
+
+    def __init__(self, border, width, box_size, *args, path_mode="modules", **kwargs):
+        """
+        :param path_mode: shape of the QR code path, one of ``PATH_MODES``. ``"runs"`` merges horizontal runs of
+            modules into one subpath, ``"contours"`` traces the outline of each connected region, producing the
+            smallest path.
+        """
+        if path_mode not in PATH_MODES:
+            raise ValueError(f"Unsupported path mode: {path_mode}")
+        # the element tree is complete at the end of process()
+        self._build_start = time.perf_counter() if _observers else None
         self.outside_border = border
+        self.path_mode = path_mode
+        # merged paths are traced from the whole matrix in process()
+        self.needs_drawrect = path_mode == "modules"
+        # last (options, parts) encoded by render_size or render_into
+        self._encoded = None
+        self._fixed_geometry = self.geometry == "fixed" and _supports_fixed_geometry(self, border, box_size)
         border += self.INSIDE_BORDER + self.LINE_SIZE  # outside border + inside border + line size
 
         super().__init__(border, width, box_size, *args, **kwargs)
 
+        if self._fixed_geometry and self.needs_drawrect and _is_default_drawer(self.module_drawer):
+            # eye modules are drawn by the eye drawer, the path is the same only if it is the default one as well
+            self.needs_drawrect = not _is_default_drawer(self.eye_drawer)
+
     def _get_scaled_sizes(self):
         """Computes sizes of the QR code and QR text according to the scale ratio"""
         scale_ratio = self.units(self.box_size, text=False)
@@ -56,9 +116,8 @@ class QRPlatbaSVGImage(svg.SvgPathImage):
             ratio=scale_ratio,
         )
 
-    def make_border(self):
-        """Creates black thin border around QR code"""
-        scaled = self._get_scaled_sizes()
+    def _border_path(self, scaled):
+        """Computes path of the black thin border around QR code"""
 
         def sizes(ob, ib, wd, ln):  # size helper
             return ob * scaled.outside_border + ib * scaled.inside_border + wd * scaled.width + ln * scaled.line_size
@@ -109,12 +168,10 @@ class QRPlatbaSVGImage(svg.SvgPathImage):
                 width=scaled.line_size,
             )
 
-        subpaths = " ".join(get_subpaths())
-        return ET.Element("path", d=subpaths, id="qrplatba-border", **self.QR_PATH_STYLE)
+        return " ".join(get_subpaths())
 
-    def make_text(self):
-        """Creates "QR platba" text element"""
-        scaled = self._get_scaled_sizes()
+    def _text_attrib(self, scaled):
+        """Computes style and position of the "QR platba" text"""
         text_style = self.QR_TEXT_STYLE.format(size=(self.FONT_SIZE * scaled.ratio).quantize(Decimal("0.01")))
 
         x_pos = str(scaled.outside_border + scaled.line_size + 3 * scaled.ratio)
@@ -126,64 +183,634 @@ class QRPlatbaSVGImage(svg.SvgPathImage):
             + (self.FONT_HEIGHT / 5) * scaled.ratio
         )
 
-        text_el = ET.Element("text", style=text_style, x=x_pos, y=y_pos, id="qrplatba-text")
+        return text_style, x_pos, y_pos
+
+    def _compute_frame(self):
+        """Computes all payload independent parts of the image"""
+        if self._fixed_geometry:
+            return _fixed_frame(self)
+
+        scaled = self._get_scaled_sizes()
+        h_pixels = self.pixel_size + (self.FONT_HEIGHT * scaled.ratio)
+        text_style, text_x, text_y = self._text_attrib(scaled)
+
+        return Frame(
+            view_box=f"0 0 {self.units(self.pixel_size, text=False)} {self.units(h_pixels, text=False)}",
+            height=str(self.units(h_pixels)),
+            border_path=self._border_path(scaled),
+            text_style=text_style,
+            text_x=text_x,
+            text_y=text_y,
+        )
+
+    def _frame(self):
+        """Returns payload independent parts of the image, cached in ``frame_cache`` per geometry"""
+        key = (type(self), self._fixed_geometry, self.width, self.box_size, self.outside_border)
+        return frame_cache.get_or_create(key, self._compute_frame)
+
+    def make_border(self):
+        """Creates black thin border around QR code"""
+        return ET.Element("path", d=self._frame().border_path, id="qrplatba-border", **self.QR_PATH_STYLE)
+
+    def make_text(self):
+        """Creates "QR platba" text element"""
+        frame = self._frame()
+        text_el = ET.Element("text", style=frame.text_style, x=frame.text_x, y=frame.text_y, id="qrplatba-text")
         text_el.text = "QR platba"
 
         return text_el
 
+    def _grid(self):
+        """Returns coordinate strings of the module edges, formatted exactly as the path drawer formats them"""
+        if self._fixed_geometry and _is_default_drawer(self.module_drawer):
+            return self._frame().grid
+
+        grid = []
+        for i in range(self.width):
+            coords = self.module_drawer.coords(self.pixel_box(i, i))
+            grid.append(str(self.units(coords.x0, text=False)))
+        grid.append(str(self.units(coords.x1, text=False)))
+        return grid
+
+    def process(self):
+        if self.path_mode != "modules":
+            self._subpaths = _merged_subpaths(self.modules, self._grid(), self.path_mode)
+        elif not self.needs_drawrect:
+            self._subpaths = list(_module_subpaths(self.modules, self._grid()))
+        super().process()
+        if self._build_start is not None:
+            _report("svg_tree", self._build_start)
+            self._build_start = None
+
     def _svg(self, viewBox=None, **kwargs):
-        scaled = self._get_scaled_sizes()
-        h_pixels = self.pixel_size + (self.FONT_HEIGHT * scaled.ratio)
+        frame = self._frame()
 
-        box = f"0 0 {self.units(self.pixel_size, text=False)} {self.units(h_pixels, text=False)}"
-        svg_el = super()._svg(viewBox=box, **kwargs)
+        svg_el = super()._svg(viewBox=frame.view_box, **kwargs)
         svg_el.append(self.make_border())
         svg_el.append(self.make_text())
 
         # update size of the SVG element
-        svg_el.attrib["height"] = str(self.units(h_pixels))
+        svg_el.attrib["height"] = frame.height
 
         return svg_el
 
-    def save(self, stream, kind=None, *, output_format=None, zoom=None, resvg_kwargs=None):
+    def to_string(self, **kwargs):
+        start = time.perf_counter() if _observers else None
+        data = super().to_string(**kwargs)
+        if start is not None:
+            _report("svg_serialize", start, len(data))
+        return data
+
+    def save(self, stream, kind=None, *, output_format=None, zoom=None, resvg_kwargs=None, backend=None):
+        """
+        Saves the image as SVG or PNG
+
+        :param output_format: ``"svg"`` (default) or ``"png"``
+        :param zoom: PNG zoom
+        :param resvg_kwargs: extra arguments for ``resvg_py.svg_to_bytes``
+        :param backend: PNG rasterizer, ``"resvg"`` (default), ``"native"`` to paint the image directly with
+            ``qrplatba.raster.render_png``, without SVG, resvg and font loading, or ``"composite"`` to paint the
+            modules over the border and text rasterized by resvg once per geometry
+            (``qrplatba.raster.render_composite_png``)
+        """
         if output_format is None:
             output_format = kind
         if output_format is None or output_format.upper() == "SVG":
-            return super().save(stream, kind=kind)
+            start = time.perf_counter() if _observers else None
+            super().save(stream, kind=kind)
+            if start is not None:
+                _report("svg_serialize", start)
+            return
 
         if output_format.upper() != "PNG":
             raise ValueError(f"Unsupported format: {output_format}")
 
-        self._save_png(stream, zoom=zoom, resvg_kwargs=resvg_kwargs)
-
-    def _save_png(self, stream, *, zoom=None, resvg_kwargs=None):
-        try:
-            import resvg_py
-        except ImportError:
-            raise ImportError(
-                "PNG support requires the 'resvg-py' package. Install it with: pip install qrplatba[png]"
-            ) from None
+        self._save_png(stream, zoom=zoom, resvg_kwargs=resvg_kwargs, backend=backend)
+
+    async def save_async(
+        self,
+        stream,
+        kind=None,
+        *,
+        output_format=None,
+        zoom=None,
+        resvg_kwargs=None,
+        backend=None,
+        executor=None,
+    ):
+        """Async variant of ``save``, runs in the executor configured by ``qrplatba.aio.configure``"""
+        from qrplatba import aio  # asyncio is imported only by the async API
+
+        return await aio.run_in_executor(
+            self.save,
+            stream,
+            kind,
+            output_format=output_format,
+            zoom=zoom,
+            resvg_kwargs=resvg_kwargs,
+            backend=backend,
+            executor=executor,
+        )
 
-        if resvg_kwargs is None:
-            resvg_kwargs = {"zoom": zoom} if zoom is not None else {}
+    def iter_svg_chunks(self, xml_declaration=True, chunk_size=CHUNK_SIZE):
+        """
+        Returns iterator of the SVG document as encoded ``bytes`` chunks, e.g. for a streaming HTTP response
+
+        Joined chunks are the same as ``save()`` writes (with ``xml_declaration=False`` the same as ``to_string()``).
+        The document head (declaration, border and text) and tail are shared per geometry, and the QR code path is
+        encoded in slices of ``chunk_size`` bytes as they are consumed, without encoding the whole document.
+
+        :param xml_declaration: include XML declaration
+        :param chunk_size: size of the QR code path slices in bytes
+        """
+        _check_chunk_size(chunk_size)
+        if type(self) is QRPlatbaSVGImage and self.path is not None:
+            writer = SvgWriter.for_geometry(self.width, self.outside_border, self.box_size, self.path_mode)
+            head = writer._declaration + writer._head_bytes if xml_declaration else writer._head_bytes
+            d = self.path.get("d")
+            pieces = (d[i : i + chunk_size] for i in range(0, len(d), chunk_size))
+            return _chunked(head, pieces, writer._tail_bytes, chunk_size)
+
+        # subclasses may change any part of the document, which is serialized as a whole and sliced
+        if xml_declaration:
+            data = ET.tostring(self._img, encoding="UTF-8", xml_declaration=True)
         else:
-            resvg_kwargs = {k: v for k, v in resvg_kwargs.items() if k not in ("svg_string", "svg_path")}
-            if zoom is not None:
-                resvg_kwargs["zoom"] = zoom
-
-        # SVG uses mm units; 300 DPI produces print-quality output with readable text
-        resvg_kwargs.setdefault("dpi", 300)
-        resvg_kwargs.setdefault("shape_rendering", "crisp_edges")
+            data = ET.tostring(self._img)
+        return (data[i : i + chunk_size] for i in range(0, len(data), chunk_size))
+
+    def _png_parts(self, *, zoom=None, resvg_kwargs=None, backend=None):
+        """Returns encoded PNG image as list of ``bytes`` parts"""
+        if backend == "native":
+            if resvg_kwargs:
+                raise ValueError("resvg_kwargs are not supported by the native PNG backend")
+            return raster.render_png_parts(self.modules, self.outside_border, self.box_size, zoom=zoom)
+        if backend == "composite":
+            return raster.render_composite_png_parts(
+                self.modules, self.outside_border, self.box_size, zoom=zoom, resvg_kwargs=resvg_kwargs
+            )
+        if backend is not None and backend != "resvg":
+            raise ValueError(f"Unsupported PNG backend: {backend}")
 
-        if "font_files" not in resvg_kwargs and "skip_system_fonts" not in resvg_kwargs:
-            resvg_kwargs["font_files"] = [_INTER_BOLD]
-            resvg_kwargs["skip_system_fonts"] = True
+        resvg_py = _import_resvg()
+        resvg_kwargs = _resvg_options(zoom=zoom, resvg_kwargs=resvg_kwargs)
 
         svg_string = self.to_string(encoding="unicode")
-        png_bytes = resvg_py.svg_to_bytes(svg_string=svg_string, **resvg_kwargs)
+        start = time.perf_counter() if _observers else None
+        png = resvg_py.svg_to_bytes(svg_string=svg_string, **resvg_kwargs)
+        if start is not None:
+            _report("png", start, len(png))
+        return [png]
+
+    def _save_png(self, stream, *, zoom=None, resvg_kwargs=None, backend=None):
+        parts = self._png_parts(zoom=zoom, resvg_kwargs=resvg_kwargs, backend=backend)
 
         if isinstance(stream, (str, bytes, os.PathLike)):
             with open(stream, "wb") as f:
-                f.write(png_bytes)
+                for part in parts:
+                    f.write(part)
+        else:
+            for part in parts:
+                stream.write(part)
+
+    def _encoded_parts(self, output_format, zoom, resvg_kwargs, backend, xml_declaration):
+        """Returns encoded image as list of ``bytes`` parts, the encoding is kept for ``render_into``"""
+        output_format = output_format.upper()
+        key = (output_format, zoom, repr(sorted(resvg_kwargs.items())) if resvg_kwargs else None, backend)
+        if output_format == "SVG":
+            key = (output_format, xml_declaration)
+
+        if self._encoded is not None and self._encoded[0] == key:
+            return self._encoded[1]
+
+        start = time.perf_counter() if _observers and output_format == "SVG" else None
+        if output_format == "SVG" and type(self) is QRPlatbaSVGImage and self.path is not None:
+            # everything except the already built QR code path is shared by all images of the same geometry
+            writer = SvgWriter.for_geometry(self.width, self.outside_border, self.box_size, self.path_mode)
+            parts = writer._parts(self.path.get("d"), xml_declaration)
+        elif output_format == "SVG":
+            if xml_declaration:
+                parts = [ET.tostring(self._img, encoding="UTF-8", xml_declaration=True)]
+            else:
+                parts = [ET.tostring(self._img)]
+        elif output_format == "PNG":
+            parts = self._png_parts(zoom=zoom, resvg_kwargs=resvg_kwargs, backend=backend)
         else:
-            stream.write(png_bytes)
+            raise ValueError(f"Unsupported format: {output_format}")
+        if start is not None:
+            _report("svg_serialize", start, sum(len(part) for part in parts))
+
+        self._encoded = (key, parts)
+        return parts
+
+    def render_size(self, output_format="svg", *, zoom=None, resvg_kwargs=None, backend=None, xml_declaration=True):
+        """
+        Returns size of the encoded image in bytes, to preallocate the buffer for ``render_into``
+
+        The encoded image is kept until the following ``render_into`` with the same arguments, which only copies it.
+        """
+        parts = self._encoded_parts(output_format, zoom, resvg_kwargs, backend, xml_declaration)
+        return sum(len(part) for part in parts)
+
+    def render_into(
+        self,
+        buffer,
+        offset=0,
+        output_format="svg",
+        *,
+        zoom=None,
+        resvg_kwargs=None,
+        backend=None,
+        xml_declaration=True,
+    ):
+        """
+        Writes encoded image into a writable buffer, without building an intermediate ``bytes`` object
+
+        The output is the same as ``save()`` writes (with ``xml_declaration=False`` the same as ``to_string()``).
+
+        :param buffer: writable bytes-like object, e.g. ``bytearray``, ``memoryview`` or ``mmap``
+        :param offset: position in the buffer to write the image at
+        :param output_format: ``"svg"`` or ``"png"``, other arguments are the same as in ``save()``
+        :return: number of bytes written
+        """
+        parts = self._encoded_parts(output_format, zoom, resvg_kwargs, backend, xml_declaration)
+        size = sum(len(part) for part in parts)
+
+        with memoryview(buffer) as view:
+            if offset < 0 or offset + size > view.nbytes:
+                raise ValueError(f"Buffer too small (needs {size} bytes at offset {offset}, has {view.nbytes})")
+            with view.cast("B") as target:
+                for part in parts:
+                    target[offset : offset + len(part)] = part
+                    offset += len(part)
+
+        self._encoded = None
+        return size
+
+
+# Decimal constants the fixed-point geometry is derived for
+_FIXED_CONSTANTS = {"FONT_SIZE": "3.5", "FONT_HEIGHT": "10", "LINE_SIZE": "0.5"}
+
+
+def _supports_fixed_geometry(img, border, box_size):
+    """Returns True if ``_fixed_frame`` computes the same strings as the Decimal arithmetic for the image"""
+    return (
+        type(border) is int
+        and border >= 0
+        and type(box_size) is int
+        and box_size > 0
+        and type(img.INSIDE_BORDER) is int
+        and img.INSIDE_BORDER >= 0
+        and all(type(segment) is int and segment >= 0 for segment in img.BOTTOM_LINE_SEGMENTS)
+        and all(
+            type(getattr(img, name)) is Decimal and str(getattr(img, name)) == value
+            for name, value in _FIXED_CONSTANTS.items()
+        )
+    )
+
+
+def _is_default_drawer(drawer):
+    return type(drawer) is svg_drawers.SvgPathSquareDrawer and drawer.size_ratio == 1
+
+
+def _places(microns):
+    """Number of decimal places of the length in millimetres"""
+    return len(f"{microns % 1000:03d}".rstrip("0"))
+
+
+def _mm(microns, places=0):
+    """Formats length in micrometres as millimetres with at least ``places`` decimal places, same as ``str(Decimal)``"""
+    whole, fraction = divmod(microns, 1000)
+    digits = f"{fraction:03d}".rstrip("0").ljust(places, "0")
+    return f"{whole}.{digits}" if digits else str(whole)
+
+
+def _fixed_frame(img):
+    """
+    Computes ``Frame`` of the image in integer micrometres
+
+    ``str(Decimal)`` shows the decimal places of the exponent, which is the smallest exponent of the terms of a sum
+    (zero terms included), so every coordinate is formatted with the places of its most precise term.
+    """
+    ratio = 100 * img.box_size  # micrometres per module
+    ob = img.outside_border * ratio
+    ib = img.INSIDE_BORDER * ratio
+    wd = img.width * ratio
+    ln = int(img.LINE_SIZE * ratio)
+    p_ob, p_ib, p_wd, p_ln, p_ratio = (_places(value) for value in (ob, ib, wd, ln, ratio))
+    p_sizes = max(p_ob, p_ib, p_wd, p_ln)
+
+    def sizes(outside, inside, width, line):
+        return _mm(outside * ob + inside * ib + width * wd + line * ln, p_sizes)
+
+    first, second = img.BOTTOM_LINE_SEGMENTS
+    horizontal_line = "M{},{}h{}v{}h-{}z"
+    vertical_line = "M{},{}v{}h{}v-{}z"
+    bottom = sizes(1, 2, 1, 1)
+    lines = (
+        # top line
+        (horizontal_line, _mm(ob), _mm(ob), sizes(0, 2, 1, 2)),
+        # bottom line - first and second segment
+        (horizontal_line, _mm(ob), bottom, _mm(first * ratio, p_ratio)),
+        (
+            horizontal_line,
+            _mm(ob + second * ratio, max(p_ob, p_ratio)),
+            bottom,
+            _mm(2 * ib + wd + 2 * ln - second * ratio, max(p_sizes, p_ratio)),
+        ),
+        # left and right line
+        (vertical_line, _mm(ob), _mm(ob + ln, max(p_ob, p_ln)), _mm(wd + 2 * ib, max(p_wd, p_ib))),
+        (vertical_line, bottom, sizes(1, 0, 0, 1), sizes(0, 2, 1, 0)),
+    )
+    line_size = _mm(ln)
+    border_path = " ".join(template.format(x0, y0, length, line_size, length) for template, x0, y0, length in lines)
+
+    # FONT_HEIGHT / 5 is the text baseline offset in modules
+    baseline = int(img.FONT_HEIGHT / 5) * ratio
+    text_x = _mm(ob + ln + 3 * ratio, max(p_ob, p_ln, p_ratio))
+    text_y = _mm(ob + ln + 2 * ib + wd + baseline, max(p_ob, p_ln, p_ib, p_wd, p_ratio))
+    # font size is quantized to hundredths
+    text_style = img.QR_TEXT_STYLE.format(size=_mm(int(img.FONT_SIZE * ratio), 2))
+
+    # the pixel size has one decimal place (the border includes LINE_SIZE), FONT_HEIGHT * ratio is added to it in
+    # pixels (tenths of millimetre)
+    size = wd + 2 * (ob + ib + ln)
+    height = size + int(img.FONT_HEIGHT * ratio) // 10
+    # module edges, the pixel coordinates have one decimal place as well
+    start = ob + ib + ln
+    grid = tuple(_mm(start + i * ratio, 1) for i in range(img.width + 1))
+
+    return Frame(
+        view_box=f"0 0 {_mm(size, 1)} {_mm(height, 1)}",
+        height=f"{_mm(height)}mm",
+        border_path=border_path,
+        text_style=text_style,
+        text_x=text_x,
+        text_y=text_y,
+        grid=grid,
+    )
+
+
+def _module_subpaths(modules, grid):
+    """Yields one square subpath per dark module, same as the qrcode path drawer"""
+    starts, ends = grid[:-1], grid[1:]
+    for row, line in enumerate(modules):
+        y0, y1 = starts[row], ends[row]
+        for col, dark in enumerate(line):
+            if dark:
+                x0 = starts[col]
+                yield f"M{x0},{y0}H{ends[col]}V{y1}H{x0}z"
+
+
+def _run_subpaths(modules, grid):
+    """Yields one rectangle subpath per horizontal run of dark modules"""
+    for row, line in enumerate(modules):
+        y0, y1 = grid[row], grid[row + 1]
+        col = 0
+        for dark, run in itertools.groupby(line):
+            end = col + len(list(run))
+            if dark:
+                yield f"M{grid[col]},{y0}H{grid[end]}V{y1}H{grid[col]}z"
+            col = end
+
+
+_RIGHT, _DOWN, _LEFT, _UP = (1, 0), (0, 1), (-1, 0), (0, -1)
+
+
+def _contour_subpaths(modules, grid):
+    """
+    Yields one polygon subpath per outline of each connected region of dark modules.
+
+    Outlines are traced clockwise and holes counter-clockwise, so the path is filled correctly with the nonzero fill
+    rule. Vertices are points of the module grid, ``(column, row)``.
+    """
+    width = len(modules[0]) if modules else 0
+    empty = [False] * (width + 2)
+    padded = [empty] + [[False, *line, False] for line in modules] + [empty]
+
+    # outgoing outline edges per vertex, each edge has the dark module on its right side
+    edges = {}
+    # every outline has an edge going right, these are visited in row-major order
+    starts = []
+    for row in range(len(modules)):
+        above, line, below = padded[row], padded[row + 1], padded[row + 2]
+        for col in range(width):
+            if not line[col + 1]:
+                continue
+            if not above[col + 1]:
+                edges.setdefault((col, row), []).append(_RIGHT)
+                starts.append((col, row))
+            if not line[col + 2]:
+                edges.setdefault((col + 1, row), []).append(_DOWN)
+            if not below[col + 1]:
+                edges.setdefault((col + 1, row + 1), []).append(_LEFT)
+            if not line[col]:
+                edges.setdefault((col, row + 1), []).append(_UP)
+
+    for start in starts:
+        while start in edges:
+            vertex, direction = start, _UP
+            corners = []
+            while True:
+                outgoing = edges[vertex]
+                if len(outgoing) == 1:
+                    next_direction = outgoing[0]
+                    del edges[vertex]
+                else:
+                    # where two regions touch diagonally, turn right to keep them apart
+                    right = (-direction[1], direction[0])
+                    next_direction = right if right in outgoing else outgoing[0]
+                    outgoing.remove(next_direction)
+                if next_direction != direction:
+                    corners.append(vertex)
+                    direction = next_direction
+                vertex = (vertex[0] + direction[0], vertex[1] + direction[1])
+                if vertex == start:
+                    break
+
+            x, y = corners[0]
+            parts = [f"M{grid[x]},{grid[y]}"]
+            # corners alternate horizontal and vertical moves, the last one back to start is closed by z
+            for (x0, _), (x, y) in zip(corners, corners[1:]):
+                parts.append(f"H{grid[x]}" if x != x0 else f"V{grid[y]}")
+            parts.append("z")
+            yield "".join(parts)
+
+
+def _merged_subpaths(modules, grid, path_mode):
+    """Returns list of QR code subpaths for the path mode, see ``PATH_MODES``"""
+    if path_mode == "runs":
+        return list(_run_subpaths(modules, grid))
+    return list(_contour_subpaths(modules, grid))
+
+
+def _iter_subpaths(modules, grid, path_mode):
+    """Returns iterator of QR code subpaths for the path mode, computed lazily"""
+    if path_mode == "runs":
+        return _run_subpaths(modules, grid)
+    if path_mode == "contours":
+        return _contour_subpaths(modules, grid)
+    return _module_subpaths(modules, grid)
+
+
+def _check_chunk_size(chunk_size):
+    if chunk_size < 1:
+        raise ValueError(f"Invalid chunk size (was {chunk_size}, expected at least 1)")
+
+
+def _chunked(head, pieces, tail, chunk_size):
+    """
+    Yields ``head``, the ASCII string pieces joined and encoded into chunks of at least ``chunk_size`` bytes (except
+    the last one), and ``tail``
+    """
+    yield head
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield "".join(buffer).encode()
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode()
+    yield tail
+
+
+class SvgWriter:
+    """
+    Writes QR Platba SVG documents directly from the QR code matrix, without building the ElementTree.
+
+    Everything except the module path depends only on the QR code width, border and box size, so it is
+    serialized once by ``QRPlatbaSVGImage`` itself. The output is identical to ``QRPlatbaSVGImage.save()``
+    and ``to_string()``.
+    """
+
+    _PATH_PLACEHOLDER = "__qr_path__"
+
+    def __init__(self, width, border=2, box_size=10, path_mode="modules"):
+        """
+        :param width: QR code width in modules (``QRCode.modules_count``)
+        :param border: outside border, same as in ``QRPlatbaGenerator.make_image``
+        :param box_size: box size, same as in ``QRPlatbaGenerator.make_image``
+        :param path_mode: shape of the QR code path, same as in ``QRPlatbaSVGImage``
+        """
+        border, box_size = _int_geometry(border, box_size)
+        self.width = width
+        self.border = border
+        self.box_size = box_size
+        self.path_mode = path_mode
+
+        skeleton = QRPlatbaSVGImage(border, width, box_size, qrcode_modules=None, path_mode=path_mode)
+
+        # serialized without the instrumented to_string() and save(), building the writer is not an image encoding
+        document = ET.tostring(skeleton._img, encoding="unicode")
+        self._head = document.removesuffix("</svg>")
+        path_el = ET.Element(
+            ET.QName("path"),  # type: ignore
+            d=self._PATH_PLACEHOLDER,
+            id="qr-path",
+            **skeleton.QR_PATH_STYLE,
+        )
+        path_head, path_tail = ET.tostring(path_el, encoding="unicode").split(self._PATH_PLACEHOLDER)
+        self._head += path_head
+        self._tail = path_tail + "</svg>"
+        self._head_bytes = self._head.encode()
+        self._tail_bytes = self._tail.encode()
+
+        saved = io.BytesIO()
+        skeleton._write(saved)
+        self._declaration = saved.getvalue().split(b"<svg", 1)[0]
+
+        # coordinate strings of module edges, formatted exactly as the path drawer formats them
+        self._grid = skeleton._grid()
+
+    @classmethod
+    def for_geometry(cls, width, border=2, box_size=10, path_mode="modules"):
+        """Returns writer for the given geometry, cached in ``writer_cache``"""
+        border, box_size = _int_geometry(border, box_size)
+        key = (cls, width, border, box_size, path_mode)
+        return writer_cache.get_or_create(key, lambda: cls(width, border, box_size, path_mode))
+
+    def path(self, modules):
+        """Returns the ``d`` attribute of the QR code path for the given QR code matrix"""
+        if self.path_mode != "modules":
+            return "".join(_merged_subpaths(modules, self._grid, self.path_mode))
+        return "".join(_module_subpaths(modules, self._grid))
+
+    def iter_chunks(self, modules, xml_declaration=True, chunk_size=CHUNK_SIZE):
+        """
+        Returns iterator of the SVG document as encoded ``bytes`` chunks, joined the same as ``to_bytes``
+
+        The document head (declaration, border and text) and tail are shared per geometry, the QR code path is
+        computed lazily while iterating and yielded in chunks of about ``chunk_size`` bytes.
+        """
+        _check_chunk_size(chunk_size)
+        head = self._declaration + self._head_bytes if xml_declaration else self._head_bytes
+        return _chunked(head, _iter_subpaths(modules, self._grid, self.path_mode), self._tail_bytes, chunk_size)
+
+    def to_string(self, modules):
+        """Returns SVG document as ``str``, same as ``QRPlatbaSVGImage.to_string(encoding="unicode")``"""
+        return self._head + self.path(modules) + self._tail
+
+    def to_bytes(self, modules, xml_declaration=True):
+        """
+        Returns SVG document as ``bytes``
+
+        :param xml_declaration: include XML declaration, same as ``QRPlatbaSVGImage.save()``. Without it the output
+            is the same as ``QRPlatbaSVGImage.to_string()``.
+        """
+        return b"".join(self.to_parts(modules, xml_declaration))
+
+    def to_parts(self, modules, xml_declaration=True):
+        """Returns SVG document as list of ``bytes`` parts, same as ``to_bytes`` without joining them"""
+        start = time.perf_counter() if _observers else None
+        parts = self._parts(self.path(modules), xml_declaration)
+        if start is not None:
+            _report("svg_write", start, sum(len(part) for part in parts))
+        return parts
+
+    def _parts(self, path, xml_declaration):
+        parts = [self._head_bytes, path.encode(), self._tail_bytes]
+        if xml_declaration:
+            parts.insert(0, self._declaration)
+        return parts
+
+
+def _int_geometry(border, box_size):
+    """
+    Returns border and box size truncated to ``int``, same as ``qrcode.QRCode`` does for ``make_image``, so that
+    images written without ``QRCode`` have the same geometry
+    """
+    return int(border), int(box_size)
+
+
+def _import_resvg():
+    """Imports the optional resvg_py module used for PNG rendering"""
+    try:
+        import resvg_py
+    except ImportError:
+        raise ImportError(
+            "PNG support requires the 'resvg-py' package. Install it with: pip install qrplatba[png]"
+        ) from None
+    return resvg_py
+
+
+def _resvg_options(zoom=None, resvg_kwargs=None):
+    """Returns keyword arguments for resvg_py.svg_to_bytes with the default DPI, rendering and font settings"""
+    if resvg_kwargs is None:
+        resvg_kwargs = {"zoom": zoom} if zoom is not None else {}
+    else:
+        resvg_kwargs = {k: v for k, v in resvg_kwargs.items() if k not in ("svg_string", "svg_path")}
+        if zoom is not None:
+            resvg_kwargs["zoom"] = zoom
+
+    # SVG uses mm units; 300 DPI produces print-quality output with readable text
+    resvg_kwargs.setdefault("dpi", 300)
+    resvg_kwargs.setdefault("shape_rendering", "crisp_edges")
+
+    if "font_files" not in resvg_kwargs and "skip_system_fonts" not in resvg_kwargs:
+        resvg_kwargs["font_files"] = [_INTER_BOLD]
+        resvg_kwargs["skip_system_fonts"] = True
+
+    return resvg_kwargs
@@ -0,0 +1,67 @@
+"""SPAYD string templates for payments which differ only in a few fields."""
+
+import time
+
+from qrplatba.instrument import _observers, _report
+from qrplatba.spayd import _FIELD_FORMATTERS, SpaydGenerator, normalize_spayd
+
+
+class SpaydTemplate:
+    """
+    SPAYD string template for payments which differ only in a few fields, e.g. reminders of an invoice.
+
+    The fixed fields are serialized once, ``get_text`` then formats only the variable fields.
+    """
+
+    def __init__(self, account, *, variable_fields=("amount", "due_date", "x_vs"), **fields):
+        """
+        :param account: ACC account number, see ``SpaydGenerator``
+        :param variable_fields: names of the ``SpaydGenerator`` fields set per payment, all except account and bic
+        :param fields: the other ``SpaydGenerator`` fields, values of variable fields are used as their defaults
+        """
+        for name in variable_fields:
+            if name not in _FIELD_FORMATTERS:
+                raise ValueError(f"Unsupported variable field: {name}")
+        generator = SpaydGenerator(account, **fields)
+        self.variable_fields = tuple(name for name in _FIELD_FORMATTERS if name in variable_fields)
+        self.defaults = {name: getattr(generator, name) for name in self.variable_fields}
+        # all SpaydGenerator arguments, for payments of the template which are generators themselves
+        self._fields = {name: getattr(generator, name) for name in ("account", "bic", *_FIELD_FORMATTERS)}
+
+        # fixed parts of the string before, between and after the variable fields
+        chunks = []
+        chunk = "SPD*1.0*" + generator._account
+        for name, format_field in _FIELD_FORMATTERS.items():
+            if name in self.defaults:
+                chunks.append(chunk)
+                chunk = ""
+            else:
+                chunk += format_field(getattr(generator, name))
+        chunks.append(chunk)
+        self._chunks = chunks
+        # chunks consist of whole SPAYD parts, so that they can be normalized separately
+        self._normalized_chunks = [normalize_spayd(chunk) for chunk in chunks]
+        self._formatters = [_FIELD_FORMATTERS[name] for name in self.variable_fields]
+
+    def get_text(self, normalize=False, **values):
+        """
+        Returns SPAYD string with the variable fields set, same as ``SpaydGenerator.get_text()`` of all the fields
+
+        :param normalize: see ``SpaydGenerator.get_text``
+        :param values: values of the variable fields, the others keep the template defaults
+        """
+        for name in values:
+            if name not in self.defaults:
+                raise ValueError(f"Not a variable field of the template: {name}")
+
+        start = time.perf_counter() if _observers else None
+        chunks = self._normalized_chunks if normalize else self._chunks
+        parts = [chunks[0]]
+        for name, format_field, chunk in zip(self.variable_fields, self._formatters, chunks[1:]):
+            part = format_field(values[name] if name in values else self.defaults[name])
+            parts.append(normalize_spayd(part) if normalize and part else part)
+            parts.append(chunk)
+        text = "".join(parts).rstrip("*")
+        if start is not None:
+            _report("spayd", start, len(text.encode()))
+        return text
@@ -0,0 +1,47 @@
+"""
+Renders the "QR platba" text mask used by the native PNG rasterizer (qrplatba/raster.py).
+
+The text is rendered with resvg and Inter Bold at a large font size, cropped and saved as 8-bit grayscale PNG where
+the gray level is the text coverage. Run after changing the font or the text style and update ``_TEXT_MASK_EM`` and
+``_TEXT_MASK_ORIGIN`` in qrplatba/raster.py with the printed values:
+
+    uv run python scripts/render_text_mask.py
+"""
+
+import resvg_py
+
+from qrplatba.raster import _PNG_GRAY, _TEXT_MASK, _decode_png, _encode_png
+from qrplatba.svg import _INTER_BOLD, QRPlatbaSVGImage
+
+EM = 128
+CANVAS_WIDTH, CANVAS_HEIGHT = 8 * EM, 2 * EM
+ORIGIN_X, ORIGIN_Y = EM // 2, EM
+
+
+def render_alpha():
+    style = QRPlatbaSVGImage.QR_TEXT_STYLE.format(size=EM)
+    svg = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{CANVAS_WIDTH}" height="{CANVAS_HEIGHT}">'
+        f'<text style="{style}" x="{ORIGIN_X}" y="{ORIGIN_Y}">QR platba</text></svg>'
+    )
+    png = bytes(resvg_py.svg_to_bytes(svg_string=svg, font_files=[_INTER_BOLD], skip_system_fonts=True))
+    _, _, rows = _decode_png(png)
+    return [row[3::4] for row in rows]
+
+
+def main():
+    alpha = render_alpha()
+    ys = [y for y, row in enumerate(alpha) if any(row)]
+    xs = [x for x in range(CANVAS_WIDTH) if any(row[x] for row in alpha)]
+    # one empty pixel on each side keeps the resampled edges intact
+    x0, x1, y0, y1 = xs[0] - 1, xs[-1] + 2, ys[0] - 1, ys[-1] + 2
+
+    scanlines = [b"\x00" + bytes(row[x0:x1]) for row in alpha[y0:y1]]
+    _TEXT_MASK.write_bytes(_encode_png(x1 - x0, y1 - y0, _PNG_GRAY, scanlines, compress_level=9))
+
+    print(f"_TEXT_MASK_EM = {EM}")
+    print(f"_TEXT_MASK_ORIGIN = ({ORIGIN_X - x0}, {ORIGIN_Y - y0})")
+
+
+if __name__ == "__main__":
+    main()
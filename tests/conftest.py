@@ -0,0 +1,22 @@
+import importlib.util
+
+import pytest
+
+
+def _resvg_accepts_float_zoom():
+    """Older resvg-py releases (0.3.2 is the newest for Python 3.9) accept only integer zoom"""
+    if not importlib.util.find_spec("resvg_py"):
+        return False
+    import resvg_py
+
+    svg = '<svg xmlns="http://www.w3.org/2000/svg" width="1" height="1"/>'
+    try:
+        resvg_py.svg_to_bytes(svg_string=svg, zoom=1.5)
+    except TypeError:
+        return False
+    return True
+
+
+requires_float_zoom = pytest.mark.skipif(
+    not _resvg_accepts_float_zoom(), reason="resvg_py not installed or does not accept float zoom"
+)
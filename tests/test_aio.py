@@ -0,0 +1,78 @@
+import asyncio
+import importlib.util
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from qrplatba import QRPlatbaGenerator, aio
+
+DATA = {"account": "123456789/0123", "amount": 400.56, "x_vs": 2034456, "message": "text"}
+
+
+@pytest.fixture(autouse=True)
+def reset_configuration():
+    yield
+    aio.configure()
+
+
+class TestAsyncRendering:
+    """Async variants must produce the same output as the blocking methods."""
+
+    def test_make_image_async(self):
+        generator = QRPlatbaGenerator(**DATA)
+        img = asyncio.run(generator.make_image_async(box_size=12))
+        assert img.to_string() == generator.make_image(box_size=12).to_string()
+
+    def test_save_async_svg(self):
+        img = QRPlatbaGenerator(**DATA).make_image()
+        buffer = io.BytesIO()
+        asyncio.run(img.save_async(buffer))
+        assert buffer.getvalue() == QRPlatbaGenerator(**DATA).make_svg()
+
+    @pytest.mark.skipif(not importlib.util.find_spec("resvg_py"), reason="resvg_py not installed")
+    def test_save_async_png(self):
+        img = QRPlatbaGenerator(**DATA).make_image()
+        expected, buffer = io.BytesIO(), io.BytesIO()
+        img.save(expected, output_format="png")
+        asyncio.run(img.save_async(buffer, output_format="png"))
+        assert buffer.getvalue() == expected.getvalue()
+
+    def test_configured_executor(self):
+        thread_names = []
+
+        def record():
+            thread_names.append(threading.current_thread().name)
+
+        with ThreadPoolExecutor(thread_name_prefix="qrplatba-test") as executor:
+            aio.configure(executor=executor)
+            asyncio.run(aio.run_in_executor(record))
+        assert thread_names[0].startswith("qrplatba-test")
+
+    def test_max_concurrency(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def work():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.pop()
+
+        async def burst():
+            await asyncio.gather(*(aio.run_in_executor(work) for _ in range(10)))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            aio.configure(executor=executor, max_concurrency=2)
+            asyncio.run(burst())
+            asyncio.run(burst())  # semaphore of a new event loop
+        assert max(peak) == 2
+
+    def test_invalid_concurrency(self):
+        with pytest.raises(ValueError, match="concurrency limit"):
+            aio.configure(max_concurrency=0)
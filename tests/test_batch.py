@@ -0,0 +1,55 @@
+import importlib.util
+import io
+from datetime import date
+
+import pytest
+
+from qrplatba import QRPlatbaGenerator, SpaydGenerator
+from qrplatba.batch import render_many
+
+PAYMENTS = [
+    {"account": "123456789/0123", "amount": 400.56, "x_vs": 2034456, "message": "text", "due_date": date(2025, 6, 15)},
+    {"account": "CZ6508000000192000145399"},
+    {"account": "19-2000145399/0800", "amount": 1, "message": "A much longer message to push the QR version up" * 2},
+    {"account": "CZ6508000000192000145399", "amount": 0.1},
+]
+
+
+def render_single(payment, output_format="svg", **kwargs):
+    buffer = io.BytesIO()
+    QRPlatbaGenerator(**payment).make_image(**kwargs).save(buffer, output_format=output_format)
+    return buffer.getvalue()
+
+
+class TestRenderMany:
+    """Batch output must match images rendered one by one, in input order."""
+
+    @pytest.mark.parametrize("kwargs", [{}, {"border": 0, "box_size": 12}])
+    def test_matches_single_render(self, kwargs):
+        assert list(render_many(PAYMENTS, **kwargs)) == [render_single(p, **kwargs) for p in PAYMENTS]
+
+    def test_accepts_generators(self):
+        generators = [SpaydGenerator(**p) for p in PAYMENTS]
+        assert list(render_many(generators)) == list(render_many(PAYMENTS))
+
+    def test_is_lazy(self):
+        def payments():
+            yield PAYMENTS[0]
+            raise AssertionError("consumed too eagerly")
+
+        assert next(render_many(payments())) == render_single(PAYMENTS[0])
+
+    def test_path_mode(self):
+        assert list(render_many(PAYMENTS, path_mode="contours")) == [
+            QRPlatbaGenerator(**p).make_svg(path_mode="contours") for p in PAYMENTS
+        ]
+        with pytest.raises(ValueError, match="Unsupported path mode"):
+            render_many(PAYMENTS, path_mode="circles")
+
+    def test_unsupported_format(self):
+        with pytest.raises(ValueError, match="Unsupported format"):
+            render_many(PAYMENTS, format="bmp")
+
+    @pytest.mark.skipif(not importlib.util.find_spec("resvg_py"), reason="resvg_py not installed")
+    def test_png(self):
+        assert list(render_many(PAYMENTS[:2], format="png")) == [render_single(p, "png") for p in PAYMENTS[:2]]
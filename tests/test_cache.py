@@ -0,0 +1,130 @@
+import os
+import stat
+import sys
+
+import pytest
+
+from qrplatba import QRPlatbaGenerator
+from qrplatba.cache import DirectoryBackend, LRUCache, MemoryBackend, RenderCache
+from qrplatba.svg import frame_cache
+
+
+class TestLRUCache:
+    """LRUCache must evict least recently used values and count hits and misses."""
+
+    def test_hits_and_misses(self):
+        cache = LRUCache(maxsize=2)
+        assert cache.get_or_create("a", lambda: 1) == 1
+        assert cache.get_or_create("a", lambda: 2) == 1
+        info = cache.cache_info()
+        assert (info.hits, info.misses, info.maxsize, info.currsize) == (1, 1, 2, 1)
+
+    def test_eviction(self):
+        cache = LRUCache(maxsize=2)
+        cache.get_or_create("a", lambda: 1)
+        cache.get_or_create("b", lambda: 2)
+        cache.get_or_create("a", lambda: 1)  # "b" is now least recently used
+        cache.get_or_create("c", lambda: 3)
+        assert len(cache) == 2
+        assert cache.get_or_create("b", lambda: "new") == "new"
+        assert cache.get_or_create("c", lambda: "new") == 3
+
+    def test_clear(self):
+        cache = LRUCache()
+        cache.get_or_create("a", lambda: 1)
+        cache.cache_clear()
+        assert cache.cache_info() == (0, 0, 128, 0)
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError, match="cache size"):
+            LRUCache(maxsize=0)
+
+
+class TestFrameCache:
+    """Geometry of the border and text must be computed once per geometry and reused."""
+
+    def test_frame_reused(self):
+        frame_cache.cache_clear()
+        first = QRPlatbaGenerator("CZ6508000000192000145399", x_vs=1).make_image(box_size=13).to_string()
+        assert frame_cache.cache_info().misses == 1
+
+        second = QRPlatbaGenerator("CZ6508000000192000145399", x_vs=2).make_image(box_size=13).to_string()
+        assert frame_cache.cache_info().misses == 1
+        assert frame_cache.cache_info().hits >= 1
+        assert first != second
+
+    def test_frame_per_geometry(self):
+        frame_cache.cache_clear()
+        generator = QRPlatbaGenerator("CZ6508000000192000145399")
+        for box_size in (10, 11):
+            for border in (0, 2):
+                generator.make_image(border=border, box_size=box_size)
+        assert frame_cache.cache_info().misses == 4
+
+
+class TestRenderCache:
+    """Rendered images must be cached per SPAYD string and render options."""
+
+    data = {"account": "123456789/0123", "amount": 400.56, "x_vs": 2034456}
+
+    @pytest.mark.parametrize("backend_name", ["memory", "directory"])
+    def test_hit_returns_same_image(self, tmp_path, backend_name):
+        backend = MemoryBackend() if backend_name == "memory" else DirectoryBackend(tmp_path)
+        cache = RenderCache(backend)
+        generator = QRPlatbaGenerator(**self.data)
+
+        first = generator.render(cache=cache)
+        second = QRPlatbaGenerator(**self.data).render(cache=cache)
+        assert first == second == generator.render()
+        assert (cache.hits, cache.misses, cache.bytes_saved) == (1, 1, len(first))
+        assert cache.hit_rate == 0.5
+
+    def test_options_in_key(self):
+        cache = RenderCache()
+        generator = QRPlatbaGenerator(**self.data)
+        images = {
+            generator.render(cache=cache),
+            generator.render(border=0, cache=cache),
+            generator.render(box_size=12, cache=cache),
+            generator.render(error_correction=3, cache=cache),
+            QRPlatbaGenerator(**{**self.data, "x_vs": 1}).render(cache=cache),
+        }
+        assert len(images) == 5
+        assert cache.misses == 5
+
+    def test_memory_backend_eviction(self):
+        backend = MemoryBackend(max_bytes=10)
+        backend.set("a", b"12345")
+        backend.set("b", b"12345")
+        backend.get("a")
+        backend.set("c", b"123")
+        assert backend.get("b") is None
+        assert backend.get("a") == b"12345"
+        assert backend.size == 8
+
+        backend.set("d", b"x" * 11)  # larger than the whole cache
+        assert backend.get("d") is None
+
+    def test_directory_backend_leaves_no_temporary_files(self, tmp_path):
+        backend = DirectoryBackend(tmp_path)
+        backend.set("abcdef", b"data")
+        backend.set("abcdef", b"new data")
+        assert backend.get("abcdef") == b"new data"
+        assert [p.name for p in (tmp_path / "ab").iterdir()] == ["abcdef"]
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="POSIX file modes")
+    @pytest.mark.parametrize("umask", [0o022, 0o077])
+    def test_directory_backend_file_mode(self, tmp_path, umask):
+        old_umask = os.umask(umask)
+        try:
+            with pytest.MonkeyPatch.context() as monkeypatch:
+                # changing the process-wide umask would race with other threads creating files
+                monkeypatch.setattr(os, "umask", None)
+                DirectoryBackend(tmp_path).set("abcdef", b"data")
+        finally:
+            os.umask(old_umask)
+        assert stat.S_IMODE((tmp_path / "ab" / "abcdef").stat().st_mode) == 0o666 & ~umask
+
+    def test_unsupported_format(self):
+        with pytest.raises(ValueError, match="Unsupported format"):
+            QRPlatbaGenerator(**self.data).render("bmp")
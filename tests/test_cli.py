@@ -0,0 +1,133 @@
+import importlib.util
+import io
+import json
+import zipfile
+
+import pytest
+
+from qrplatba import QRPlatbaGenerator
+from qrplatba.cli import main
+
+CSV_DATA = """id,account,amount,x_vs,message,due_date,alternate_accounts
+A1,123456789/0123,400.56,2034456,text,2025-06-15,
+A2,CZ6508000000192000145399,12,,,20250101,"123456789/0800,SK3112000000198742637541"
+"""
+
+JSONL_DATA = """{"id": "A1", "account": "123456789/0123", "amount": 400.56, "x_vs": 2034456, "message": "text"}
+
+{"id": "A2", "account": "CZ6508000000192000145399", "amount": "12"}
+"""
+
+
+def expected_svg(**kwargs):
+    return QRPlatbaGenerator(**kwargs).make_svg()
+
+
+class TestCLI:
+    """The qrplatba command must stream payments from CSV/JSONL into images or SPAYD strings."""
+
+    def test_csv_to_svg_directory(self, tmp_path):
+        source = tmp_path / "payments.csv"
+        source.write_text(CSV_DATA)
+        assert main([str(source), "-o", str(tmp_path / "out"), "--name-field", "id", "-q"]) == 0
+
+        assert sorted(p.name for p in (tmp_path / "out").iterdir()) == ["A1.svg", "A2.svg"]
+        assert (tmp_path / "out" / "A1.svg").read_bytes() == expected_svg(
+            account="123456789/0123", amount=400.56, x_vs=2034456, message="text", due_date="20250615"
+        )
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_jsonl_to_zip(self, tmp_path, jobs):
+        source = tmp_path / "payments.jsonl"
+        source.write_text(JSONL_DATA)
+        archive = tmp_path / "out.zip"
+        assert main([str(source), "-o", str(archive), "-j", str(jobs), "--chunk-size", "1", "-q"]) == 0
+
+        with zipfile.ZipFile(archive) as zf:
+            assert zf.namelist() == ["1.svg", "3.svg"]
+            assert zf.read("3.svg") == expected_svg(account="CZ6508000000192000145399", amount=12)
+
+    def test_stdin_to_spayd(self, monkeypatch, capsys):
+        monkeypatch.setattr("sys.stdin", io.StringIO(CSV_DATA))
+        assert main(["-f", "spayd", "--name-field", "id"]) == 0
+
+        out, err = capsys.readouterr()
+        lines = [json.loads(line) for line in out.splitlines()]
+        assert [line["name"] for line in lines] == ["A1", "A2"]
+        assert lines[1]["spayd"] == (
+            "SPD*1.0*ACC:CZ6508000000192000145399*ALT-ACC:CZ7508000000000123456789,SK3112000000198742637541*"
+            "AM:12.00*DT:20250101"
+        )
+        assert "2 payments processed" in err
+
+    @pytest.mark.skipif(not importlib.util.find_spec("resvg_py"), reason="resvg_py not installed")
+    def test_png(self, tmp_path):
+        source = tmp_path / "payments.jsonl"
+        source.write_text(JSONL_DATA)
+        assert main([str(source), "-f", "png", "-o", str(tmp_path), "-q"]) == 0
+        assert (tmp_path / "1.png").read_bytes()[:4] == b"\x89PNG"
+
+    @pytest.mark.parametrize(
+        "data,message",
+        [
+            ("amount\n12\n", "line 2: account is required"),
+            ("account,amount\nCZ6508000000192000145399,abc\n", "line 2: invalid amount"),
+            ("account,due_date\nCZ6508000000192000145399,2025-13-01\n", "line 2: invalid due date"),
+        ],
+    )
+    def test_invalid_rows(self, monkeypatch, capsys, data, message):
+        monkeypatch.setattr("sys.stdin", io.StringIO(data))
+        with pytest.raises(SystemExit) as exc_info:
+            main(["-f", "spayd"])
+        assert exc_info.value.code == 1
+        assert message in capsys.readouterr().err
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_data_overflow(self, tmp_path, capsys, jobs):
+        source = tmp_path / "payments.csv"
+        source.write_text(f"account,message\n123456789/0123,short\n123456789/0123,{'x' * 3000}\n123456789/0123,\n")
+        with pytest.raises(SystemExit) as exc_info:
+            main([str(source), "-o", str(tmp_path / "out"), "-j", str(jobs), "--chunk-size", "3", "-q"])
+        assert exc_info.value.code == 1
+        assert "line 3: too much data for a QR code" in capsys.readouterr().err
+
+    @pytest.mark.parametrize("output", ["out", "out.zip"])
+    def test_duplicate_names(self, tmp_path, capsys, output):
+        source = tmp_path / "payments.csv"
+        source.write_text("id,account\nA1,123456789/0123\nA2,123456789/0123\nA1,CZ6508000000192000145399\n")
+        with pytest.raises(SystemExit) as exc_info:
+            main([str(source), "-o", str(tmp_path / output), "--name-field", "id", "-q"])
+        assert exc_info.value.code == 1
+        assert "line 4: duplicate name 'A1'" in capsys.readouterr().err
+
+    def test_spayd_file(self, tmp_path):
+        source = tmp_path / "payments.csv"
+        source.write_text("id,account,message\nA1,123456789/0123,Žluťoučký kůň\n", encoding="utf-8")
+        target = tmp_path / "out.jsonl"
+        assert main([str(source), "-f", "spayd", "-o", str(target), "--name-field", "id", "-q"]) == 0
+
+        line = json.loads(target.read_text(encoding="utf-8"))
+        assert line == {"name": "A1", "spayd": "SPD*1.0*ACC:CZ2501230000000123456789*MSG:Žluťoučký kůň"}
+
+    @pytest.mark.parametrize("text", ["[1, 2]", "3", '"CZ6508000000192000145399"'])
+    def test_jsonl_not_object(self, monkeypatch, capsys, text):
+        monkeypatch.setattr("sys.stdin", io.StringIO(f'{{"account": "123456789/0123"}}\n{text}\n'))
+        with pytest.raises(SystemExit) as exc_info:
+            main(["-f", "spayd", "-i", "jsonl"])
+        assert exc_info.value.code == 1
+        assert "line 2: expected a JSON object" in capsys.readouterr().err
+
+    @pytest.mark.parametrize("zoom,expected", [("2", 2), ("2.0", 2), ("1.5", 1.5)])
+    def test_integer_zoom(self, tmp_path, monkeypatch, zoom, expected):
+        """resvg-py releases for Python 3.9 raise TypeError on float zoom"""
+        calls = []
+
+        def render_many(payments, format, **kwargs):
+            calls.append(kwargs["zoom"])
+            return (b"" for _ in payments)
+
+        monkeypatch.setattr("qrplatba.cli.render_many", render_many)
+        monkeypatch.setattr("sys.stdin", io.StringIO(CSV_DATA))
+        assert main(["-f", "png", "-o", str(tmp_path), "--zoom", zoom, "-q"]) == 0
+        assert calls == [expected]
+        assert type(calls[0]) is type(expected)
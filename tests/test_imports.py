@@ -0,0 +1,60 @@
+import subprocess
+import sys
+
+import pytest
+
+import qrplatba
+
+RENDERING_MODULES = (
+    "qrcode",
+    "xml.etree.ElementTree",
+    "asyncio",
+    "qrplatba.generator",
+    "qrplatba.renderer",
+    "qrplatba.svg",
+)
+
+
+# modules that must not be imported by "import qrplatba" alone, the import time is measured by
+# benchmarks/bench_import.py
+HEAVY_MODULES = (
+    *RENDERING_MODULES,
+    "qrcode.image.svg",
+    "xml.etree",
+    "decimal",
+    "resvg_py",
+    "qrplatba.instrument",
+    "qrplatba.parser",
+    "qrplatba.payment",
+    "qrplatba.template",
+    "qrplatba.iban",
+)
+
+
+def _run(code):
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+
+class TestLazyImports:
+    def test_spayd_without_rendering_stack(self):
+        code = (
+            "import sys\n"
+            "from qrplatba import SpaydGenerator\n"
+            "SpaydGenerator('123456789/0123', 400.56).get_text()\n"
+            f"print(','.join(name for name in {RENDERING_MODULES!r} if name in sys.modules))"
+        )
+        assert _run(code).stdout.strip() == ""
+
+    def test_import_without_heavy_modules(self):
+        code = f"import sys, qrplatba\nprint(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))"
+        assert _run(code).stdout.strip() == ""
+
+    def test_generator_loaded_on_access(self):
+        from qrplatba.generator import QRPlatbaGenerator
+
+        assert qrplatba.QRPlatbaGenerator is QRPlatbaGenerator
+        assert "QRPlatbaGenerator" in dir(qrplatba)
+
+    def test_unknown_attribute(self):
+        with pytest.raises(AttributeError, match="has no attribute 'Rasterizer'"):
+            qrplatba.Rasterizer  # noqa: B018
@@ -0,0 +1,171 @@
+import importlib.util
+import io
+import threading
+
+import pytest
+
+from qrplatba import QRPlatbaGenerator, SpaydGenerator, instrument
+from qrplatba.instrument import HistogramObserver
+from qrplatba.qr import make_modules
+from qrplatba.template import SpaydTemplate
+
+DATA = {"account": "123456789/0123", "amount": 400.56, "x_vs": 2034456, "message": "Žluťoučký kůň"}
+
+requires_resvg = pytest.mark.skipif(not importlib.util.find_spec("resvg_py"), reason="resvg_py not installed")
+
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, stage, seconds, size):
+        assert seconds >= 0
+        self.events.append((stage, size))
+
+    @property
+    def stages(self):
+        return [stage for stage, _ in self.events]
+
+
+class TestObservers:
+    def test_get_text(self):
+        generator = SpaydGenerator(**DATA)
+        with instrument.observe(Recorder()) as recorder:
+            text = generator.get_text()
+            normalized = generator.get_text(normalize=True)
+        assert recorder.events == [("spayd", len(text.encode())), ("spayd", len(normalized))]
+
+    def test_template(self):
+        template = SpaydTemplate(DATA["account"], message=DATA["message"])
+        with instrument.observe(Recorder()) as recorder:
+            text = template.get_text(amount=100)
+        assert recorder.events == [("spayd", len(text.encode()))]
+
+    def test_make_image_and_save(self):
+        generator = QRPlatbaGenerator(**DATA)
+        with instrument.observe(Recorder()) as recorder:
+            img = generator.make_image()
+            data = img.to_string()
+            img.save(io.BytesIO())
+            png = io.BytesIO()
+            img.save(png, output_format="png", backend="native")
+        assert recorder.events == [
+            ("spayd", len(generator.get_text().encode())),
+            ("qr", None),
+            ("svg_tree", None),
+            ("svg_serialize", len(data)),
+            ("svg_serialize", None),
+            ("png_native", len(png.getvalue())),
+        ]
+
+    @pytest.mark.parametrize("path_mode", ["modules", "contours"])
+    def test_render_into(self, path_mode):
+        img = QRPlatbaGenerator(**DATA).make_image(path_mode=path_mode)
+        with instrument.observe(Recorder()) as recorder:
+            size = img.render_size()
+        assert recorder.events == [("svg_serialize", size)]
+
+    def test_svg_writer(self):
+        generator = QRPlatbaGenerator(**DATA)
+        generator.make_svg()  # SvgWriter of the geometry is cached
+        with instrument.observe(Recorder()) as recorder:
+            data = generator.make_svg()
+        assert recorder.events[-1] == ("svg_write", len(data))
+        assert recorder.stages == ["spayd", "qr", "svg_write"]
+
+    def test_make_modules(self):
+        with instrument.observe(Recorder()) as recorder:
+            make_modules(SpaydGenerator(**DATA).get_text())
+        assert recorder.stages == ["spayd", "qr"]
+
+    @requires_resvg
+    def test_resvg(self):
+        img = QRPlatbaGenerator(**DATA).make_image()
+        with instrument.observe(Recorder()) as recorder:
+            png = io.BytesIO()
+            img.save(png, output_format="png")
+        assert recorder.stages == ["svg_serialize", "png"]
+        assert recorder.events[-1] == ("png", len(png.getvalue()))
+
+    def test_observe_removes_observer(self):
+        recorder = Recorder()
+        with pytest.raises(RuntimeError), instrument.observe(recorder):
+            raise RuntimeError
+        SpaydGenerator(**DATA).get_text()
+        assert recorder.events == []
+        assert instrument._observers == []
+
+    def test_add_remove_observer(self):
+        first, second = Recorder(), Recorder()
+        instrument.add_observer(first)
+        instrument.add_observer(second)
+        try:
+            SpaydGenerator(**DATA).get_text()
+        finally:
+            instrument.remove_observer(first)
+        SpaydGenerator(**DATA).get_text()
+        instrument.remove_observer(second)
+        assert first.stages == ["spayd"]
+        assert second.stages == ["spayd", "spayd"]
+
+        with pytest.raises(ValueError):
+            instrument.remove_observer(first)
+
+
+class TestHistogramObserver:
+    def test_stats(self):
+        histograms = HistogramObserver()
+        durations = [i * 1e-6 for i in range(1, 1001)]  # 1 us to 1 ms
+        for seconds in durations:
+            histograms("qr", seconds, None)
+            histograms("spayd", seconds / 10, 50)
+
+        stats = histograms.stats()
+        assert set(stats) == {"qr", "spayd"}
+        qr = stats["qr"]
+        assert qr.count == 1000
+        assert qr.total == pytest.approx(sum(durations))
+        assert qr.mean == pytest.approx(sum(durations) / 1000)
+        assert (qr.min, qr.max) == (durations[0], durations[-1])
+        assert qr.p50 == pytest.approx(500e-6, rel=0.05)
+        assert qr.p90 == pytest.approx(900e-6, rel=0.05)
+        assert qr.p99 == pytest.approx(990e-6, rel=0.05)
+        assert qr.size is None
+        assert stats["spayd"].p50 == pytest.approx(50e-6, rel=0.05)
+        assert stats["spayd"].size == 50 * 1000
+
+    def test_single_value(self):
+        histograms = HistogramObserver()
+        histograms("png", 0.25, 100)
+        stats = histograms.stats()["png"]
+        assert stats.p50 == stats.p99 == stats.min == stats.max == 0.25
+
+    def test_precision(self):
+        histograms = HistogramObserver(buckets_per_octave=32)
+        for _ in range(10):
+            histograms("qr", 123e-6, None)
+        histograms("qr", 1.0, None)
+        assert histograms.stats()["qr"].p50 == pytest.approx(123e-6, rel=0.011)
+
+    def test_reset(self):
+        histograms = HistogramObserver()
+        histograms("qr", 1e-3, None)
+        histograms.reset()
+        assert histograms.stats() == {}
+
+    def test_threads(self):
+        histograms = HistogramObserver()
+        with instrument.observe(histograms):
+            threads = [
+                threading.Thread(target=lambda: [SpaydGenerator(**DATA).get_text() for _ in range(500)])
+                for _ in range(3)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        assert histograms.stats()["spayd"].count == 1500
+
+    def test_invalid_buckets(self):
+        with pytest.raises(ValueError, match=r"Invalid number of buckets per octave \(was 0, expected at least 1\)"):
+            HistogramObserver(buckets_per_octave=0)
@@ -0,0 +1,56 @@
+import importlib.util
+
+import pytest
+
+from qrplatba.batch import render_many
+
+pytestmark = pytest.mark.skipif(not importlib.util.find_spec("resvg_py"), reason="resvg_py not installed")
+
+PAYMENTS = [
+    {"account": "123456789/0123", "amount": amount, "x_vs": amount, "message": f"invoice {amount}"}
+    for amount in range(1, 12)
+]
+
+
+class TestParallelRenderer:
+    """Parallel rendering must return the same PNGs as serial rendering, in input order."""
+
+    @pytest.mark.parametrize("workers,chunk_size,max_pending", [(1, 64, None), (2, 3, 1), (2, 1, None)])
+    def test_matches_serial_render(self, workers, chunk_size, max_pending):
+        from qrplatba.parallel import ParallelRenderer
+
+        with ParallelRenderer(workers, chunk_size, max_pending=max_pending) as renderer:
+            assert renderer.render(PAYMENTS) == list(render_many(PAYMENTS, format="png"))
+
+    def test_render_options(self):
+        from qrplatba.parallel import ParallelRenderer
+
+        kwargs = {"border": 0, "box_size": 12, "zoom": 2}
+        with ParallelRenderer(2, 4, border=0, box_size=12, zoom=2) as renderer:
+            assert renderer.render(PAYMENTS[:5]) == list(render_many(PAYMENTS[:5], format="png", **kwargs))
+
+    def test_spayd_strings(self):
+        from qrplatba import SpaydGenerator
+        from qrplatba.parallel import ParallelRenderer
+
+        texts = [SpaydGenerator(**p).get_text() for p in PAYMENTS[:3]]
+        with ParallelRenderer(2, 2) as renderer:
+            assert renderer.render(texts) == list(render_many(PAYMENTS[:3], format="png"))
+
+    def test_svg(self):
+        from qrplatba.parallel import ParallelRenderer
+
+        with ParallelRenderer(2, 4, format="svg") as renderer:
+            assert renderer.render(PAYMENTS) == list(render_many(PAYMENTS, format="svg"))
+
+    def test_unsupported_format(self):
+        from qrplatba.parallel import ParallelRenderer
+
+        with pytest.raises(ValueError, match="Unsupported format"):
+            ParallelRenderer(format="bmp")
+
+    def test_invalid_chunk_size(self):
+        from qrplatba.parallel import ParallelRenderer
+
+        with pytest.raises(ValueError, match="chunk size"):
+            ParallelRenderer(chunk_size=0)
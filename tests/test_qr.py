@@ -0,0 +1,117 @@
+import pytest
+import qrcode
+from qrcode.exceptions import DataOverflowError
+
+from qrplatba.qr import fit_version, make_qr, optimal_segments
+
+TEXTS = [
+    "SPD*1.0*ACC:CZ2501230000000123456789*AM:400.56*DT:20250615*MSG:text*X-VS:2034456",
+    "SPD*1.0*ACC:CZ6508000000192000145399",
+    "SPD*1.0*ACC:CZ6508000000192000145399*X-VS:" + "1" * 40,
+    "SPD*1.0*ACC:CZ6508000000192000145399*MSG:" + "ZPRAVA PRO PRIJEMCE " * 3,
+    "SPD*1.0*ACC:CZ6508000000192000145399*MSG:" + "zpráva pro příjemce " * 6,
+    "x" * 1000,
+    "1" * 3000,
+]
+
+
+class TestFitVersion:
+    """Directly computed version must match qrcode's best_fit search."""
+
+    @pytest.mark.parametrize("text", TEXTS)
+    @pytest.mark.parametrize("error_correction", [0, 1, 2, 3])
+    def test_same_as_best_fit(self, text, error_correction):
+        qr = qrcode.QRCode(error_correction=error_correction)
+        qr.add_data(text)
+        try:
+            expected = qr.best_fit()
+        except DataOverflowError:
+            with pytest.raises(DataOverflowError):
+                fit_version(qr.data_list, error_correction)
+            return
+        assert fit_version(qr.data_list, error_correction) == expected
+
+    @pytest.mark.parametrize("length", range(0, 2400, 37))
+    def test_version_boundaries(self, length):
+        qr = qrcode.QRCode()
+        qr.add_data("A" * length)
+        assert fit_version(qr.data_list) == qr.best_fit()
+
+
+class TestMakeQR:
+    """make_qr must produce the same matrix as add_data() and make(fit=True)."""
+
+    @pytest.mark.parametrize("text", TEXTS[:5])
+    def test_same_matrix(self, text):
+        qr = qrcode.QRCode()
+        qr.add_data(text)
+        qr.make(fit=True)
+        assert make_qr(text).modules == qr.modules
+
+    @pytest.mark.parametrize("version", [1, 2, 6, 7, 14, 27, 40])
+    @pytest.mark.parametrize("error_correction", [0, 1, 2, 3])
+    def test_same_matrix_all_versions(self, version, error_correction):
+        """Function patterns and data module order are cached per version, the matrix must not change."""
+        text = "x" * (sum(block.data_count for block in qrcode.base.rs_blocks(version, error_correction)) - 4)
+        qr = qrcode.QRCode(error_correction=error_correction)
+        qr.add_data(text)
+        qr.make(fit=True)
+
+        assert qr.version == version
+        assert make_qr(text, error_correction=error_correction).modules == qr.modules
+
+    @pytest.mark.parametrize("mask_pattern", range(8))
+    def test_fixed_mask_pattern(self, mask_pattern):
+        from qrplatba.qr import _make
+
+        expected = qrcode.QRCode(version=8, mask_pattern=mask_pattern)
+        expected.add_data(TEXTS[0])
+        expected.make(fit=False)
+        qr = qrcode.QRCode(version=8, mask_pattern=mask_pattern)
+        qr.add_data(TEXTS[0])
+        _make(qr)
+
+        assert qr.modules == expected.modules
+
+
+class TestOptimalSegments:
+    """Optimal segmentation must keep the data intact and never need more bits than the default chunking."""
+
+    @staticmethod
+    def bits(data_list, version):
+        from qrcode import util
+
+        buffer = util.BitBuffer()
+        mode_sizes = util.mode_sizes_for_version(version)
+        for data in data_list:
+            buffer.put(data.mode, 4)
+            buffer.put(len(data), mode_sizes[data.mode])
+            data.write(buffer)
+        return len(buffer)
+
+    @pytest.mark.parametrize("text", [*TEXTS, "a1B2c3 DEF456ghi*:", "", "0"])
+    def test_segments(self, text):
+        qr = qrcode.QRCode()
+        qr.add_data(text)
+        default_version = qr.best_fit()
+
+        data_list, version = optimal_segments(text)
+        assert b"".join(data.data for data in data_list) == text.encode()
+        assert version <= default_version
+        assert self.bits(data_list, version) <= self.bits(qr.data_list, version)
+        assert version == fit_version(data_list)
+
+    def test_smaller_alphanumeric_code(self):
+        from qrplatba import QRPlatbaGenerator
+
+        generator = QRPlatbaGenerator(
+            "19-2000145399/0800",
+            amount=1250,
+            x_vs=2034456,
+            message="Platba za služby, faktura č. 2034456",
+            recipient_name="Jan Novák",
+        )
+        default = generator.make_image()
+        compact = generator.make_image(alphanumeric=True)
+        assert compact.width < default.width
+        assert len(generator.make_svg(alphanumeric=True)) < len(generator.make_svg())
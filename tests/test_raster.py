@@ -0,0 +1,162 @@
+import importlib.util
+import io
+import sys
+
+import pytest
+from conftest import requires_float_zoom
+
+from qrplatba import QRPlatbaGenerator, raster
+from qrplatba.raster import _decode_png, get_composite_layout, get_layout, render_composite_png, render_png
+
+DATA = {"account": "123456789/0123", "amount": 400.56, "x_vs": 2034456, "message": "text"}
+
+requires_resvg = pytest.mark.skipif(not importlib.util.find_spec("resvg_py"), reason="resvg_py not installed")
+
+
+def _alpha(png):
+    width, height, rows = _decode_png(png)
+    return width, height, [row[3::4] for row in rows]
+
+
+class TestRenderPng:
+    def test_decodes_to_rgba_black(self):
+        img = QRPlatbaGenerator(**DATA).make_image()
+        width, height, rows = _decode_png(render_png(img.modules))
+
+        assert (width, height) == (543, 555)
+        assert all(len(row) == 4 * width for row in rows)
+        assert {bytes(row[i : i + 3]) for row in rows for i in range(0, len(row), 4)} == {b"\x00\x00\x00"}
+
+    def test_modules(self):
+        img = QRPlatbaGenerator(**DATA).make_image()
+        layout = get_layout(img.width)
+        _, _, alpha = _alpha(render_png(img.modules))
+
+        for row_index, line in enumerate(img.modules):
+            y = (layout.edges[row_index] + layout.edges[row_index + 1]) // 2
+            for col, dark in enumerate(line):
+                x = (layout.edges[col] + layout.edges[col + 1]) // 2
+                assert alpha[y][x] == (255 if dark else 0)
+
+    def test_layout_cached(self):
+        assert get_layout(25, 2, 10) is get_layout(25, 2, 10)
+        assert get_layout(25, 2, 10) is not get_layout(25, 2, 10, zoom=2)
+
+    @pytest.mark.parametrize("dpi,zoom", [(0, None), (300, 0), (300, -1)])
+    def test_invalid_resolution(self, dpi, zoom):
+        with pytest.raises(ValueError, match="Invalid DPI or zoom"):
+            get_layout(25, dpi=dpi, zoom=zoom)
+
+
+class TestNativeBackend:
+    def test_save_without_resvg(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, "resvg_py", None)
+        img = QRPlatbaGenerator(**DATA).make_image()
+        buffer = io.BytesIO()
+        img.save(buffer, output_format="png", backend="native")
+
+        assert buffer.getvalue() == render_png(img.modules)
+
+    def test_render(self):
+        generator = QRPlatbaGenerator(**DATA)
+        img = generator.make_image(box_size=12)
+
+        assert generator.render("png", box_size=12, zoom=2, backend="native") == render_png(
+            img.modules, box_size=12, zoom=2
+        )
+
+    def test_resvg_kwargs_not_supported(self):
+        img = QRPlatbaGenerator(**DATA).make_image()
+        with pytest.raises(ValueError, match="not supported by the native PNG backend"):
+            img.save(io.BytesIO(), output_format="png", backend="native", resvg_kwargs={"dpi": 96})
+
+    def test_unsupported_backend(self):
+        img = QRPlatbaGenerator(**DATA).make_image()
+        with pytest.raises(ValueError, match="Unsupported PNG backend"):
+            img.save(io.BytesIO(), output_format="png", backend="cairo")
+
+
+@requires_resvg
+class TestMatchesResvg:
+    """The native rasterizer must match resvg output, except for the anti-aliased edges of the text."""
+
+    @pytest.mark.parametrize("box_size,zoom", [(10, None), (7, None), (10, 2)])
+    def test_pixel_diff(self, box_size, zoom):
+        img = QRPlatbaGenerator(**DATA).make_image(box_size=box_size)
+        expected = io.BytesIO()
+        img.save(expected, output_format="png", zoom=zoom)
+
+        width, height, expected_alpha = _alpha(expected.getvalue())
+        native_width, native_height, alpha = _alpha(render_png(img.modules, box_size=box_size, zoom=zoom))
+        assert (native_width, native_height) == (width, height)
+
+        diffs = [abs(a - b) for row, expected_row in zip(alpha, expected_alpha) for a, b in zip(row, expected_row)]
+        assert max(diffs) < 96
+        assert sum(1 for diff in diffs if diff) < 0.01 * width * height
+
+    @requires_float_zoom
+    @pytest.mark.parametrize("box_size,zoom,dpi", [(10, 1.5, 300), (3, 2.7, 150), (13, 1.33, 96)])
+    def test_image_size(self, box_size, zoom, dpi):
+        img = QRPlatbaGenerator(**DATA).make_image(box_size=box_size)
+        expected = io.BytesIO()
+        img.save(expected, output_format="png", zoom=zoom, resvg_kwargs={"dpi": dpi})
+
+        png = render_png(img.modules, box_size=box_size, zoom=zoom, dpi=dpi)
+        assert png[16:24] == expected.getvalue()[16:24]  # width and height in IHDR
+
+
+@requires_resvg
+class TestCompositeBackend:
+    """Modules composited over the frame rasterized by resvg must match resvg output exactly."""
+
+    @pytest.mark.parametrize(
+        "box_size,zoom,resvg_kwargs", [(10, None, None), (7, None, None), (10, 2, None), (13, None, {"dpi": 96})]
+    )
+    def test_pixel_identical(self, box_size, zoom, resvg_kwargs):
+        img = QRPlatbaGenerator(**DATA).make_image(box_size=box_size)
+        expected = io.BytesIO()
+        img.save(expected, output_format="png", zoom=zoom, resvg_kwargs=resvg_kwargs)
+
+        png = render_composite_png(img.modules, box_size=box_size, zoom=zoom, resvg_kwargs=resvg_kwargs)
+        assert _alpha(png) == _alpha(expected.getvalue())
+
+    def test_save(self):
+        generator = QRPlatbaGenerator(**DATA)
+        img = generator.make_image(border=3)
+        buffer = io.BytesIO()
+        img.save(buffer, output_format="png", backend="composite", zoom=2)
+
+        assert buffer.getvalue() == render_composite_png(img.modules, border=3, zoom=2)
+        assert generator.render("png", border=3, zoom=2, backend="composite") == buffer.getvalue()
+
+    def test_layout_cached(self):
+        raster.composite_layout_cache.cache_clear()
+        layout = get_composite_layout(25)
+
+        assert get_composite_layout(25, resvg_kwargs={"dpi": 300}) is layout
+        assert get_composite_layout(25, zoom=2) is not layout
+        assert raster.composite_layout_cache.cache_info()[:2] == (1, 2)
+        assert get_layout(25).edges == layout.edges
+
+    def test_cache_bounded(self, monkeypatch):
+        monkeypatch.setattr(raster, "composite_layout_cache", raster.LRUCache(maxsize=2))
+        for box_size in (1, 2, 3):
+            get_composite_layout(21, box_size=box_size)
+
+        assert len(raster.composite_layout_cache) == 2
+
+    @pytest.mark.parametrize(
+        "resvg_kwargs,message",
+        [({"background": "#ffffff"}, "expected black on transparent"), ({"width": 100}, "image size changed")],
+    )
+    def test_unsupported_resvg_kwargs(self, resvg_kwargs, message):
+        img = QRPlatbaGenerator(**DATA).make_image()
+        with pytest.raises(ValueError, match=message):
+            img.save(io.BytesIO(), output_format="png", backend="composite", resvg_kwargs=resvg_kwargs)
+
+    def test_requires_resvg(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, "resvg_py", None)
+        raster.composite_layout_cache.cache_clear()
+        img = QRPlatbaGenerator(**DATA).make_image()
+        with pytest.raises(ImportError, match="pip install qrplatba"):
+            img.save(io.BytesIO(), output_format="png", backend="composite")
@@ -0,0 +1,162 @@
+import importlib.util
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+from conftest import requires_float_zoom
+
+from qrplatba import Payment, QRPlatbaGenerator, Renderer
+from qrplatba.cache import RenderCache
+
+DATA = {
+    "account": "123456789/0123",
+    "amount": 400.56,
+    "x_vs": 2034456,
+    "message": "Žluťoučký kůň",
+    "due_date": date(2025, 6, 15),
+}
+
+requires_resvg = pytest.mark.skipif(not importlib.util.find_spec("resvg_py"), reason="resvg_py not installed")
+
+
+def payments(count):
+    return [{**DATA, "amount": 100 + i, "x_vs": 1000 + i} for i in range(count)]
+
+
+class TestRenderer:
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {},
+            {"border": 4, "box_size": 7, "error_correction": 3},
+            {"alphanumeric": True, "path_mode": "contours"},
+            {"output_format": "png", "backend": "native", "zoom": 2},
+            pytest.param({"output_format": "png"}, marks=requires_resvg),
+            pytest.param({"output_format": "png", "path_mode": "runs", "zoom": 0.5}, marks=requires_float_zoom),
+            pytest.param({"output_format": "png", "backend": "composite", "box_size": 7}, marks=requires_resvg),
+        ],
+    )
+    def test_same_as_generator(self, options):
+        options = dict(options)
+        output_format = options.pop("output_format", "svg")
+        renderer = Renderer(output_format, **options)
+
+        assert renderer.render(DATA) == QRPlatbaGenerator(**DATA).render(output_format, **options)
+
+    def test_payment_types(self):
+        renderer = Renderer()
+        expected = QRPlatbaGenerator(**DATA).make_svg()
+
+        assert renderer.render(QRPlatbaGenerator(**DATA)) == expected
+        assert renderer.render(Payment(**DATA)) == expected
+        assert renderer.render(QRPlatbaGenerator(**DATA).get_text()) == expected
+        assert list(renderer.render_many([DATA, Payment(**DATA)])) == [expected, expected]
+
+    def test_cache_shared_with_generator(self):
+        cache = RenderCache()
+        QRPlatbaGenerator(**DATA).render(box_size=5, path_mode="runs", cache=cache)
+        Renderer(box_size=5, path_mode="runs", cache=cache).render(DATA)
+
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    @pytest.mark.parametrize(
+        "kwargs,message",
+        [
+            ({"output_format": "gif"}, "Unsupported format: gif"),
+            ({"path_mode": "dots"}, "Unsupported path mode: dots"),
+            ({"output_format": "png", "backend": "cairo"}, "Unsupported PNG backend: cairo"),
+            (
+                {"output_format": "png", "backend": "native", "resvg_kwargs": {"dpi": 96}},
+                "not supported by the native PNG backend",
+            ),
+        ],
+    )
+    def test_invalid_options(self, kwargs, message):
+        with pytest.raises(ValueError, match=message):
+            Renderer(**kwargs)
+
+    @pytest.mark.parametrize("options", [{}, {"box_size": 7, "path_mode": "contours", "alphanumeric": True}])
+    def test_iter_svg_chunks(self, options):
+        renderer = Renderer(**options)
+        chunks = list(renderer.iter_svg_chunks(DATA, chunk_size=512))
+
+        assert b"".join(chunks) == renderer.render(DATA)
+        assert len(chunks) > 3
+
+    def test_iter_svg_chunks_png(self):
+        with pytest.raises(ValueError, match="Unsupported format for streaming: png"):
+            Renderer("png", backend="native").iter_svg_chunks(DATA)
+
+    def test_png_requires_resvg(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, "resvg_py", None)
+        with pytest.raises(ImportError, match="pip install qrplatba"):
+            Renderer("png")
+        assert Renderer("png", backend="native").render(DATA)[:4] == b"\x89PNG"
+
+
+class TestConcurrency:
+    """A single renderer shared by many threads must produce the same images as serial rendering."""
+
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {},
+            {"output_format": "png", "backend": "native"},
+            pytest.param({"output_format": "png", "backend": "composite"}, marks=requires_resvg),
+        ],
+    )
+    def test_stress(self, options):
+        renderer = Renderer(**options, cache=RenderCache())
+        items = payments(40) * 3
+        expected = [QRPlatbaGenerator(**payment).render(**options) for payment in items]
+        barrier = threading.Barrier(8)
+
+        def render(index):
+            if index < 8:
+                barrier.wait()
+            return renderer.render(items[index])
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            assert list(executor.map(render, range(len(items)))) == expected
+        assert renderer.cache.hits + renderer.cache.misses == len(items)
+
+    @pytest.mark.parametrize("options", [{}, {"output_format": "png", "backend": "native", "path_mode": "runs"}])
+    def test_render_many_threads(self, options):
+        """Runs on every build: threads rendering concurrently all succeed with the serial output"""
+        renderer = Renderer(**options)
+        items = payments(24)
+        expected = list(Renderer(**options).render_many(items))
+        barrier = threading.Barrier(8)
+
+        def render_all(_):
+            barrier.wait()
+            return list(renderer.render_many(items))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(render_all, i) for i in range(8)]
+            results = [future.result() for future in futures]  # re-raises an exception of any thread
+
+        assert all(result == expected for result in results)
+
+    # throughput scaling is measured only where threads run in parallel, with the GIL it can't scale
+    @pytest.mark.skipif(
+        getattr(sys, "_is_gil_enabled", lambda: True)() or (os.cpu_count() or 1) < 4,
+        reason="scaling needs free-threaded Python and at least 4 CPUs",
+    )
+    def test_scaling(self):
+        renderer = Renderer()
+        items = payments(64)
+        renderer.render(items[0])
+
+        def throughput(threads):
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                for _ in range(threads):
+                    executor.submit(lambda: [renderer.render(payment) for payment in items])
+            return threads * len(items) / (time.perf_counter() - start)
+
+        assert throughput(4) > 3 * throughput(1)
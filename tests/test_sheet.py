@@ -0,0 +1,165 @@
+import importlib.util
+import itertools
+import xml.etree.ElementTree as ET
+from datetime import date
+
+import pytest
+
+from qrplatba import QRPlatbaGenerator
+from qrplatba.qr import make_modules
+from qrplatba.sheet import SheetRenderer
+from qrplatba.spayd import SpaydGenerator
+from qrplatba.svg import SvgWriter
+
+SVG = "{http://www.w3.org/2000/svg}"
+XLINK = "{http://www.w3.org/1999/xlink}"
+
+DATA = {
+    "account": "123456789/0123",
+    "amount": 400.56,
+    "x_vs": 2034456,
+    "message": "Žluťoučký kůň",
+    "due_date": date(2025, 6, 15),
+}
+
+requires_resvg = pytest.mark.skipif(not importlib.util.find_spec("resvg_py"), reason="resvg_py not installed")
+
+
+def payments(count):
+    # longer messages for some payments, so that the page has codes of several sizes
+    return [{**DATA, "amount": 100 + i, "message": "Platba " * (i % 3 * 3)} for i in range(count)]
+
+
+class TestSheetRenderer:
+    def test_page_structure(self):
+        items = payments(12)
+        page = SheetRenderer().render_page(items)
+        assert page.startswith(b"<?xml version='1.0' encoding='UTF-8'?>\n")
+
+        root = ET.fromstring(page)
+        assert root.get("width") == "210mm"
+        assert root.get("height") == "297mm"
+        assert root.get("viewBox") == "0 0 210 297"
+
+        matrices = [make_modules(SpaydGenerator(**payment).get_text()) for payment in items]
+        widths = {len(modules) for modules in matrices}
+        assert len(widths) > 1
+
+        symbols = root.findall(f"{SVG}defs/{SVG}symbol")
+        assert sorted(symbol.get("id") for symbol in symbols) == sorted(f"qrplatba-frame-{w}" for w in widths)
+        assert all(symbol.find(f"{SVG}text").text == "QR platba" for symbol in symbols)
+
+        codes = root.findall(f"{SVG}g/{SVG}g")
+        assert len(codes) == 12
+        for code, modules in zip(codes, matrices):
+            use = code.find(f"{SVG}use")
+            # SVG 1.1 renderers only know xlink:href
+            assert use.get("href") == use.get(f"{XLINK}href") == f"#qrplatba-frame-{len(modules)}"
+            assert code.find(f"{SVG}path").get("d") == SvgWriter.for_geometry(len(modules)).path(modules)
+
+    def test_grid_positions(self):
+        renderer = SheetRenderer(columns=2, rows=1, page_size=(120, 60), margin=0)
+        root = ET.fromstring(renderer.render_page([DATA] * 2))
+        # codes have the same size as the separate images
+        _, _, width, height = map(float, ET.fromstring(QRPlatbaGenerator(**DATA).make_svg()).get("viewBox").split())
+        x = (60 - width) / 2
+        y = (60 - height) / 2
+        transforms = [code.get("transform") for code in root.findall(f"{SVG}g/{SVG}g")]
+        assert transforms == [f"translate({x:g},{y:g})", f"translate({60 + x:g},{y:g})"]
+
+    @pytest.mark.parametrize("path_mode", ["runs", "contours"])
+    def test_path_mode(self, path_mode):
+        root = ET.fromstring(SheetRenderer(path_mode=path_mode).render_page([DATA]))
+        modules = make_modules(SpaydGenerator(**DATA).get_text())
+        writer = SvgWriter.for_geometry(len(modules), path_mode=path_mode)
+        assert root.find(f"{SVG}g/{SVG}g/{SVG}path").get("d") == writer.path(modules)
+
+    def test_alphanumeric(self):
+        page = SheetRenderer(alphanumeric=True).render_page([DATA])
+        modules = make_modules(SpaydGenerator(**DATA).get_text(normalize=True), segment=True)
+        assert f'd="{SvgWriter.for_geometry(len(modules)).path(modules)}"'.encode() in page
+
+    def test_pages_are_lazy(self):
+        consumed = []
+
+        def source():
+            for payment in payments(30):
+                consumed.append(payment)
+                yield payment
+
+        pages = SheetRenderer(columns=2, rows=5).pages(source())
+        assert consumed == []
+        first = next(pages)
+        assert len(consumed) == 10
+        assert len(ET.fromstring(first).findall(f"{SVG}g/{SVG}g")) == 10
+
+        rest = list(pages)
+        assert len(rest) == 2
+        assert len(consumed) == 30
+
+    def test_partial_last_page(self):
+        pages = list(SheetRenderer(columns=3, rows=2).pages(payments(8)))
+        assert [len(ET.fromstring(page).findall(f"{SVG}g/{SVG}g")) for page in pages] == [6, 2]
+
+    def test_no_payments(self):
+        assert list(SheetRenderer().pages([])) == []
+
+    def test_payment_types(self):
+        generator = SpaydGenerator(**DATA)
+        renderer = SheetRenderer()
+        page = renderer.render_page([DATA])
+        assert renderer.render_page([generator]) == page
+        assert renderer.render_page([generator.get_text()]) == page
+
+    @requires_resvg
+    def test_png(self):
+        from qrplatba.raster import _decode_png
+
+        pages = list(SheetRenderer("png", columns=2, rows=2).pages(payments(5)))
+        assert len(pages) == 2
+        assert all(page.startswith(b"\x89PNG") for page in pages)
+        width, height, _ = _decode_png(pages[0])
+        assert (width, height) == (2480, 3508)  # A4 at 300 DPI
+
+    @requires_resvg
+    def test_png_zoom(self):
+        from qrplatba.raster import _decode_png
+
+        page = SheetRenderer("png", page_size=(120, 60), columns=2, rows=1, margin=0, zoom=2).render_page([DATA])
+        assert _decode_png(page)[:2] == (2834, 1418)
+
+    def test_iter_page_chunks(self):
+        renderer = SheetRenderer(columns=2, rows=3)
+        chunks = list(renderer.iter_page_chunks(payments(5)))
+
+        assert b"".join(chunks) == renderer.render_page(payments(5))
+        assert len(chunks) == 1 + 5 + 1  # head with the symbols, one chunk per code, tail
+
+    def test_iter_page_chunks_checks_fit(self):
+        with pytest.raises(ValueError, match="QR code does not fit the grid cell"):
+            SheetRenderer(columns=10, rows=10).iter_page_chunks([DATA])
+
+    @requires_resvg
+    def test_iter_page_chunks_png(self):
+        with pytest.raises(ValueError, match="Unsupported format for streaming: png"):
+            SheetRenderer("png").iter_page_chunks([DATA])
+
+    def test_too_many_payments(self):
+        with pytest.raises(ValueError, match="Too many payments for a page"):
+            SheetRenderer(columns=1, rows=1).render_page(list(itertools.repeat(DATA, 2)))
+
+    def test_code_does_not_fit(self):
+        with pytest.raises(ValueError, match="QR code does not fit the grid cell"):
+            SheetRenderer(columns=10, rows=10).render_page([DATA])
+
+    @pytest.mark.parametrize(
+        "options, message",
+        [
+            ({"output_format": "gif"}, "Unsupported format: gif"),
+            ({"path_mode": "dots"}, "Unsupported path mode: dots"),
+            ({"columns": 0}, r"Invalid grid \(was 0x4, expected at least 1x1\)"),
+        ],
+    )
+    def test_invalid_options(self, options, message):
+        with pytest.raises(ValueError, match=message):
+            SheetRenderer(**options)
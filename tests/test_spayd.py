@@ -1,4 +1,6 @@
+import zlib
 from datetime import date, datetime
+from decimal import Decimal
 
 import pytest
 
@@ -35,6 +37,28 @@ class TestIBANConversion:
         generator = QRPlatbaGenerator(account)
         assert f"ACC:{account}" in generator.get_text()
 
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_bigint_checksum(self, seed):
+        import random
+
+        from qrplatba.spayd import account_to_iban
+
+        rnd = random.Random(seed)
+        for _ in range(200):
+            prefix, number, bank = rnd.randrange(10**6), rnd.randrange(1, 10**10), rnd.randrange(10**4)
+            bban = f"{bank:0>4}{prefix:0>6}{number:0>10}"
+            expected = f"CZ{98 - int(bban + '123500') % 97:0>2}{bban}"
+            assert account_to_iban(f"{prefix}-{number}/{bank:0>4}") == expected
+
+    def test_conversion_cached(self):
+        from qrplatba.spayd import account_to_iban
+
+        account_to_iban.cache_clear()
+        for _ in range(3):
+            QRPlatbaGenerator("123456789/0123", alternate_accounts=["123456789/0123"]).get_text()
+        info = account_to_iban.cache_info()
+        assert (info.hits, info.misses) == (5, 1)
+
 
 class TestGetText:
     """SPAYD string generation with various field combinations."""
@@ -210,6 +234,80 @@ class TestBIC:
         assert "+" not in generator.get_text().split("ACC:")[1].split("*")[0]
 
 
+class TestFormatSpayd:
+    """format_spayd must produce the same SPAYD string as SpaydGenerator.get_text()."""
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"account": "CZ6508000000192000145399"},
+            {"account": "123456789/0123", "bic": "RZBCCZPP", "amount": 0, "x_vs": 0, "reference": 0},
+            {
+                "account": "19-2000145399/0800",
+                "amount": 100.5,
+                "currency": "CZK",
+                "x_vs": 1234567890,
+                "x_ss": 1234,
+                "x_ks": 308,
+                "alternate_accounts": ["123456789/0800", "SK3112000000198742637541"],
+                "recipient_name": "Jan Novak",
+                "due_date": datetime(2025, 12, 31, 10, 30),
+                "payment_type": "IP",
+                "message": "Test payment",
+                "notification_type": "E",
+                "notification_address": "test@example.com",
+                "x_per": 7,
+                "x_id": "ABCDEF",
+                "x_url": "https://example.com",
+                "reference": 42,
+            },
+            {"account": "CZ6508000000192000145399", "due_date": date(2025, 3, 15), "alternate_accounts": []},
+            {"account": "CZ6508000000192000145399", "due_date": "20250315", "message": "", "currency": None},
+            {"account": "CZ6508000000192000145399", "x_url": "https://example.com/*"},
+        ],
+    )
+    def test_same_as_get_text(self, kwargs):
+        from qrplatba import Payment, SpaydGenerator, format_spayd
+
+        assert format_spayd(Payment(**kwargs)) == SpaydGenerator(**kwargs).get_text()
+
+    def test_account_required(self):
+        from qrplatba import Payment, format_spayd
+
+        with pytest.raises(ValueError, match="account is required"):
+            format_spayd(Payment(None))
+
+    def test_payment_has_no_dict(self):
+        from qrplatba import Payment
+
+        assert not hasattr(Payment("CZ6508000000192000145399"), "__dict__")
+
+
+class TestNormalizeSpayd:
+    """Normalized SPAYD must be uppercase without diacritics, except for case sensitive values."""
+
+    @pytest.mark.parametrize(
+        "text,expected",
+        [
+            (
+                "SPD*1.0*ACC:CZ6508000000192000145399*MSG:Žluťoučký kůň",
+                "SPD*1.0*ACC:CZ6508000000192000145399*MSG:ZLUTOUCKY KUN",
+            ),
+            ("SPD*1.0*RN:Jan Novák*NTA:Jan@Example.com", "SPD*1.0*RN:JAN NOVAK*NTA:Jan@Example.com"),
+            ("SPD*1.0*MSG:a€b*X-URL:https://example.com/Path", "SPD*1.0*MSG:A€B*X-URL:https://example.com/Path"),
+        ],
+    )
+    def test_normalize(self, text, expected):
+        from qrplatba import normalize_spayd
+
+        assert normalize_spayd(text) == expected
+
+    def test_get_text_normalize(self):
+        generator = QRPlatbaGenerator("123456789/0123", message="Platba faktury č. 42")
+        assert generator.get_text(normalize=True).endswith("*MSG:PLATBA FAKTURY C. 42")
+        assert generator.get_text().endswith("*MSG:Platba faktury č. 42")
+
+
 class TestBackwardCompatibility:
     """Verify all documented and expected import paths and API patterns still work."""
 
@@ -222,6 +320,11 @@ class TestBackwardCompatibility:
             ("from qrplatba.generator import QRPlatbaGenerator", "QRPlatbaGenerator"),
             ("from qrplatba.spayd import SpaydGenerator", "SpaydGenerator"),
             ("from qrplatba.spayd import QRPlatbaGenerator", "QRPlatbaGenerator"),
+            ("from qrplatba import Payment", "Payment"),
+            ("from qrplatba.parser import SpaydParser", "SpaydParser"),
+            ("from qrplatba.template import SpaydTemplate", "SpaydTemplate"),
+            ("from qrplatba.payment import format_spayd", "format_spayd"),
+            ("from qrplatba.iban import accounts_to_iban", "accounts_to_iban"),
         ],
     )
     def test_import_paths(self, import_statement, attr):
@@ -274,3 +377,274 @@ class TestBackwardCompatibility:
         svg_data = img.to_string(encoding="unicode")
         assert isinstance(svg_data, str)
         assert "QR platba" in svg_data
+
+
+class TestSpaydParser:
+    """Parsed SPAYD strings must round-trip to the same string and invalid strings must report every error."""
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"account": "CZ6508000000192000145399"},
+            {"account": "123456789/0123", "bic": "RZBCCZPP", "amount": 0, "x_vs": 0, "reference": 0},
+            {
+                "account": "19-2000145399/0800",
+                "amount": 100.5,
+                "currency": "CZK",
+                "x_vs": "0001234567",
+                "x_ss": 1234,
+                "x_ks": 308,
+                "alternate_accounts": ["123456789/0800", "SK3112000000198742637541+TATRSKBX"],
+                "recipient_name": "Jan Novák",
+                "due_date": date(2025, 12, 31),
+                "payment_type": "IP",
+                "message": "Platba: faktura č. 1",
+                "notification_type": "E",
+                "notification_address": "test@example.com",
+                "x_per": 7,
+                "x_id": "ABCDEF",
+                "x_url": "https://example.com/?a=1",
+                "reference": 42,
+            },
+        ],
+    )
+    def test_round_trip(self, kwargs):
+        from qrplatba import SpaydGenerator, SpaydParser, format_spayd
+
+        text = SpaydGenerator(**kwargs).get_text()
+        payment = SpaydParser().parse(text)
+
+        assert format_spayd(payment) == text
+        assert SpaydGenerator(**payment._asdict()).get_text() == text
+
+        normalized = SpaydGenerator(**kwargs).get_text(normalize=True)
+        assert format_spayd(SpaydParser().parse(normalized)) == normalized
+
+    def test_parsed_values(self):
+        from qrplatba import Payment, SpaydParser
+
+        payment = SpaydParser().parse(
+            "SPD*1.0*ACC:CZ6508000000192000145399+RZBCCZPP*AM:400.56*DT:20250315*X-VS:0042*ALT-ACC:SK3112000000198742637541"
+        )
+
+        assert payment == Payment(
+            "CZ6508000000192000145399",
+            bic="RZBCCZPP",
+            amount=Decimal("400.56"),
+            due_date=date(2025, 3, 15),
+            x_vs="0042",
+            alternate_accounts=("SK3112000000198742637541",),
+        )
+
+    @pytest.mark.parametrize(
+        "text,error",
+        [
+            ("SPD*1.0*ACC:CZ6608000000192000145399", ("ACC", "Invalid IBAN checksum: CZ6608000000192000145399")),
+            ("SPD*1.0*ACC:123456789/0123", ("ACC", "Invalid IBAN: 123456789/0123")),
+            ("SPD*1.0*ACC:CZ6508000000192000145399+RZB", ("ACC", "Invalid BIC: RZB")),
+            (
+                "SPD*1.0*ACC:CZ6508000000192000145399*MSG:" + "x" * 61,
+                ("MSG", "Value too long (was 61, expected at most 60)"),
+            ),
+            (
+                "SPD*1.0*ACC:CZ6508000000192000145399*RF:" + "1" * 17,
+                ("RF", "Value too long (was 17, expected at most 16)"),
+            ),
+            ("SPD*1.0*ACC:CZ6508000000192000145399*RF:12A", ("RF", "Invalid value: 12A")),
+            ("SPD*1.0*ACC:CZ6508000000192000145399*PT:ABCD", ("PT", "Value too long (was 4, expected at most 3)")),
+            ("SPD*1.0*ACC:CZ6508000000192000145399*AM:1.234", ("AM", "Invalid value: 1.234")),
+            ("SPD*1.0*ACC:CZ6508000000192000145399*DT:20251332", ("DT", "Invalid date: 20251332")),
+            ("SPD*1.0*ACC:CZ6508000000192000145399*ALT-ACC:CZ00", ("ALT-ACC", "Invalid IBAN: CZ00")),
+            ("SPD*1.0*ACC:CZ6508000000192000145399*MSG:", ("MSG", "Empty value")),
+            (
+                "SPD*1.0*ACC:CZ6508000000192000145399*AM:10.00*CRC32:1234ABCD",
+                ("CRC32", "Invalid checksum (was 1234ABCD, expected 2D79C478)"),
+            ),
+            ("SPD*1.0*ACC:CZ6508000000192000145399*CRC32:12", ("CRC32", "Invalid value: 12")),
+            ("SPD*1.0*ACC:CZ6508000000192000145399*ACC:CZ6508000000192000145399", ("ACC", "Duplicate key")),
+            ("SPD*1.0*ACC:CZ6508000000192000145399*MSG", (None, "Invalid field: MSG")),
+            ("SPD*1.0*AM:100.00", ("ACC", "Missing account")),
+            ("SPD*2.0*ACC:CZ6508000000192000145399", (None, "Unsupported SPAYD version: 2.0")),
+            ("ACC:CZ6508000000192000145399", (None, "Missing SPD header")),
+        ],
+    )
+    def test_validate(self, text, error):
+        from qrplatba import SpaydParser
+
+        assert SpaydParser().validate(text) == [error]
+
+    def test_all_errors_reported(self):
+        from qrplatba import SpaydParser
+        from qrplatba.parser import InvalidSpaydError
+
+        with pytest.raises(InvalidSpaydError, match="Invalid SPAYD string: AM: Invalid value: x; ACC: Missing") as e:
+            SpaydParser().parse("SPD*1.0*AM:x*CC:CZK")
+        assert [error.key for error in e.value.errors] == ["AM", "ACC"]
+        assert isinstance(e.value, ValueError)
+
+    @pytest.mark.parametrize("suffix", ["", "*"])
+    def test_crc32(self, suffix):
+        from qrplatba import SpaydParser
+
+        text = "SPD*1.0*ACC:CZ6508000000192000145399*AM:10.00"
+        crc = f"{zlib.crc32(b'SPD*1.0*ACC:CZ6508000000192000145399*AM:10.00'):08X}"
+        # the checksum is computed from the fields sorted by key, regardless of their order in the string
+        reordered = "SPD*1.0*AM:10.00*CRC32:" + crc.lower() + "*ACC:CZ6508000000192000145399" + suffix
+
+        assert SpaydParser().validate(f"{text}*CRC32:{crc}{suffix}") == []
+        assert SpaydParser().parse(reordered) == SpaydParser().parse(text)
+
+    def test_trailing_star(self):
+        from qrplatba import SpaydParser
+
+        assert SpaydParser().parse("SPD*1.0*ACC:CZ6508000000192000145399*X-VS:12*") == SpaydParser().parse(
+            "SPD*1.0*ACC:CZ6508000000192000145399*X-VS:12"
+        )
+        assert SpaydParser().validate("SPD*1.0*") == [("ACC", "Missing account")]
+
+    @pytest.mark.parametrize(
+        "text,canonical",
+        [
+            ("SPD*1.0*ACC:CZ6508000000192000145399*AM:450.5", "SPD*1.0*ACC:CZ6508000000192000145399*AM:450.50"),
+            ("SPD*1.0*ACC:CZ6508000000192000145399*AM:0", "SPD*1.0*ACC:CZ6508000000192000145399*AM:0.00"),
+            ("SPD*1.0*X-VS:1*ACC:CZ6508000000192000145399*", "SPD*1.0*ACC:CZ6508000000192000145399*X-VS:1"),
+        ],
+    )
+    def test_non_canonical_round_trip(self, text, canonical):
+        """Valid strings in other forms than SpaydGenerator produces are re-serialized in its form"""
+        from qrplatba import SpaydParser, format_spayd
+
+        assert format_spayd(SpaydParser().parse(text)) == canonical
+
+    def test_allow_unknown_keys(self):
+        from qrplatba import SpaydParser
+
+        payment = SpaydParser(allow_unknown_keys=True).parse("SPD*1.0*ACC:CZ6508000000192000145399*X-SELF:1")
+        assert payment.account == "CZ6508000000192000145399"
+
+    def test_parse_many(self):
+        from qrplatba import SpaydGenerator, SpaydParser
+        from qrplatba.parser import ParseResult, SpaydError
+
+        valid = SpaydGenerator("123456789/0123", amount=10).get_text()
+        results = list(SpaydParser().parse_many(iter([valid, "SPD*1.0*AM:10.00", valid])))
+
+        assert [result.index for result in results] == [0, 1, 2]
+        assert results[0].payment == results[2].payment == SpaydParser().parse(valid)
+        assert results[1] == ParseResult(1, None, (SpaydError("ACC", "Missing account"),))
+
+
+class TestAccountsToIban:
+    """Bulk conversion must match account_to_iban and mark accounts failing the format or mod 11 checksum."""
+
+    ACCOUNTS = [
+        "19-2000145399/0800",
+        "2000145399/0800",
+        "000019-2000145399/0800",
+        "123456789/0123",  # number fails the mod 11 checksum
+        "18-2000145399/0800",  # prefix fails the mod 11 checksum
+        "1234567-2000145399/0800",
+        "12345678901/0800",
+        "-2000145399/0800",
+        "2000145399/080",
+        "2000145399/0800 ",
+        "CZ6508000000192000145399",
+        "",
+    ]
+    VALID = [True, True, True] + [False] * 9
+
+    def test_list(self):
+        from qrplatba.iban import accounts_to_iban
+        from qrplatba.spayd import account_to_iban
+
+        ibans, valid = accounts_to_iban(self.ACCOUNTS + [None])
+
+        assert valid == self.VALID + [False]
+        assert ibans[:3] == [account_to_iban(account) for account in self.ACCOUNTS[:3]]
+        assert ibans[0] == ibans[2] == "CZ6508000000192000145399"
+        assert ibans[3:] == [None] * 10
+
+    def test_numpy_matches_list(self):
+        import random
+
+        np = pytest.importorskip("numpy")
+        from qrplatba.iban import accounts_to_iban
+
+        rnd = random.Random(0)
+        accounts = list(self.ACCOUNTS)
+        for _ in range(5000):
+            prefix, number = rnd.randrange(10 ** rnd.randrange(1, 7)), rnd.randrange(10 ** rnd.randrange(1, 11))
+            accounts.append(f"{prefix}-{number}/{rnd.randrange(10**4):04}" if rnd.random() < 0.5 else f"{number}/0800")
+        ibans, valid = accounts_to_iban(accounts)
+        array_ibans, array_valid = accounts_to_iban(np.array(accounts))
+
+        assert array_valid.dtype == bool
+        assert array_valid.tolist() == valid
+        assert array_ibans.tolist() == [iban or "" for iban in ibans]
+        assert any(valid[len(self.ACCOUNTS) :])
+
+    def test_numpy_non_ascii_and_objects(self):
+        np = pytest.importorskip("numpy")
+        from qrplatba.iban import accounts_to_iban
+
+        ibans, valid = accounts_to_iban(np.array(["19-2000145399/0800", "ř/0800", None], dtype=object))
+
+        assert valid.tolist() == [True, False, False]
+        assert ibans.tolist() == ["CZ6508000000192000145399", "", ""]
+
+
+class TestSpaydTemplate:
+    """Template must produce the same SPAYD string as SpaydGenerator with the variable fields set."""
+
+    FIELDS = {
+        "amount": 1200,
+        "currency": "CZK",
+        "x_vs": 2034456,
+        "due_date": date(2026, 1, 15),
+        "recipient_name": "Žluťoučký kůň s.r.o.",
+        "message": "Upomínka faktury 2026001",
+        "x_url": "https://example.com/Faktura",
+    }
+
+    @pytest.mark.parametrize(
+        "values",
+        [
+            {},
+            {"amount": 99.9},
+            {"amount": 1500, "x_vs": "0042", "due_date": datetime(2026, 2, 1, 8, 0)},
+            {"amount": None, "x_vs": "", "due_date": None},
+        ],
+    )
+    @pytest.mark.parametrize("normalize", [False, True])
+    def test_same_as_generator(self, values, normalize):
+        from qrplatba import SpaydGenerator, SpaydTemplate
+
+        template = SpaydTemplate("19-2000145399/0800", **self.FIELDS)
+        expected = SpaydGenerator("19-2000145399/0800", **{**self.FIELDS, **values}).get_text(normalize=normalize)
+
+        assert template.get_text(normalize, **values) == expected
+
+    def test_custom_variable_fields(self):
+        from qrplatba import SpaydGenerator, SpaydTemplate
+
+        template = SpaydTemplate("CZ6508000000192000145399", variable_fields=("x_url", "message"), amount=10)
+
+        assert template.variable_fields == ("message", "x_url")
+        assert (
+            template.get_text(message="Zpráva", x_url="https://example.com/X")
+            == SpaydGenerator(
+                "CZ6508000000192000145399", amount=10, message="Zpráva", x_url="https://example.com/X"
+            ).get_text()
+        )
+
+    def test_unsupported_variable_field(self):
+        from qrplatba import SpaydTemplate
+
+        with pytest.raises(ValueError, match="Unsupported variable field: account"):
+            SpaydTemplate("CZ6508000000192000145399", variable_fields=("account",))
+
+    def test_not_a_variable_field(self):
+        from qrplatba import SpaydTemplate
+
+        with pytest.raises(ValueError, match="Not a variable field of the template: message"):
+            SpaydTemplate("CZ6508000000192000145399").get_text(message="text")
@@ -1,12 +1,24 @@
 import importlib.util
+import io
 import re
+import sys
 import xml.etree.ElementTree as ET
 from datetime import date
 from decimal import Decimal
+from pathlib import Path
 
 import pytest
+import qrcode
+from qrcode.image.styles.moduledrawers.svg import SvgPathCircleDrawer
 
-from qrplatba import QRPlatbaGenerator
+from qrplatba import QRPlatbaGenerator, Renderer
+from qrplatba.batch import render_many
+from qrplatba.cache import RenderCache
+from qrplatba.qr import make_qr
+from qrplatba.raster import _decode_png
+from qrplatba.svg import _INTER_BOLD, QRPlatbaSVGImage, SvgWriter, _contour_subpaths, _mm, _run_subpaths
+
+FIXTURES = Path(__file__).parent / "fixtures"
 
 
 class _QRImageTestBase:
@@ -127,13 +139,270 @@ class TestSVGImage(_QRImageTestBase):
             assert val == int(val), f"Fractional text {attr}={text.get(attr)}"
 
 
+class TestSvgWriter(_QRImageTestBase):
+    """SvgWriter output must be byte-identical to the ElementTree based QRPlatbaSVGImage output."""
+
+    payloads = [
+        _QRImageTestBase.data,
+        {"account": "CZ6508000000192000145399"},
+        {"account": "19-2000145399/0800", "amount": 1, "message": "Long message " * 4, "x_ss": 1234, "x_ks": 308},
+    ]
+
+    @pytest.mark.parametrize("data", payloads)
+    @pytest.mark.parametrize("box_size", [1, 10, 12, 40, 100])
+    @pytest.mark.parametrize("border", [0, 2, 5])
+    def test_identical_output(self, data, box_size, border):
+        generator = QRPlatbaGenerator(**data)
+        img = generator.make_image(border=border, box_size=box_size)
+        saved = io.BytesIO()
+        img.save(saved)
+
+        assert generator.make_svg(border=border, box_size=box_size) == saved.getvalue()
+        assert generator.make_svg(border=border, box_size=box_size, xml_declaration=False) == img.to_string()
+
+    def test_to_string(self):
+        qr = qrcode.QRCode(image_factory=QRPlatbaSVGImage, border=2)
+        qr.add_data(QRPlatbaGenerator(**self.data).get_text())
+        qr.make(fit=True)
+
+        writer = SvgWriter(qr.modules_count, border=2, box_size=10)
+        assert writer.to_string(qr.modules) == qr.make_image().to_string(encoding="unicode")
+
+
+class TestFixtures(_QRImageTestBase):
+    """Output of every path must match the fixture files, generated by qrplatba 1.2.0."""
+
+    payloads = {
+        "default": _QRImageTestBase.data,
+        "iban": {"account": "CZ6508000000192000145399"},
+        "long": {
+            "account": "19-2000145399/0800",
+            "amount": 1,
+            "message": "Long message " * 4,
+            "x_ss": 1234,
+            "x_ks": 308,
+        },
+    }
+
+    @pytest.mark.parametrize("name", payloads)
+    @pytest.mark.parametrize("border,box_size", [(2, 10), (0, 1), (5, 40)])
+    def test_svg(self, name, border, box_size):
+        expected = (FIXTURES / f"{name}-{border}-{box_size}.svg").read_bytes()
+        data = self.payloads[name]
+        options = {"border": border, "box_size": box_size}
+        generator = QRPlatbaGenerator(**data)
+        saved = io.BytesIO()
+        generator.make_image(**options).save(saved)
+
+        assert saved.getvalue() == expected
+        assert generator.make_svg(**options) == expected
+        assert Renderer(**options).render(data) == expected
+        assert next(render_many([data], **options)) == expected
+
+    @pytest.mark.skipif(not importlib.util.find_spec("resvg_py"), reason="resvg_py not installed")
+    @pytest.mark.parametrize("name", payloads)
+    @pytest.mark.parametrize("backend", ["resvg", "composite"])
+    def test_png(self, name, backend):
+        """Pixels are compared, the encoded PNG bytes depend on the resvg-py version"""
+        expected = _decode_png((FIXTURES / f"{name}-2-10.png").read_bytes())
+
+        assert _decode_png(QRPlatbaGenerator(**self.payloads[name]).render("png", backend=backend)) == expected
+
+
+class TestNonIntegerGeometry(_QRImageTestBase):
+    """Non-integer border and box size are truncated the same way by every output path, as qrcode does"""
+
+    @pytest.mark.parametrize("border,box_size", [(2, Decimal("2.5")), (Decimal("1.5"), 7.9)])
+    def test_same_svg(self, border, box_size):
+        options = {"border": border, "box_size": box_size}
+        generator = QRPlatbaGenerator(**self.data)
+        saved = io.BytesIO()
+        generator.make_image(**options).save(saved)
+        expected = generator.make_image(border=int(border), box_size=int(box_size)).to_string()
+
+        assert saved.getvalue().endswith(expected)
+        assert generator.make_svg(**options) == saved.getvalue()
+        assert generator.render(**options) == saved.getvalue()
+        assert Renderer(**options).render(self.data) == saved.getvalue()
+        assert next(render_many([self.data], **options)) == saved.getvalue()
+
+    def test_same_native_png(self):
+        generator = QRPlatbaGenerator(**self.data)
+        expected = generator.render("png", box_size=2, backend="native")
+
+        assert generator.render("png", box_size=Decimal("2.5"), backend="native") == expected
+        assert Renderer("png", box_size=Decimal("2.5"), backend="native").render(self.data) == expected
+
+
+class TestPathModes(_QRImageTestBase):
+    """Merged QR code paths must cover exactly the same modules with fewer subpaths."""
+
+    grid = ["0", "1", "2", "3", "4"]
+
+    def test_runs(self):
+        modules = [[True, True, False, True]]
+        assert list(_run_subpaths(modules, self.grid)) == ["M0,0H2V1H0z", "M3,0H4V1H3z"]
+
+    def test_contour_with_hole(self):
+        ring = [[True, True, True], [True, False, True], [True, True, True]]
+        # outline is clockwise, the hole counter-clockwise
+        assert list(_contour_subpaths(ring, self.grid)) == ["M0,0H3V3H0z", "M1,2H2V1H1z"]
+
+    def test_contour_diagonal_regions(self):
+        modules = [[True, False], [False, True]]
+        assert list(_contour_subpaths(modules, self.grid)) == ["M0,0H1V1H0z", "M1,1H2V2H1z"]
+
+    def test_contour_concave_region(self):
+        modules = [[True, False, True], [True, True, True]]
+        assert list(_contour_subpaths(modules, self.grid)) == ["M0,0H1V1H2V0H3V2H0z"]
+
+    @pytest.mark.parametrize("path_mode", ["modules", "runs", "contours"])
+    @pytest.mark.parametrize("data", TestSvgWriter.payloads)
+    def test_svg_writer_identical_output(self, data, path_mode):
+        generator = QRPlatbaGenerator(**data)
+        img = generator.make_image(box_size=12, path_mode=path_mode)
+
+        assert generator.make_svg(box_size=12, path_mode=path_mode, xml_declaration=False) == img.to_string()
+
+    def test_fewer_subpaths(self):
+        sizes = {}
+        for path_mode in ("modules", "runs", "contours"):
+            img = QRPlatbaGenerator(**self.data).make_image(path_mode=path_mode)
+            sizes[path_mode] = img.path.get("d").count("M")
+
+        assert sizes["modules"] > sizes["runs"] > sizes["contours"]
+
+    def test_unsupported_path_mode(self):
+        with pytest.raises(ValueError, match="Unsupported path mode"):
+            QRPlatbaGenerator(**self.data).make_image(path_mode="circles")
+
+    @pytest.mark.skipif(not importlib.util.find_spec("resvg_py"), reason="resvg_py not installed")
+    @pytest.mark.parametrize("path_mode", ["runs", "contours"])
+    def test_png_identical(self, path_mode):
+        generator = QRPlatbaGenerator(**self.data)
+
+        assert generator.render("png", path_mode=path_mode) == generator.render("png")
+
+
+class TestRenderInto(_QRImageTestBase):
+    """render_into must write the same bytes as save() into a preallocated buffer."""
+
+    @pytest.mark.parametrize("xml_declaration", [True, False])
+    def test_svg(self, xml_declaration):
+        img = QRPlatbaGenerator(**self.data).make_image()
+        saved = io.BytesIO()
+        img.save(saved)
+        expected = saved.getvalue() if xml_declaration else img.to_string()
+
+        size = img.render_size(xml_declaration=xml_declaration)
+        buffer = bytearray(size + 10)
+        assert img.render_into(buffer, 5, xml_declaration=xml_declaration) == size == len(expected)
+        assert buffer == bytes(5) + expected + bytes(5)
+
+    @pytest.mark.parametrize("kwargs", [{"path_mode": "contours"}, {"module_drawer": "circle"}])
+    def test_svg_image_options(self, kwargs):
+        qr = make_qr(QRPlatbaGenerator(**self.data).get_text(), image_factory=QRPlatbaSVGImage)
+        img = qr.make_image(**kwargs)
+        saved = io.BytesIO()
+        img.save(saved)
+
+        buffer = bytearray(img.render_size())
+        img.render_into(buffer)
+        assert buffer == saved.getvalue()
+
+    def test_native_png(self):
+        img = QRPlatbaGenerator(**self.data).make_image()
+        saved = io.BytesIO()
+        img.save(saved, output_format="png", backend="native", zoom=2)
+
+        buffer = memoryview(bytearray(img.render_size("png", backend="native", zoom=2)))
+        img.render_into(buffer, output_format="png", backend="native", zoom=2)
+        assert buffer == saved.getvalue()
+
+    def test_many_images_in_one_buffer(self):
+        images = [QRPlatbaGenerator(account="123456789/0123", amount=amount).make_image() for amount in (1, 20, 300)]
+        sizes = [img.render_size() for img in images]
+
+        buffer = bytearray(sum(sizes))
+        offset = 0
+        for img in images:
+            offset += img.render_into(buffer, offset)
+
+        saved = io.BytesIO()
+        for img in images:
+            img.save(saved)
+        assert offset == len(buffer)
+        assert buffer == saved.getvalue()
+
+    def test_encodes_once(self, monkeypatch):
+        img = QRPlatbaGenerator(**self.data).make_image()
+        size = img.render_size()
+        monkeypatch.setattr(img, "_img", None)  # serializing again would fail
+
+        assert img.render_into(bytearray(size)) == size
+
+    @pytest.mark.parametrize("offset", [-1, 1])
+    def test_buffer_too_small(self, offset):
+        img = QRPlatbaGenerator(**self.data).make_image()
+        with pytest.raises(ValueError, match="Buffer too small"):
+            img.render_into(bytearray(img.render_size()), offset)
+
+    def test_read_only_buffer(self):
+        img = QRPlatbaGenerator(**self.data).make_image()
+        with pytest.raises(TypeError):
+            img.render_into(bytes(img.render_size()))
+
+
+class TestStreaming(_QRImageTestBase):
+    """Chunks of iter_svg_chunks must join to the same bytes as save()."""
+
+    @pytest.mark.parametrize("path_mode", ["modules", "runs", "contours"])
+    @pytest.mark.parametrize("xml_declaration", [True, False])
+    def test_same_as_save(self, path_mode, xml_declaration):
+        img = QRPlatbaGenerator(**self.data).make_image(path_mode=path_mode)
+        saved = io.BytesIO()
+        img.save(saved)
+        expected = saved.getvalue() if xml_declaration else img.to_string()
+
+        chunks = list(img.iter_svg_chunks(xml_declaration=xml_declaration, chunk_size=1000))
+        assert b"".join(chunks) == expected
+        assert chunks[0].endswith(b'<path d="')
+        assert chunks[-1].endswith(b"</svg>")
+        assert all(len(chunk) == 1000 for chunk in chunks[1:-2])
+
+    def test_subclass(self):
+        class CustomImage(QRPlatbaSVGImage):
+            QR_PATH_STYLE = {**QRPlatbaSVGImage.QR_PATH_STYLE, "fill": "#123456"}
+
+        text = QRPlatbaGenerator(**self.data).get_text()
+        img = make_qr(text, image_factory=CustomImage).make_image()
+        chunks = list(img.iter_svg_chunks(xml_declaration=False, chunk_size=512))
+
+        assert b"".join(chunks) == img.to_string()
+        assert b"#123456" in b"".join(chunks)
+        assert len(chunks) > 1
+
+    @pytest.mark.parametrize("path_mode", ["modules", "runs", "contours"])
+    def test_writer(self, path_mode):
+        modules = QRPlatbaGenerator(**self.data).make_image().modules
+        writer = SvgWriter.for_geometry(len(modules), path_mode=path_mode)
+        chunks = list(writer.iter_chunks(modules, chunk_size=256))
+
+        assert b"".join(chunks) == writer.to_bytes(modules)
+        assert b"".join(writer.iter_chunks(modules, xml_declaration=False)) == writer.to_bytes(modules, False)
+        assert all(len(chunk) >= 256 for chunk in chunks[1:-2])
+
+    def test_invalid_chunk_size(self):
+        img = QRPlatbaGenerator(**self.data).make_image()
+        with pytest.raises(ValueError, match=r"Invalid chunk size \(was 0, expected at least 1\)"):
+            img.iter_svg_chunks(chunk_size=0)
+
+
 class TestPNGMissingDependency(_QRImageTestBase):
     """Must run regardless of whether resvg_py is installed."""
 
     def test_missing_resvg(self, tmp_path, monkeypatch):
         """PNG save must raise ImportError with install instructions when resvg-py is absent."""
-        import sys
-
         monkeypatch.setitem(sys.modules, "resvg_py", None)
         generator = QRPlatbaGenerator(**self.data)
         img = generator.make_image()
@@ -184,8 +453,6 @@ class TestPNGSave(_QRImageTestBase):
           font_files), proving the bundled font actually renders visible text. This also
           guards against the coupled-pair condition being changed to independent setdefault.
         """
-        from qrplatba.svg import _INTER_BOLD
-
         generator = QRPlatbaGenerator(**self.data)
         img = generator.make_image()
 
@@ -207,11 +474,158 @@ class TestPNGSave(_QRImageTestBase):
 
     def test_png_save_to_filelike(self):
         """PNG save to a file-like object must produce valid PNG bytes."""
-        import io
-
         generator = QRPlatbaGenerator(**self.data)
         img = generator.make_image()
         buf = io.BytesIO()
         img.save(buf, output_format="png")
         buf.seek(0)
         assert buf.read(4) == b"\x89PNG"
+
+
+class TestTemplate(_QRImageTestBase):
+    """Images rendered from a template must be the same as images of QRPlatbaGenerator with all the fields."""
+
+    def template(self):
+        fixed = {name: value for name, value in self.data.items() if name not in ("amount", "x_vs", "due_date")}
+        return QRPlatbaGenerator.from_template(**fixed)
+
+    @pytest.mark.parametrize(
+        "values,options",
+        [
+            ({"amount": 400.56, "x_vs": 2034456, "due_date": date(2025, 6, 15)}, {}),
+            ({"amount": 1200, "x_vs": 7}, {"box_size": 8, "path_mode": "contours"}),
+            ({"amount": Decimal("99999.99")}, {"alphanumeric": True, "xml_declaration": False}),
+        ],
+    )
+    def test_same_svg(self, values, options):
+        data = {**self.data, "amount": None, "x_vs": None, "due_date": None, **values}
+        expected = QRPlatbaGenerator(**data).make_svg(**options)
+
+        assert self.template().fill(**values).make_svg(**options) == expected
+        if "xml_declaration" not in options:
+            assert self.template().render(**values, **options) == expected
+
+    def test_payment_fields(self):
+        payment = self.template().fill(amount=400.56, x_vs=2034456)
+        generator = QRPlatbaGenerator(**{**self.data, "due_date": None, "amount": 400.56, "x_vs": 2034456})
+
+        assert (payment.account, payment.amount, payment.message) == (
+            generator.account,
+            generator.amount,
+            generator.message,
+        )
+        assert payment.x_vs == generator.x_vs
+        assert payment.due_date is None
+        assert payment.get_text() == generator.get_text()
+
+    @pytest.mark.parametrize("name", ["amount", "message", "_values"])
+    def test_payment_read_only(self, name):
+        payment = self.template().fill(amount=400.56)
+        text = payment.get_text()
+        with pytest.raises(AttributeError, match=f"read-only, use fill\\(\\) to set {name}"):
+            setattr(payment, name, 1)
+        with pytest.raises(AttributeError, match="read-only"):
+            delattr(payment, name)
+        assert payment.get_text() == text
+
+    def test_same_png(self):
+        expected = QRPlatbaGenerator(**self.data).render("png", zoom=2, backend="native")
+        values = {name: self.data[name] for name in ("amount", "x_vs", "due_date")}
+
+        assert self.template().render("png", zoom=2, backend="native", **values) == expected
+
+    def test_make_image(self):
+        img = self.template().make_image(box_size=5, amount=400.56, x_vs=2034456, due_date=date(2025, 6, 15))
+
+        assert img.to_string() == QRPlatbaGenerator(**self.data).make_image(box_size=5).to_string()
+
+    def test_render_cache(self):
+        cache = RenderCache()
+        self.template().render(amount=1, cache=cache)
+        self.template().render(amount=1, cache=cache)
+
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_not_a_variable_field(self):
+        with pytest.raises(ValueError, match="Not a variable field of the template: message"):
+            self.template().render(amount=1, message="text")
+
+
+class _DecimalImage(QRPlatbaSVGImage):
+    """Image with the reference Decimal geometry"""
+
+    geometry = "decimal"
+
+
+class TestGeometry(_QRImageTestBase):
+    """Golden tests of the fixed-point geometry against the Decimal arithmetic of qrcode"""
+
+    @pytest.mark.parametrize("box_size", [1, 2, 3, 5, 7, 8, 10, 12, 15, 20, 25, 33, 40])
+    @pytest.mark.parametrize("border", [0, 1, 2, 3, 5])
+    def test_frame_and_grid(self, border, box_size):
+        for width in range(21, 178, 12):
+            fixed = QRPlatbaSVGImage(border, width, box_size, qrcode_modules=None)
+            reference = _DecimalImage(border, width, box_size, qrcode_modules=None)
+            assert fixed._fixed_geometry and not reference._fixed_geometry
+            assert fixed._frame()._replace(grid=None) == reference._frame()
+            assert list(fixed._grid()) == reference._grid()
+
+    def test_default_frame(self):
+        frame = QRPlatbaSVGImage(2, 37, 10, qrcode_modules=None)._frame()
+        assert frame.view_box == "0 0 50.0 51.0"
+        assert frame.height == "51mm"
+        assert frame.border_path == (
+            "M2,2h46.0v0.5h-46.0z M2,47.5h2v0.5h-2z M24,47.5h24.0v0.5h-24.0z "
+            "M2,2.5v45h0.5v-45z M47.5,2.5v45.0h0.5v-45.0z"
+        )
+        assert (frame.text_x, frame.text_y) == ("5.5", "49.5")
+        assert frame.text_style.startswith("font-size:3.50px;")
+        assert frame.grid[:3] == ("6.5", "7.5", "8.5")
+
+    @pytest.mark.parametrize("path_mode", ["modules", "runs", "contours"])
+    @pytest.mark.parametrize("options", [{}, {"border": 0, "box_size": 7}, {"border": 3, "box_size": 25}])
+    @pytest.mark.parametrize("message", ["text", "Žluťoučký kůň úpěl ďábelské ódy " * 3])
+    def test_same_document(self, path_mode, options, message):
+        text = QRPlatbaGenerator(**{**self.data, "message": message[:60]}).get_text()
+        qr = make_qr(text, image_factory=_DecimalImage, **options)
+        reference = qr.make_image(path_mode=path_mode).to_string()
+        assert (
+            QRPlatbaGenerator(**{**self.data, "message": message[:60]})
+            .make_image(path_mode=path_mode, **options)
+            .to_string()
+            == reference
+        )
+
+    def test_decimal_fallback(self):
+        class OtherLine(QRPlatbaSVGImage):
+            LINE_SIZE = Decimal("0.25")
+
+        assert not QRPlatbaSVGImage(Decimal("1.5"), 21, 10, qrcode_modules=None)._fixed_geometry
+        assert not QRPlatbaSVGImage(2, 21, Decimal(10), qrcode_modules=None)._fixed_geometry
+        assert not OtherLine(2, 21, 10, qrcode_modules=None)._fixed_geometry
+
+    def test_custom_module_drawer(self):
+        """Images with other module drawers are drawn by qrcode per module"""
+        text = QRPlatbaGenerator(**self.data).get_text()
+        images = [
+            make_qr(text, image_factory=factory).make_image(module_drawer=SvgPathCircleDrawer())
+            for factory in (QRPlatbaSVGImage, _DecimalImage)
+        ]
+        assert images[0]._fixed_geometry
+        assert images[0].needs_drawrect
+        assert images[0].to_string() == images[1].to_string()
+
+    @pytest.mark.parametrize(
+        "microns, places, expected",
+        [
+            (0, 0, "0"),
+            (0, 1, "0.0"),
+            (2000, 0, "2"),
+            (2500, 0, "2.5"),
+            (2500, 2, "2.50"),
+            (350, 0, "0.35"),
+            (5, 1, "0.005"),
+        ],
+    )
+    def test_mm(self, microns, places, expected):
+        assert _mm(microns, places) == expected